@@ -0,0 +1,119 @@
+import asyncio
+import functools
+import itertools
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from brew_manager import BrewManager
+from operation_scheduler import submit_exclusive
+from services import ServiceRecord
+
+# 修改操作（安装、卸载、服务管理）的默认超时时间（秒），从加入操作队列时开始计时
+DEFAULT_COMMAND_TIMEOUT = 600
+# 查询（服务状态、搜索）的超时时间（秒）
+QUERY_COMMAND_TIMEOUT = 60
+
+
+class AsyncBrewManager:
+    """BrewManager 的 asyncio 接口
+
+    只是把调用转交给 BrewManager：查询在 BrewManager.command_pool 中执行，
+    修改操作加入 BrewManager 的操作队列，因此 brew 进程数上限（MAX_BREW_PROCESSES）、
+    线程池和排队规则都与同步接口相同。
+
+    每次调用的命令登记在各自的 process_key 下。超时或协程被取消时，还在排队的操作直接移出队列，
+    正在运行的命令通过 BrewManager.cancel_process 终止，不会一直占着线程池和进程名额。
+    """
+
+    def __init__(self, brew_manager: Optional[BrewManager] = None,
+                 timeout: float = DEFAULT_COMMAND_TIMEOUT,
+                 query_timeout: float = QUERY_COMMAND_TIMEOUT):
+        self.manager = brew_manager or BrewManager()
+        self.timeout = timeout
+        self.query_timeout = query_timeout
+        self._process_keys = itertools.count()
+
+    async def _call(self, start: Callable[[str], Future], timeout: float, description: str) -> Any:
+        """start(process_key) 在线程中开始一次调用并返回 Future，等待其结果
+
+        超时或被取消时终止 process_key 下的命令；超时抛出 TimeoutError。
+        """
+        process_key = f"async-{next(self._process_keys)}"
+        future = asyncio.wrap_future(start(process_key))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"{description} timed out after {timeout}s")
+            self.manager.cancel_process(process_key)
+            raise TimeoutError(f"命令执行超时（{timeout} 秒）") from None
+        except asyncio.CancelledError:
+            self.manager.cancel_process(process_key)
+            raise
+
+    async def _query(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """在 command_pool 中执行一个只读查询，func 接受 process_key 关键字参数"""
+        loop = asyncio.get_running_loop()
+        return await self._call(
+            lambda key: loop.run_in_executor(self.manager.command_pool,
+                                             functools.partial(func, *args, process_key=key)),
+            self.query_timeout if timeout is None else timeout, func.__name__
+        )
+
+    async def _operation(self, method: Callable[..., Tuple[bool, str]], *args) -> Tuple[bool, str]:
+        """把一个修改操作加入操作队列并等待结果，超时返回 (False, 超时消息)"""
+        try:
+            return await self._call(lambda key: submit_exclusive(method, *args, process_key=key),
+                                    self.timeout, method.__name__)
+        except TimeoutError as e:
+            return False, str(e)
+
+    async def get_inventory(self) -> List[Dict[str, Any]]:
+        """获取已安装包的详细记录（只扫描 Cellar/Caskroom，不运行 brew）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.manager.command_pool, self.manager.get_inventory)
+
+    async def get_installed_packages(self) -> List[str]:
+        """获取已安装的包列表"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.manager.command_pool, self.manager.get_installed_packages)
+
+    async def get_services(self) -> List[ServiceRecord]:
+        """查询所有服务的状态并更新 BrewManager 缓存的快照"""
+        return await self._query(self.manager.get_services)
+
+    async def refresh_service(self, service_name: str) -> Optional[ServiceRecord]:
+        """只重新查询一个服务的状态"""
+        return await self._query(self.manager.refresh_service, service_name)
+
+    async def search_package(self, query: str, within: Optional[Iterable[str]] = None) -> List[str]:
+        """搜索包：优先使用本地索引，不可用时运行 brew search"""
+        return await self._query(self.manager.search_package, query, within)
+
+    async def manage_service(self, service_name: str, action: str) -> Tuple[bool, str]:
+        """管理服务（启动/停止/重启）"""
+        return await self._operation(self.manager.manage_service, service_name, action)
+
+    async def manage_services(self, service_names: List[str], action: str) -> Tuple[bool, str]:
+        """并行管理多个服务，汇总每个服务的结果"""
+        return await self._operation(self.manager.manage_services, service_names, action)
+
+    async def install_package(self, package_name: str) -> Tuple[bool, str]:
+        """安装包"""
+        return await self.install_packages([package_name])
+
+    async def install_packages(self, package_names: List[str]) -> Tuple[bool, str]:
+        """用一条 brew install 命令安装多个包"""
+        return await self._operation(self.manager.install_packages, package_names)
+
+    async def uninstall_package(self, package_name: str, ignore_dependencies: bool = False) -> Tuple[bool, str]:
+        """卸载包"""
+        package_name = str(package_name).strip()
+        if not package_name:
+            return False, "包名不能为空"
+        return await self.uninstall_packages([package_name], ignore_dependencies)
+
+    async def uninstall_packages(self, package_names: List[str],
+                                 ignore_dependencies: bool = False) -> Tuple[bool, str]:
+        """用一条 brew uninstall 命令卸载多个包"""
+        return await self._operation(self.manager.uninstall_packages, package_names, ignore_dependencies)
@@ -0,0 +1,70 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Callable, Coroutine, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class AsyncBridge(QObject):
+    """把 asyncio 协程接入 Qt 事件循环
+
+    与 qasync 用 asyncio 接管 Qt 事件循环的做法不同，这里在后台线程中运行独立的 asyncio 事件循环，
+    协程结果通过队列信号回到 GUI 线程，Qt 主循环本身保持不变。
+    """
+    _completed = pyqtSignal(object, object)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="asyncio-bridge", daemon=True)
+        self._thread.start()
+        self._completed.connect(self._dispatch)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine, on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None) -> concurrent.futures.Future:
+        """在 asyncio 事件循环中运行协程，on_result/on_error 在 GUI 线程中调用
+
+        返回的 Future 可以 cancel()，协程会收到 CancelledError；AsyncBrewManager 的协程随之终止它正在运行的 brew 命令。
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def done(f: concurrent.futures.Future):
+            if f.cancelled():
+                return
+            error = f.exception()
+            if error is not None:
+                logging.error(f"Error in coroutine: {error}")
+                if on_error is not None:
+                    self._completed.emit(on_error, str(error))
+            elif on_result is not None:
+                self._completed.emit(on_result, f.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def _dispatch(self, callback: Callable, value: Any):
+        callback(value)
+
+    def shutdown(self, timeout: float = 3.0):
+        """取消所有协程并停止事件循环"""
+        if not self.loop.is_running():
+            return
+
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result(timeout)
+        except Exception as e:
+            logging.warning(f"Error cancelling coroutines: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
@@ -0,0 +1,81 @@
+"""比较磁盘占用统计的首次扫描、增量扫描与单线程扫描
+
+用法：
+    python benchmarks/bench_disk_usage.py --kegs 500 --files 50 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disk_usage import DISK_SCAN_WORKERS, DiskUsageAnalyzer  # noqa: E402
+
+
+def build_synthetic_prefix(root: str, kegs: int, files: int, versions: int) -> None:
+    """构造每个 keg 含若干子目录和文件的模拟 Homebrew 前缀与下载缓存"""
+    for i in range(kegs):
+        for v in range(versions):
+            for sub in ("bin", "lib", "share/doc"):
+                directory = os.path.join(root, "prefix", "Cellar", f"formula-{i:05d}", f"1.{v}.0", sub)
+                os.makedirs(directory)
+                for f in range(files // 3):
+                    with open(os.path.join(directory, f"file-{f}"), "wb") as out:
+                        out.write(b"x" * (1024 * (f % 8 + 1)))
+    downloads = os.path.join(root, "cache", "downloads")
+    os.makedirs(downloads)
+    for i in range(kegs // 2):
+        with open(os.path.join(downloads, f"bottle-{i}.tar.gz"), "wb") as out:
+            out.write(b"y" * 4096)
+
+
+def time_it(func, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    print(f"{label:<32} median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kegs", type=int, default=300)
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--versions", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=DISK_SCAN_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_synthetic_prefix(root, args.kegs, args.files, args.versions)
+        prefix = os.path.join(root, "prefix")
+        homebrew_cache = os.path.join(root, "cache")
+        cache_path = os.path.join(root, "disk_usage.json")
+        print(f"Synthetic prefix: {args.kegs} kegs x {args.versions} versions, ~{args.files} files each")
+
+        def cold(workers):
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            DiskUsageAnalyzer(prefix, homebrew_cache, cache_path, workers=workers).scan()
+
+        report("cold scan, 1 thread", time_it(lambda: cold(1), args.runs))
+        report(f"cold scan, {args.workers} threads", time_it(lambda: cold(args.workers), args.runs))
+
+        analyzer = DiskUsageAnalyzer(prefix, homebrew_cache, cache_path)
+        analyzer.scan()
+        report("incremental re-scan", time_it(analyzer.scan, args.runs))
+        result = analyzer.scan()
+        print(f"Installed {result.installed_bytes} bytes, reclaimable {result.reclaimable_bytes} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""比较已安装包列表的两种获取方式：直接扫描 Cellar 与 brew list
+
+用法：
+    python benchmarks/bench_inventory.py --kegs 5000 --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory import scan_prefix  # noqa: E402
+
+
+def build_synthetic_prefix(root: str, kegs: int, casks: int, versions: int) -> None:
+    """构造一个包含大量 keg 的模拟 Homebrew 前缀"""
+    for i in range(kegs):
+        name = f"formula-{i:05d}"
+        for v in range(versions):
+            keg = os.path.join(root, "Cellar", name, f"1.{v}.0")
+            os.makedirs(keg)
+            with open(os.path.join(keg, "INSTALL_RECEIPT.json"), "w") as f:
+                json.dump({
+                    "installed_on_request": i % 3 == 0,
+                    "installed_as_dependency": i % 3 != 0,
+                    "poured_from_bottle": True,
+                    "time": 1700000000 + i,
+                    "source": {"tap": "homebrew/core"},
+                    "runtime_dependencies": [
+                        {"full_name": f"formula-{(i + d) % kegs:05d}", "version": "1.0.0"}
+                        for d in range(1, 4)
+                    ],
+                }, f)
+    for i in range(casks):
+        os.makedirs(os.path.join(root, "Caskroom", f"cask-{i:05d}", "1.0.0"))
+
+
+def time_it(func, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    print(f"{label:<32} median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kegs", type=int, default=3000)
+    parser.add_argument("--casks", type=int, default=300)
+    parser.add_argument("--versions", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_synthetic_prefix(root, args.kegs, args.casks, args.versions)
+        print(f"Synthetic prefix: {args.kegs} kegs x {args.versions} versions, {args.casks} casks")
+        report("scandir (synthetic)", time_it(lambda: scan_prefix(root), args.runs))
+
+    # brew list 只能针对真实安装的前缀运行
+    try:
+        from brew_manager import BrewManager
+        manager = BrewManager()
+    except RuntimeError:
+        print("brew not found, skipping the brew list comparison")
+        return
+
+    print(f"Real prefix: {manager.prefix}")
+    report("scandir (real prefix)", time_it(lambda: scan_prefix(manager.prefix), args.runs))
+    report("brew list (real prefix)",
+           time_it(lambda: manager.run_command([manager.brew_path, "list"]), max(1, args.runs // 5)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""比较端口扫描后端的耗时：/proc 快速路径、psutil 与 lsof
+
+用法：
+    python benchmarks/bench_ports.py --sockets 3000 --runs 5
+
+--sockets 会在本进程中额外打开指定数量的监听 socket，模拟有大量 socket 的主机。
+"""
+import argparse
+import os
+import resource
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from port_scanner import BACKENDS  # noqa: E402
+
+
+def open_listeners(count: int) -> list:
+    """打开 count 个监听 socket（必要时提高文件描述符上限）"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = count + 256
+    if soft < wanted:
+        limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            s.listen(1)
+            sockets.append(s)
+    except OSError as e:
+        print(f"Could only open {len(sockets)} sockets: {e}")
+    return sockets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sockets = open_listeners(args.sockets)
+    print(f"Opened {len(sockets)} extra listening sockets")
+
+    for name, backend in BACKENDS:
+        timings = []
+        found = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            result = backend()
+            timings.append((time.perf_counter() - started) * 1000)
+            if result is None:
+                break
+            found = len(result)
+        if found is None:
+            print(f"{name:<8} unavailable on this host")
+            continue
+        print(f"{name:<8} {found:6d} listeners   median {statistics.median(timings):9.2f} ms   "
+              f"min {min(timings):9.2f} ms")
+
+    for s in sockets:
+        s.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""测量 GUI 启动性能：模块导入耗时（python -X importtime）与窗口首次绘制耗时
+
+用法：
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子进程中启动窗口：收到 brew_gui.startup 的首次绘制记录后输出耗时并退出，不加载任何数据
+FIRST_PAINT_DRIVER = """
+import logging
+import sys
+import time
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+import main
+
+
+class FirstPaintHandler(logging.Handler):
+    def emit(self, record):
+        if record.getMessage().startswith("Startup: time to first paint"):
+            elapsed = (time.perf_counter() - main.STARTUP_STARTED_AT) * 1000
+            print(f"first_paint_ms={elapsed:.1f}", flush=True)
+            QTimer.singleShot(0, QApplication.quit)
+
+
+main.startup_logger.addHandler(FirstPaintHandler())
+main.BrewGUI.load_initial_data = lambda self: None
+app = QApplication(sys.argv)
+window = main.BrewGUI()
+window.show()
+sys.exit(app.exec())
+"""
+
+
+def measure_imports(top: int) -> None:
+    """运行 python -X importtime 并列出累计耗时最多的模块"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # 格式：import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        rows.append((int(fields[1]), int(fields[0]), fields[2].strip()))
+    if not rows:
+        print(result.stderr.strip() or "no importtime output")
+        return
+
+    total = max(cumulative for cumulative, _, _ in rows)
+    print(f"import main: {total / 1000:.1f} ms cumulative")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+
+def measure_first_paint(runs: int) -> None:
+    """多次启动窗口，记录首次绘制时间与进程总耗时"""
+    first_paint = []
+    wall = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", FIRST_PAINT_DRIVER], cwd=ROOT,
+                                capture_output=True, text=True, timeout=60)
+        wall.append((time.perf_counter() - started) * 1000)
+        for line in result.stdout.splitlines():
+            if line.startswith("first_paint_ms="):
+                first_paint.append(float(line.split("=", 1)[1]))
+                break
+        else:
+            print(f"the window did not report a first paint:\n{result.stderr.strip()}")
+            return
+
+    print(f"first paint (after main.py import starts): median {statistics.median(first_paint):.1f} ms, "
+          f"min {min(first_paint):.1f} ms")
+    print(f"process wall time to first paint:          median {statistics.median(wall):.1f} ms, "
+          f"min {min(wall):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    measure_imports(args.top)
+    print()
+    measure_first_paint(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,52 @@
 import subprocess
-from typing import List, Tuple
+import queue
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 import os
 import shlex
+import json
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+
+from command_result import CommandResult, reap
+from dependency_graph import DependencyGraph
+from disk_usage import DiskUsageAnalyzer, DiskUsageReport
+from operation_scheduler import ItemDone, exclusive, scheduler_for_prefix
+from metrics import MetricsRegistry, timed
+from inventory import InventoryCache, list_installed_names, scan_package, scan_prefix
+from package_info import PackageInfo, PackageInfoFetcher
+from search_index import SearchIndex
+from services import ServiceRecord, parse_services_json, parse_services_list
+from upgrades import OutdatedPackage, UpgradePlan, UpgradeStep, parse_fetch_output, parse_outdated_json
+
+# 同时运行的 brew 进程数上限
+MAX_BREW_PROCESSES = 3
+# 流式读取输出时，读线程与消费者之间最多缓冲的行数
+STREAM_QUEUE_SIZE = 1000
+# 流式执行命令时保留的最后若干行输出（用于结果消息和错误解析）
+STREAM_TAIL_LINES = 200
+# 批量管理服务时默认同时执行的操作数（实际并发还受 MAX_BREW_PROCESSES 限制）
+MAX_PARALLEL_SERVICE_OPERATIONS = MAX_BREW_PROCESSES
+# 服务操作的显示名称
+SERVICE_ACTION_NAMES = {"start": "启动", "stop": "停止", "restart": "重启"}
+# 批量安装/卸载操作的显示名称
+OPERATION_ACTION_NAMES = {"install": "安装", "uninstall": "卸载"}
+# 升级时同时下载的包数（实际并发还受 MAX_BREW_PROCESSES 限制）
+MAX_PARALLEL_FETCHES = MAX_BREW_PROCESSES
+# brew install/uninstall 输出中表示一个包已处理完的行，第一个非空分组为包名：
+# "🍺  /opt/homebrew/Cellar/wget/1.24.5: 92 files"、"🍺  firefox was successfully installed!"、
+# "Uninstalling /opt/homebrew/Cellar/wget/1.24.5... (92 files)"、"==> Uninstalling Cask firefox"
+PACKAGE_DONE_PATTERN = re.compile(
+    r"^(?:🍺\s+(?:\S*/Cellar/([^/\s]+)/|(\S+) was successfully installed)"
+    r"|Uninstalling \S*/(?:Cellar|Caskroom)/([^/\s]+)/"
+    r"|==> Uninstalling Cask (\S+))"
+)
+# 升级的安装阶段使用的额外环境变量：包列表已在下载前确定，不再自动更新 Homebrew
+UPGRADE_ENV = {"HOMEBREW_NO_AUTO_UPDATE": "1"}
 
 # 配置日志
 logging.basicConfig(
@@ -29,6 +73,34 @@ class BrewManager:
             logging.error("Could not find brew executable")
             raise RuntimeError("找不到 brew 命令，请确保已安装 Homebrew")
 
+        # Homebrew 前缀，例如 /opt/homebrew 或 /usr/local
+        self.prefix = os.path.dirname(os.path.dirname(self.brew_path))
+        self.inventory_cache = InventoryCache(self.prefix)
+        # 每条 brew 命令和每次公开方法调用的次数、耗时分布与输出量，显示在诊断页
+        self.metrics = MetricsRegistry()
+        # 修改前缀的操作（安装、卸载、升级、服务管理）在同一前缀上逐个执行，只读查询不受限制
+        self.scheduler = scheduler_for_prefix(self.prefix)
+        self.search_index = SearchIndex(fallback_loader=self.load_catalogue)
+        # 包详情面板使用的 brew info 元数据（批量查询，内存中 LRU 缓存）
+        self.package_info = PackageInfoFetcher(self.run_command, self.brew_path)
+        # Cellar/Caskroom 与下载缓存的磁盘占用统计
+        self.disk_usage = DiskUsageAnalyzer(self.prefix)
+        # 已安装包的依赖关系，首次使用时构建，之后在安装/卸载/升级后增量更新；
+        # Cellar/Caskroom 的指纹变化（例如在终端中安装或卸载了包）时重新构建
+        self._dependency_graph: Optional[DependencyGraph] = None
+        self._graph_fingerprint: Optional[Dict[str, Optional[int]]] = None
+        self._graph_lock = threading.Lock()
+        # 可取消的正在运行的进程 {key: [Popen]}，同一个 key 下可以同时有多个进程（例如批量管理服务）
+        self._processes: Dict[str, List[subprocess.Popen]] = {}
+        self._processes_lock = threading.Lock()
+        self._process_slots = threading.BoundedSemaphore(MAX_BREW_PROCESSES)
+        # 一个操作内部需要同时运行多条命令时（例如升级时并行下载）共用的线程池；
+        # 提交到这里的任务只运行命令，不会再等待这个线程池中的其他任务
+        self.command_pool = ThreadPoolExecutor(MAX_BREW_PROCESSES, thread_name_prefix="brew-command")
+        # 最近一次查询到的服务状态 {服务名: ServiceRecord}，按 brew 输出的顺序排列
+        self._services: Dict[str, ServiceRecord] = {}
+        self._services_lock = threading.Lock()
+
         # 获取完整的环境变量
         self.env = os.environ.copy()
         # 确保包含 Homebrew 的路径
@@ -48,8 +120,13 @@ class BrewManager:
                 packages.append(line.strip())
         return packages
 
-    def run_command(self, command: List[str]) -> Tuple[str, str]:
-        """运行 brew 命令并返回输出结果"""
+    def run_command(self, command: List[str], process_key: Optional[str] = None) -> CommandResult:
+        """运行 brew 命令并返回执行结果（退出码、输出、耗时、峰值内存）
+
+        同时运行的进程数不超过 MAX_BREW_PROCESSES，超出时阻塞等待。
+        指定 process_key 时，可以通过 cancel_process(process_key) 终止该命令。
+        """
+        started = time.perf_counter()
         try:
             # 使用完整路径替换 'brew' 命令
             if command[0] == "brew":
@@ -58,107 +135,765 @@ class BrewManager:
             logging.debug(f"Executing command: {' '.join(command)}")
             logging.debug(f"Environment PATH: {self.env.get('PATH')}")
             
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=self.env
-            )
-            stdout, stderr = process.communicate()
+            with self._process_slots:
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    env=self.env
+                )
+                self._register_process(process_key, process)
+                try:
+                    # 自行读取两个管道再用 wait4 回收进程，以便拿到这个进程的 rusage
+                    stderr_chunks = []
+                    stderr_reader = threading.Thread(
+                        target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+                    )
+                    stderr_reader.start()
+                    stdout = process.stdout.read()
+                    stderr_reader.join()
+                    stderr = "".join(stderr_chunks)
+                    process.stdout.close()
+                    process.stderr.close()
+                    peak_rss = reap(process)
+                finally:
+                    self._unregister_process(process_key, process)
             
             if stdout:
                 logging.debug(f"Command stdout: {stdout}")
             if stderr:
                 logging.debug(f"Command stderr: {stderr}")
                 
-            return stdout.strip(), stderr.strip()
+            result = CommandResult(command, process.returncode, stdout.strip(), stderr.strip(),
+                                   time.perf_counter() - started, peak_rss)
         except Exception as e:
             logging.error(f"Error executing command: {e}")
-            return "", str(e)
+            result = CommandResult(command, None, "", str(e), time.perf_counter() - started)
+        self.metrics.record_command(result)
+        return result
+
+    def stream_command(self, command: List[str], process_key: Optional[str] = None,
+                       extra_env: Optional[Dict[str, str]] = None) -> Iterator[Tuple[str, str]]:
+        """运行命令并逐行产出 (stream, line)，stream 为 "stdout" 或 "stderr"
+
+        两个管道各由一个线程读取，经有界队列交给调用方，调用方处理不过来时读线程会阻塞，
+        因此无论命令输出多少，内存占用都保持不变。提前关闭生成器会终止命令。
+        extra_env 中的变量只对这一条命令生效。
+        生成器结束时的返回值（StopIteration.value）为 (退出码, 峰值常驻内存)。
+        """
+        if command[0] == "brew":
+            command[0] = self.brew_path
+        logging.debug(f"Streaming command: {' '.join(command)}")
+
+        with self._process_slots:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env={**self.env, **extra_env} if extra_env else self.env
+            )
+            self._register_process(process_key, process)
+
+            lines = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+            def pump(pipe, name):
+                try:
+                    for line in pipe:
+                        lines.put((name, line.rstrip("\n")))
+                finally:
+                    pipe.close()
+                    lines.put((name, None))
+
+            readers = [
+                threading.Thread(target=pump, args=(process.stdout, "stdout"), daemon=True),
+                threading.Thread(target=pump, args=(process.stderr, "stderr"), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+
+            try:
+                open_streams = len(readers)
+                while open_streams:
+                    name, line = lines.get()
+                    if line is None:
+                        open_streams -= 1
+                        continue
+                    yield name, line
+                peak_rss = reap(process)
+                return process.returncode, peak_rss
+            finally:
+                if process.poll() is None:
+                    process.terminate()
+                    # 让读线程把剩余输出放进队列后退出
+                    while any(reader.is_alive() for reader in readers):
+                        try:
+                            lines.get(timeout=0.1)
+                        except queue.Empty:
+                            pass
+                    process.wait()
+                self._unregister_process(process_key, process)
+
+    def run_command_streaming(self, command: List[str], on_output: Optional[Callable[[str], None]] = None,
+                              process_key: Optional[str] = None,
+                              extra_env: Optional[Dict[str, str]] = None) -> CommandResult:
+        """流式运行命令，每行输出都回调 on_output，返回值与 run_command 相同
+
+        返回结果中的 stdout/stderr 只包含最后 STREAM_TAIL_LINES 行。
+        """
+        stdout_tail = deque(maxlen=STREAM_TAIL_LINES)
+        stderr_tail = deque(maxlen=STREAM_TAIL_LINES)
+        # 尾部只保留部分输出，输出量在读取时累计
+        output_bytes = 0
+        started = time.perf_counter()
+        lines = self.stream_command(command, process_key, extra_env)
+        try:
+            while True:
+                try:
+                    stream, line = next(lines)
+                except StopIteration as stop:
+                    returncode, peak_rss = stop.value
+                    break
+                (stdout_tail if stream == "stdout" else stderr_tail).append(line)
+                output_bytes += len(line.encode()) + 1
+                if on_output is not None:
+                    on_output(line)
+        except Exception as e:
+            logging.error(f"Error executing command: {e}")
+            lines.close()
+            result = CommandResult(command, None, "", str(e), time.perf_counter() - started)
+        else:
+            result = CommandResult(command, returncode, "\n".join(stdout_tail).strip(),
+                                   "\n".join(stderr_tail).strip(), time.perf_counter() - started, peak_rss)
+        self.metrics.record_command(result, output_bytes)
+        return result
+
+    def _register_process(self, process_key: Optional[str], process: subprocess.Popen):
+        if process_key:
+            with self._processes_lock:
+                self._processes.setdefault(process_key, []).append(process)
+
+    def _unregister_process(self, process_key: Optional[str], process: subprocess.Popen):
+        if process_key:
+            with self._processes_lock:
+                processes = self._processes.get(process_key, [])
+                if process in processes:
+                    processes.remove(process)
+                if not processes:
+                    self._processes.pop(process_key, None)
 
+    def cancel_process(self, process_key: str) -> bool:
+        """终止通过 process_key 登记的所有正在运行的命令，没有可终止的命令时返回 False"""
+        with self._processes_lock:
+            processes = [process for process in self._processes.get(process_key, []) if process.poll() is None]
+        if not processes:
+            return False
+        logging.info(f"Cancelling running command: {process_key}")
+        for process in processes:
+            process.terminate()
+        return True
+
+    @timed()
+    def get_inventory(self) -> List[Dict[str, Any]]:
+        """获取已安装包的详细记录（名称、类型、版本、安装回执）"""
+        cached = self.inventory_cache.load()
+        if cached is not None:
+            logging.info(f"Loaded {len(cached)} installed packages from cache")
+            return cached
+
+        fingerprint = self.inventory_cache.fingerprint()
+        records = scan_prefix(self.prefix)
+        if records is None:
+            # 无法识别的目录结构，回退到 brew list
+            logging.info(f"Unrecognised Homebrew layout at {self.prefix}, falling back to brew list")
+            result = self.run_command([self.brew_path, "list"])
+            if not result.success:
+                logging.error(f"Error getting package list: {result.stderr}")
+                return []
+            records = [
+                {"name": name, "type": None, "versions": [], "receipt": None}
+                for name in self.parse_brew_list_output(result.stdout)
+            ]
+
+        logging.info(f"Found {len(records)} installed packages")
+        self.inventory_cache.store(records, fingerprint)
+        # 缓存未命中说明已安装的包可能变了，依赖关系用同一份记录重新构建
+        self._store_dependency_graph(DependencyGraph.from_inventory(records), fingerprint)
+        return records
+
+    @timed()
     def get_installed_packages(self) -> List[str]:
         """获取已安装的包列表"""
         try:
-            stdout, stderr = self.run_command([self.brew_path, "list"])
-            if stderr:
-                logging.error(f"Error getting package list: {stderr}")
-                return []
-            
-            packages = self.parse_brew_list_output(stdout)
-            logging.info(f"Found {len(packages)} installed packages")
-            return packages
+            records = self.get_inventory()
+            # 顺便用同一份记录构建依赖关系，之后卸载确认时可以直接查询
+            self.dependency_graph(records)
+            return [record["name"] for record in records]
         except Exception as e:
             logging.error(f"Error in get_installed_packages: {e}")
             return []
 
+    def invalidate_inventory(self, package_names: Optional[Iterable[str]] = None):
+        """在安装/卸载后使已安装包缓存失效，package_names 的元数据和磁盘占用统计也一并失效"""
+        self.inventory_cache.invalidate()
+        self.package_info.cache.invalidate(package_names)
+        self.disk_usage.invalidate()
+
+    @timed()
+    def get_disk_usage(self) -> DiskUsageReport:
+        """统计每个包、旧版本和下载缓存占用的磁盘空间"""
+        return self.disk_usage.scan()
+
+    @timed()
+    def get_package_info(self, package_names: List[str]) -> Dict[str, Optional[PackageInfo]]:
+        """批量获取包的元数据，已缓存的包不再运行 brew info"""
+        return self.package_info.fetch(package_names)
+
+    def dependency_graph(self, records: Optional[List[Dict[str, Any]]] = None) -> DependencyGraph:
+        """返回已安装包的依赖关系
+
+        尚未构建或 Cellar/Caskroom 的指纹已变化时，从 records（默认 get_inventory()）重新构建。
+        """
+        graph = self.cached_dependency_graph()
+        if graph is not None:
+            return graph
+        fingerprint = self.inventory_cache.fingerprint()
+        if records is None:
+            records = self.get_inventory()
+            graph = self.cached_dependency_graph()
+            if graph is not None:
+                # get_inventory() 未命中缓存时已经重新构建
+                return graph
+        graph = DependencyGraph.from_inventory(records)
+        self._store_dependency_graph(graph, fingerprint)
+        return graph
+
+    def cached_dependency_graph(self) -> Optional[DependencyGraph]:
+        """已构建且仍然有效的依赖关系，否则返回 None（供界面线程使用，只读取两个目录的 mtime）"""
+        fingerprint = self.inventory_cache.fingerprint()
+        with self._graph_lock:
+            if self._dependency_graph is not None and self._graph_fingerprint == fingerprint:
+                return self._dependency_graph
+        return None
+
+    def _store_dependency_graph(self, graph: Optional[DependencyGraph],
+                                fingerprint: Optional[Dict[str, Optional[int]]]):
+        with self._graph_lock:
+            self._dependency_graph = graph
+            self._graph_fingerprint = fingerprint
+
+    @timed()
+    def refresh_dependency_graph(self, package_names: Iterable[str] = ()):
+        """安装/卸载/升级后增量更新依赖关系
+
+        只列出一次 Cellar/Caskroom 目录，重新读取新增的包和 package_names 中的包，删除已消失的包，
+        不必重新扫描所有安装回执。尚未构建时什么也不做。
+        """
+        with self._graph_lock:
+            graph = self._dependency_graph
+        if graph is None:
+            return
+        fingerprint = self.inventory_cache.fingerprint()
+        installed = list_installed_names(self.prefix)
+        if installed is None:
+            # 无法识别的目录结构，下次使用时重新构建
+            self._store_dependency_graph(None, None)
+            return
+        known = graph.names()
+        changed = (installed.keys() - known) | {name.split("/")[-1] for name in package_names}
+        for name in known - installed.keys():
+            graph.update(name, None)
+        for name in changed:
+            graph.update(name, scan_package(self.prefix, name) if name in installed else None)
+        self._store_dependency_graph(graph, fingerprint)
+
     def install_package(self, package_name: str) -> Tuple[bool, str]:
         """安装包"""
-        stdout, stderr = self.run_command([self.brew_path, "install", package_name])
-        success = not stderr
-        message = stdout if success else stderr
-        return success, message
+        return self.install_packages([package_name])
+
+    @exclusive(lambda package_names, on_output=None, on_event=None, process_key=None:
+               (f"安装 {' '.join(package_names)}", ("install", tuple(package_names))))
+    @timed()
+    def install_packages(self, package_names: List[str],
+                         on_output: Optional[Callable[[str], None]] = None,
+                         on_event: Optional[Callable[[ItemDone], None]] = None,
+                         process_key: Optional[str] = None) -> Tuple[bool, str]:
+        """用一条 brew install 命令安装多个包，on_output 逐行接收命令输出，on_event 接收每个包的 ItemDone
+
+        指定 process_key 时，可以通过 cancel_process(process_key) 终止安装命令。
+        """
+        on_output, finish = self.track_packages(package_names, on_output, on_event)
+        result = self.run_command_streaming([self.brew_path, "install"] + list(package_names), on_output,
+                                            process_key)
+        finish(result.success)
+        self.invalidate_inventory(package_names)
+        self.refresh_dependency_graph(package_names)
+        return result.success, result.message
 
     def uninstall_package(self, package_name: str, ignore_dependencies: bool = False) -> Tuple[bool, str]:
         """卸载包"""
+        # 确保包名是字符串并去除多余的空格
+        package_name = str(package_name).strip()
+        if not package_name:
+            return False, "包名不能为空"
+        return self.uninstall_packages([package_name], ignore_dependencies)
+
+    @exclusive(lambda package_names, ignore_dependencies=False, on_output=None, on_event=None, process_key=None:
+               (f"卸载 {' '.join(package_names)}", ("uninstall", tuple(package_names), ignore_dependencies)))
+    @timed()
+    def uninstall_packages(self, package_names: List[str], ignore_dependencies: bool = False,
+                           on_output: Optional[Callable[[str], None]] = None,
+                           on_event: Optional[Callable[[ItemDone], None]] = None,
+                           process_key: Optional[str] = None) -> Tuple[bool, str]:
+        """用一条 brew uninstall 命令卸载多个包，依赖者排在被依赖者之前"""
+        package_text = " ".join(package_names)
         try:
-            logging.info(f"Attempting to uninstall package: {package_name} (ignore_dependencies: {ignore_dependencies})")
-            
-            # 确保包名是字符串并去除多余的空格
-            package_name = str(package_name).strip()
-            if not package_name:
-                return False, "包名不能为空"
-
-            command = [self.brew_path, "uninstall"]
-            if ignore_dependencies:
-                command.append("--ignore-dependencies")
-            command.append(package_name)
-            
-            stdout, stderr = self.run_command(command)
-            
-            # 如果有错误输出
-            if stderr:
-                logging.warning(f"Uninstall error for {package_name}: {stderr}")
-                # 检查是否是依赖关系错误
-                if "because it is required by" in stderr:
-                    try:
-                        # 尝试解析依赖包列表
-                        deps_start = stderr.find("because it is required by") + 25
-                        deps_end = stderr.find(", which are currently installed")
-                        if deps_end == -1:  # 如果找不到结束标记，使用整个剩余字符串
-                            deps_end = len(stderr)
-                        dependent_packages = stderr[deps_start:deps_end]
-                        return False, f"无法卸载：该包被以下包依赖：\n{dependent_packages}\n\n是否强制卸载？"
-                    except Exception as e:
-                        logging.error(f"Error parsing dependency message: {e}")
-                        return False, f"卸载失败：{stderr}"
-                else:
-                    return False, f"卸载失败：{stderr}"
-            
-            # 如果没有错误输出
-            logging.info(f"Successfully uninstalled package: {package_name}")
-            return True, stdout if stdout else "卸载成功"
+            logging.info(f"Attempting to uninstall package: {package_text} (ignore_dependencies: {ignore_dependencies})")
+
+            if not ignore_dependencies:
+                # 依赖关系已知时直接拒绝，不必先运行 brew uninstall 再解析错误输出
+                blockers = self.dependency_graph().blocking_dependents(package_names)
+                if blockers:
+                    return False, self.format_dependents_message(blockers)
+
+            command = self.build_uninstall_command(package_names, ignore_dependencies)
+            on_output, finish = self.track_packages(package_names, on_output, on_event)
+            result = self.run_command_streaming(command, on_output, process_key)
+            finish(result.success)
+            self.invalidate_inventory(package_names)
+            self.refresh_dependency_graph(package_names)
+            return self.parse_uninstall_result(package_text, result)
             
         except Exception as e:
             logging.error(f"Unexpected error in uninstall_package: {e}")
             return False, f"发生错误：{str(e)}"
 
-    def get_services(self) -> List[str]:
-        """获取服务列表"""
-        stdout, _ = self.run_command([self.brew_path, "services", "list"])
-        return stdout.split("\n")[1:] if stdout else []  # Skip header line
+    @staticmethod
+    def parse_done_package(line: str) -> Optional[str]:
+        """从 brew install/uninstall 的一行输出中识别已处理完的包，返回包名"""
+        match = PACKAGE_DONE_PATTERN.match(line)
+        if match is None:
+            return None
+        return next(group for group in match.groups() if group)
+
+    def track_packages(self, package_names: List[str], on_output: Optional[Callable[[str], None]],
+                       on_event: Optional[Callable[[ItemDone], None]]):
+        """包装 on_output，请求中的包处理完时通过 on_event 发出 ItemDone，返回 (on_output, finish)
+
+        只统计 package_names 中的包，顺带安装的依赖不计入。命令结束后调用 finish(success)，
+        为输出中没有完成行的包（例如已经安装的包）补发事件。
+        """
+        if on_event is None:
+            return on_output, lambda success: None
+        # 输出中的包名不带 tap 前缀
+        pending = {name.rsplit("/", 1)[-1]: name for name in package_names}
 
-    def manage_service(self, service_name: str, action: str) -> Tuple[bool, str]:
+        def track(line: str):
+            if on_output is not None:
+                on_output(line)
+            name = pending.pop(self.parse_done_package(line), None)
+            if name is not None:
+                on_event(ItemDone(name, True))
+
+        def finish(success: bool):
+            for name in pending.values():
+                on_event(ItemDone(name, success))
+            pending.clear()
+        return track, finish
+
+    def build_uninstall_command(self, package_names: List[str], ignore_dependencies: bool = False) -> List[str]:
+        """构造 brew uninstall 命令"""
+        command = [self.brew_path, "uninstall"]
+        if ignore_dependencies:
+            command.append("--ignore-dependencies")
+        command.extend(self.order_leaves_first(package_names))
+        return command
+
+    @staticmethod
+    def format_dependents_message(blockers: Dict[str, List[str]]) -> str:
+        """把 blocking_dependents() 的结果格式化为与 parse_uninstall_result 相同的依赖错误消息"""
+        lines = [f"{name}：{', '.join(dependents)}" for name, dependents in sorted(blockers.items())]
+        dependent_packages = "\n".join(lines)
+        return f"无法卸载：该包被以下包依赖：\n{dependent_packages}\n\n是否强制卸载？"
+
+    @timed()
+    def remove_orphans(self, on_output: Optional[Callable[[str], None]] = None,
+                       on_event: Optional[Callable[[ItemDone], None]] = None) -> Tuple[bool, str]:
+        """卸载不再被任何主动安装的包需要的依赖"""
+        orphans = self.dependency_graph().orphans()
+        if not orphans:
+            return True, "没有孤立的依赖"
+        return self.uninstall_packages(orphans, on_output=on_output, on_event=on_event)
+
+    @staticmethod
+    def parse_uninstall_result(package_text: str, result: CommandResult) -> Tuple[bool, str]:
+        """根据 brew uninstall 的退出码判断结果，识别依赖关系错误"""
+        stdout, stderr = result.stdout, result.stderr
+        if not result.success:
+            logging.warning(f"Uninstall error for {package_text}: {stderr}")
+            # 检查是否是依赖关系错误
+            if result.error_kind == "dependency":
+                try:
+                    # 尝试解析依赖包列表
+                    deps_start = stderr.find("because it is required by") + 25
+                    deps_end = stderr.find(", which are currently installed")
+                    if deps_end == -1:  # 如果找不到结束标记，使用整个剩余字符串
+                        deps_end = len(stderr)
+                    dependent_packages = stderr[deps_start:deps_end]
+                    return False, f"无法卸载：该包被以下包依赖：\n{dependent_packages}\n\n是否强制卸载？"
+                except Exception as e:
+                    logging.error(f"Error parsing dependency message: {e}")
+                    return False, f"卸载失败：{stderr}"
+            else:
+                return False, f"卸载失败：{result.message}"
+
+        # 退出码为 0 时 stderr 中只有警告
+        logging.info(f"Successfully uninstalled package: {package_text}")
+        return True, stdout if stdout else "卸载成功"
+
+    def order_leaves_first(self, package_names: List[str]) -> List[str]:
+        """按已安装的依赖关系排序，使依赖其他包的包排在前面"""
+        graph = self.dependency_graph()
+
+        batch = list(dict.fromkeys(package_names))
+        # 依赖关系是传递闭包，因此被批次内越多包依赖的包越应靠后
+        dependents = {name: len(graph.dependents_of(name) & set(batch)) for name in batch}
+        return sorted(batch, key=lambda name: dependents[name])
+
+    @staticmethod
+    def plan_batches(jobs: List[Tuple[str, str, bool]]) -> List[Tuple[str, List[str], bool]]:
+        """把相邻且参数相同的操作合并为一批"""
+        batches = []
+        for action, package_name, ignore_dependencies in jobs:
+            if batches and batches[-1][0] == action and batches[-1][2] == ignore_dependencies:
+                if package_name not in batches[-1][1]:
+                    batches[-1][1].append(package_name)
+            else:
+                batches.append((action, [package_name], ignore_dependencies))
+        return batches
+
+    @exclusive(lambda jobs, on_output=None, on_event=None:
+               (f"批量安装/卸载 {len(jobs)} 个包", ("operations", tuple(tuple(job) for job in jobs))))
+    @timed()
+    def run_operations(self, jobs: List[Tuple[str, str, bool]],
+                       on_output: Optional[Callable[[str], None]] = None,
+                       on_event: Optional[Callable[[ItemDone], None]] = None) -> Tuple[bool, str]:
+        """批量执行安装/卸载操作 [(action, package_name, ignore_dependencies)]，返回汇总结果
+
+        相邻且参数相同的操作合并为一条 brew 命令；排队中的相同批量操作合并为一次执行。
+        某一批失败时停止，消息中列出未执行的操作。
+        """
+        for action, _, _ in jobs:
+            if action not in OPERATION_ACTION_NAMES:
+                raise ValueError(f"Invalid action: {action}")
+
+        batches = self.plan_batches(jobs)
+        messages = []
+        for index, (action, package_names, ignore_dependencies) in enumerate(batches):
+            logging.info(f"Running batch {action}: {' '.join(package_names)}")
+            if action == "install":
+                success, message = self.install_packages(package_names, on_output, on_event)
+            else:
+                success, message = self.uninstall_packages(package_names, ignore_dependencies, on_output, on_event)
+            if not success:
+                # 后续批次可能依赖本批次的结果，出错即停止
+                skipped = [f"{OPERATION_ACTION_NAMES[skipped_action]} {' '.join(names)}"
+                           for skipped_action, names, _ in batches[index + 1:]]
+                if skipped:
+                    message += "\n\n以下操作未执行：\n" + "\n".join(skipped)
+                return False, message
+            messages.append(message)
+        return True, "\n".join(message for message in messages if message)
+
+    @timed()
+    def get_outdated(self) -> List[OutdatedPackage]:
+        """查询有新版本的 formula 和 cask"""
+        result = self.run_command([self.brew_path, "outdated", "--json=v2"])
+        packages = parse_outdated_json(result.stdout) if result.stdout else None
+        if packages is None:
+            if not result.success:
+                logging.error(f"Error getting outdated packages: {result.stderr}")
+            return []
+        return packages
+
+    @timed()
+    def plan_upgrade(self, package_names: Optional[List[str]] = None) -> UpgradePlan:
+        """生成升级计划；package_names 为 None 时包含所有可升级的包
+
+        被依赖的 formula 排在依赖它的 formula 之前，cask 排在最后。
+        这样升级某个包时它的依赖已经是新版本，不会被 brew 顺带升级而让后面的步骤报错。
+        固定（pinned）的包保留在计划中，但不会被升级。
+        """
+        packages = self.get_outdated()
+        if package_names is not None:
+            wanted = set(package_names)
+            packages = [package for package in packages if package.name in wanted]
+
+        graph = self.dependency_graph()
+        names = {package.name for package in packages}
+        # 依赖关系是传递闭包，依赖计划中越多包的包越应靠后
+        depth = {package.name: len(graph.dependencies_of(package.name) & names) for package in packages}
+        packages.sort(key=lambda package: (package.kind == "cask", depth[package.name]))
+        return UpgradePlan.from_outdated(packages)
+
+    def map_commands(self, func: Callable[[Any], Any], items: Iterable[Any], max_parallel: int,
+                     on_start: Optional[Callable[[Any], None]] = None) -> Iterator[Tuple[Any, Future]]:
+        """在 command_pool 中最多同时运行 max_parallel 个 func(item)，按完成顺序产出 (item, future)
+
+        on_start 在调用线程中、提交每一项之前调用。func 只应运行命令，不能再等待 command_pool 中的任务。
+        """
+        pending = deque(items)
+        running: Dict[Future, Any] = {}
+        while pending or running:
+            while pending and len(running) < max(1, max_parallel):
+                item = pending.popleft()
+                if on_start is not None:
+                    on_start(item)
+                running[self.command_pool.submit(func, item)] = item
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield running.pop(future), future
+
+    def fetch_upgrade(self, step: UpgradeStep) -> UpgradeStep:
+        """用 brew fetch 下载一个包的新版本，返回记录了大小和耗时的新步骤（不修改传入的步骤）"""
+        command = [self.brew_path, "fetch", "--retry"]
+        if step.package.kind == "cask":
+            command.append("--cask")
+        command.append(step.name)
+
+        result = self.run_command(command)
+        path, cached = parse_fetch_output(result.stdout)
+        if path is None:
+            # 下载失败不影响安装阶段，brew upgrade 会自己再下载一次
+            return replace(step, stage="fetch_failed", fetch_seconds=result.wall_seconds,
+                           message=result.stderr or result.stdout)
+        try:
+            download_bytes = os.path.getsize(path)
+        except OSError:
+            download_bytes = 0
+        return replace(step, stage="fetched", fetch_seconds=result.wall_seconds,
+                       download_bytes=download_bytes, cached=cached)
+
+    @timed()
+    def fetch_upgrades(self, plan: UpgradePlan, max_parallel: int = MAX_PARALLEL_FETCHES,
+                       on_output: Optional[Callable[[str], None]] = None,
+                       on_event: Optional[Callable[[UpgradePlan], None]] = None) -> UpgradePlan:
+        """升级的第一阶段：在 command_pool 中最多同时下载 max_parallel 个包
+
+        只有调用线程修改 plan，每次变化后通过 on_event 发出 plan.snapshot()。
+        """
+        def publish():
+            if on_event is not None:
+                on_event(plan.snapshot())
+
+        def start(item):
+            plan.steps[item[0]].stage = "fetching"
+            publish()
+
+        # 提交给线程池的是步骤的副本，结果在这里写回计划
+        items = [(index, replace(step)) for index, step in enumerate(plan.steps) if step.stage != "pinned"]
+        plan.fetch_started = time.perf_counter()
+        for (index, _), future in self.map_commands(lambda item: self.fetch_upgrade(item[1]), items,
+                                                    max_parallel, on_start=start):
+            step = plan.steps[index]
+            try:
+                step = plan.steps[index] = future.result()
+            except Exception as e:
+                logging.error(f"Error fetching {step.name}: {e}")
+                step.stage = "fetch_failed"
+                step.message = str(e)
+            if on_output is not None:
+                on_output(f"下载 {step.name}：{'失败' if step.stage == 'fetch_failed' else '完成'}")
+            publish()
+        plan.fetch_finished = time.perf_counter()
+        publish()
+        return plan
+
+    @exclusive(lambda plan, on_output=None, on_event=None: (f"升级 {len(plan.runnable_steps())} 个包", None))
+    @timed()
+    def install_upgrades(self, plan: UpgradePlan, on_output: Optional[Callable[[str], None]] = None,
+                         on_event: Optional[Callable[[UpgradePlan], None]] = None) -> UpgradePlan:
+        """升级的第二阶段：按计划顺序逐个运行 brew upgrade
+
+        brew 同一时间只允许一个安装进程，逐个执行也能分别记录每个包的耗时和结果。
+        下载阶段不修改前缀，不经过调度器，可以与其他操作同时进行。
+        与下载阶段一样只在调用线程中修改 plan，通过 on_event 发出快照。
+        """
+        def publish():
+            if on_event is not None:
+                on_event(plan.snapshot())
+
+        plan.install_started = time.perf_counter()
+        for step in plan.runnable_steps():
+            command = [self.brew_path, "upgrade"]
+            if step.package.kind == "cask":
+                command.append("--cask")
+            command.append(step.name)
+
+            step.stage = "installing"
+            publish()
+            if on_output is not None:
+                on_output(f"==> 升级 {step.name}")
+            result = self.run_command_streaming(command, on_output, extra_env=UPGRADE_ENV)
+            step.install_seconds = result.wall_seconds
+            step.stage = "done" if result.success else "failed"
+            step.message = result.message
+        plan.install_finished = time.perf_counter()
+        publish()
+        upgraded = [step.name for step in plan.runnable_steps()]
+        self.invalidate_inventory(upgraded)
+        self.refresh_dependency_graph(upgraded)
+        return plan
+
+    def run_upgrade_plan(self, plan: UpgradePlan, max_parallel: int = MAX_PARALLEL_FETCHES,
+                         on_output: Optional[Callable[[str], None]] = None,
+                         on_event: Optional[Callable[[UpgradePlan], None]] = None) -> UpgradePlan:
+        """执行升级计划：先并行下载所有包，再逐个安装
+
+        下载受网络限制、安装受磁盘和 brew 全局锁限制，分开执行时下载可以并行，
+        安装阶段只需解压已经下载好的文件。返回的计划中记录了每个包的大小和耗时。
+        """
+        if plan.runnable_steps():
+            self.fetch_upgrades(plan, max_parallel, on_output, on_event)
+            self.install_upgrades(plan, on_output, on_event)
+        return plan
+
+    @timed()
+    def get_services(self, process_key: Optional[str] = None) -> List[ServiceRecord]:
+        """查询所有服务的状态并更新缓存的快照"""
+        stdout = self.run_command([self.brew_path, "services", "info", "--all", "--json"], process_key).stdout
+        records = parse_services_json(stdout) if stdout else None
+        if records is None:
+            # 旧版 brew 不支持 services info --json
+            stdout = self.run_command([self.brew_path, "services", "list"], process_key).stdout
+            records = parse_services_list(stdout) if stdout else []
+        self.store_services(records)
+        return records
+
+    @timed()
+    def refresh_service(self, service_name: str, process_key: Optional[str] = None) -> Optional[ServiceRecord]:
+        """只重新查询一个服务的状态，返回更新后的记录（查询失败时返回 None）"""
+        result = self.run_command([self.brew_path, "services", "info", service_name, "--json"], process_key)
+        records = parse_services_json(result.stdout) if result.stdout else None
+        if not records:
+            logging.warning(f"Could not refresh service {service_name}: {result.stderr}")
+            return None
+        self.store_service(records[0])
+        return records[0]
+
+    def services_snapshot(self) -> List[ServiceRecord]:
+        """返回缓存的服务状态，不运行 brew"""
+        with self._services_lock:
+            return list(self._services.values())
+
+    def store_services(self, records: List[ServiceRecord]):
+        with self._services_lock:
+            self._services = {record.name: record for record in records}
+
+    def store_service(self, record: ServiceRecord):
+        with self._services_lock:
+            self._services[record.name] = record
+
+    @exclusive(lambda service_name, action, process_key=None:
+               (f"服务 {service_name} {action}", ("service", service_name, action)))
+    @timed()
+    def manage_service(self, service_name: str, action: str, process_key: Optional[str] = None) -> Tuple[bool, str]:
         """管理服务（启动/停止/重启）"""
+        return self._manage_service(service_name, action, process_key)
+
+    def _manage_service(self, service_name: str, action: str,
+                        process_key: Optional[str] = None) -> Tuple[bool, str]:
         if action not in ["start", "stop", "restart"]:
             return False, "Invalid action"
         
-        stdout, stderr = self.run_command([self.brew_path, "services", action, service_name])
-        success = not stderr
-        message = stdout if success else stderr
-        return success, message
-
-    def search_package(self, query: str) -> List[str]:
-        """搜索包"""
-        stdout, _ = self.run_command([self.brew_path, "search", query])
+        result = self.run_command([self.brew_path, "services", action, service_name], process_key)
+        return result.success, result.message
+
+    @exclusive(lambda service_names, action, max_parallel=None, on_output=None, on_event=None, process_key=None:
+               (f"服务 {' '.join(service_names)} {action}", ("services", tuple(service_names), action)))
+    @timed()
+    def manage_services(self, service_names: List[str], action: str,
+                        max_parallel: int = MAX_PARALLEL_SERVICE_OPERATIONS,
+                        on_output: Optional[Callable[[str], None]] = None,
+                        on_event: Optional[Callable[[ItemDone], None]] = None,
+                        process_key: Optional[str] = None) -> Tuple[bool, str]:
+        """并行管理多个服务，汇总每个服务的结果
+
+        在 command_pool 中最多同时执行 max_parallel 个操作，每个服务结束时通过 on_event 发出 ItemDone。
+        部分服务失败时返回 False，消息中分别列出成功和失败的服务。
+        整批作为一个操作排队，批内的服务之间仍然并行。
+        """
+        if action not in SERVICE_ACTION_NAMES:
+            return False, "Invalid action"
+        if not service_names:
+            return False, "没有选择服务"
+
+        results: Dict[str, Tuple[bool, str]] = {}
+        for name, future in self.map_commands(lambda service: self._manage_service(service, action, process_key),
+                                              service_names, max_parallel):
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logging.error(f"Error managing service {name}: {e}")
+                results[name] = (False, str(e))
+            if on_output is not None:
+                on_output(f"服务 {name}：{'完成' if results[name][0] else '失败'}")
+            if on_event is not None:
+                on_event(ItemDone(name, results[name][0]))
+
+        return self.summarize_service_results(service_names, action, results)
+
+    @staticmethod
+    def summarize_service_results(service_names: List[str], action: str,
+                                  results: Dict[str, Tuple[bool, str]]) -> Tuple[bool, str]:
+        """把各服务的结果合并为一条 (success, message)，按选择的顺序列出"""
+        succeeded = [name for name in service_names if results[name][0]]
+        failed = [name for name in service_names if not results[name][0]]
+        action_name = SERVICE_ACTION_NAMES[action]
+        if not failed:
+            return True, f"已{action_name} {len(succeeded)} 个服务：{', '.join(succeeded)}"
+
+        lines = []
+        if succeeded:
+            lines.append(f"已{action_name}：{', '.join(succeeded)}")
+        lines.append(f"{len(failed)}/{len(service_names)} 个服务{action_name}失败：")
+        lines.extend(f"  {name}：{results[name][1]}" for name in failed)
+        return False, "\n".join(lines)
+
+    def load_catalogue(self) -> Dict[str, List[Dict[str, Any]]]:
+        """通过 brew info 获取完整的 formula/cask 目录（较慢，仅在没有 API 缓存文件时使用）"""
+        result = self.run_command([self.brew_path, "info", "--json=v2", "--eval-all"])
+        try:
+            data = json.loads(result.stdout)
+        except ValueError:
+            logging.error(f"Error loading catalogue from brew info: {result.stderr}")
+            return {}
+        return {"formula": data.get("formulae", []), "cask": data.get("casks", [])}
+
+    @timed()
+    def search_package(self, query: str, within: Optional[Iterable[str]] = None,
+                       process_key: str = "search") -> List[str]:
+        """搜索包
+
+        within 为上一次（更短的）查询的结果时，只在这些结果中继续缩小范围。
+        brew search 登记在 process_key 下，默认的 "search" 由 cancel_search 终止。
+        """
+        try:
+            if self.search_index.ensure_loaded():
+                return self.search_index.search(query, within)
+        except Exception as e:
+            logging.warning(f"Search index unavailable, falling back to brew search: {e}")
+
+        if within is not None:
+            # brew search 按子串匹配，更长的查询的结果一定包含在上一次的结果中
+            lowered = query.strip().lower()
+            return [name for name in within if lowered in name.lower()]
+
+        stdout = self.run_command([self.brew_path, "search", query], process_key=process_key).stdout
         return stdout.split("\n") if stdout else []
+
+    def cancel_search(self) -> bool:
+        """取消正在运行的 brew search"""
+        return self.cancel_process("search")
@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Optional
+
+
+def get_cache_dir() -> str:
+    """获取 BrewGUI 的缓存目录（不存在时自动创建）"""
+    if sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_dir = os.path.join(base, "BrewGUI")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def load_json_cache(path: str, version: int) -> Optional[Any]:
+    """读取带版本号的 JSON 缓存，版本不符或文件损坏时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != version:
+        logging.info(f"Cache file {path} has an outdated version, ignoring")
+        return None
+    return data.get("payload")
+
+
+def save_json_cache(path: str, version: int, payload: Any) -> None:
+    """原子地写入带版本号的 JSON 缓存"""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": version, "payload": payload}, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logging.warning(f"Could not write cache file {path}: {e}")
+
+
+def remove_cache(path: str) -> None:
+    """删除缓存文件"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"Could not remove cache file {path}: {e}")
@@ -0,0 +1,95 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# 已知的 brew 错误输出：(正则, 错误类型)，按顺序匹配 stderr，第一个匹配的生效。
+# brew 会把警告、重试和进度也写到 stderr，因此成功与否只看退出码；
+# 这张表只用于在退出码非 0 时说明失败原因。
+ERROR_SIGNATURES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"because it is required by"), "dependency"),
+    (re.compile(r"has already locked|Another active Homebrew"), "locked"),
+    (re.compile(r"No available (formula|cask)|No formulae or casks found|No cask with this name"), "not_found"),
+    (re.compile(r"is not installed|No such keg"), "not_installed"),
+    (re.compile(r"Permission denied|Operation not permitted"), "permission"),
+    (re.compile(r"curl: \(\d+\)|Failed to download|Download failed"), "download"),
+    (re.compile(r"^Error: ", re.MULTILINE), "error"),
+]
+# 退出码为 0 但仍视为失败的输出，只列出确定什么也没做的情况：
+# 另一个 brew 进程持有前缀锁时，本次命令直接放弃
+EXIT_ZERO_FAILURES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"^Error: Another active Homebrew .*process is already in progress", re.MULTILINE), "locked"),
+]
+
+
+def classify_error(stderr: str) -> Optional[str]:
+    """按 ERROR_SIGNATURES 识别 stderr 中的错误类型，没有匹配时返回 None"""
+    for pattern, kind in ERROR_SIGNATURES:
+        if pattern.search(stderr):
+            return kind
+    return None
+
+
+def _exit_zero_failure(stderr: str) -> Optional[str]:
+    for pattern, kind in EXIT_ZERO_FAILURES:
+        if pattern.search(stderr):
+            return kind
+    return None
+
+
+@dataclass
+class CommandResult:
+    """一条命令的执行结果"""
+    command: List[str] = field(default_factory=list)
+    # 进程退出码；命令未能启动或被超时终止时为 None
+    returncode: Optional[int] = None
+    stdout: str = ""
+    stderr: str = ""
+    wall_seconds: float = 0.0
+    # 子进程的峰值常驻内存（字节），无法获取时为 None
+    peak_rss: Optional[int] = None
+
+    @property
+    def error_kind(self) -> Optional[str]:
+        """失败原因，成功时为 None
+
+        命令未能启动时为 "spawn"；退出码非 0 时按 ERROR_SIGNATURES 识别，无法识别时为 "exit"；
+        退出码为 0 时只检查 EXIT_ZERO_FAILURES。
+        """
+        if self.returncode is None:
+            return "spawn"
+        if self.returncode == 0:
+            return _exit_zero_failure(self.stderr)
+        return classify_error(self.stderr) or "exit"
+
+    @property
+    def success(self) -> bool:
+        return self.error_kind is None
+
+    @property
+    def message(self) -> str:
+        """成功时为 stdout，失败时优先为 stderr"""
+        if self.success:
+            return self.stdout
+        return self.stderr or self.stdout or f"命令退出码 {self.returncode}"
+
+
+def reap(process: subprocess.Popen) -> Optional[int]:
+    """等待进程结束并返回其峰值常驻内存（字节）
+
+    os.wait4 返回的是这一个子进程的 rusage；resource.getrusage(RUSAGE_CHILDREN) 只能给出
+    所有已结束子进程中的最大值，无法对应到单条命令。不支持 wait4 的平台只等待进程结束。
+    """
+    if hasattr(os, "wait4") and process.returncode is None:
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            process.wait()
+            return None
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # macOS 上 ru_maxrss 的单位是字节，Linux 上是 KB
+        return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    process.wait()
+    return None
@@ -0,0 +1,140 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def _short_name(name: str) -> str:
+    """去掉 tap 前缀：homebrew/core/openssl@3 -> openssl@3"""
+    return name.split("/")[-1]
+
+
+class DependencyGraph:
+    """已安装包之间的依赖关系，正向和反向各保存一份邻接集合
+
+    formula 的依赖取自 INSTALL_RECEIPT.json 的 runtime_dependencies，它已是传递闭包，
+    因此 dependencies_of/dependents_of 返回的都是直接和间接关系，查询只需一次字典访问。
+    cask 的依赖取自 cask 定义中的 depends_on formula:，只有直接依赖。
+    回执或 cask 定义无法读取时，该包的依赖记为未知。
+
+    所有方法都可以在多个线程中调用。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 包名 -> 类型（"formula"、"cask" 或 None）
+        self._kinds: Dict[str, Optional[str]] = {}
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        # 主动安装的包（brew install 指定的包，或没有回执、无法判断的包）
+        self._on_request: Set[str] = set()
+        # 依赖未知的包
+        self._unknown: Set[str] = set()
+
+    @classmethod
+    def from_inventory(cls, records: Iterable[Dict[str, Any]]) -> "DependencyGraph":
+        """从 get_inventory() 的记录一次性构建"""
+        graph = cls()
+        for record in records:
+            graph._add(record)
+        return graph
+
+    def _add(self, record: Dict[str, Any]):
+        name = record["name"]
+        receipt = record.get("receipt")
+        self._kinds[name] = record.get("type")
+        if record.get("type") == "cask":
+            raw = record.get("dependencies")
+        else:
+            raw = (receipt or {}).get("runtime_dependencies")
+        if raw is None:
+            self._unknown.add(name)
+        else:
+            self._unknown.discard(name)
+        dependencies = {_short_name(dep) for dep in raw or []}
+        self._dependencies[name] = dependencies
+        self._dependents.setdefault(name, set())
+        for dep in dependencies:
+            self._dependents.setdefault(dep, set()).add(name)
+        # 没有回执时无法判断是否为依赖，按主动安装处理，避免被当成孤立依赖删除
+        if receipt is None or receipt.get("installed_on_request") or not receipt.get("installed_as_dependency"):
+            self._on_request.add(name)
+        else:
+            self._on_request.discard(name)
+
+    def _remove(self, name: str):
+        for dep in self._dependencies.pop(name, ()):
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(name)
+                if not dependents and dep not in self._kinds:
+                    del self._dependents[dep]
+        self._kinds.pop(name, None)
+        self._on_request.discard(name)
+        self._unknown.discard(name)
+        # 仍被其他包依赖时保留反向集合（依赖可能被 --ignore-dependencies 强制卸载）
+        if not self._dependents.get(name):
+            self._dependents.pop(name, None)
+
+    def update(self, name: str, record: Optional[Dict[str, Any]]):
+        """用新读取的记录替换一个包的边；record 为 None 表示该包已卸载"""
+        with self._lock:
+            self._remove(name)
+            if record is not None:
+                self._add(record)
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return _short_name(name) in self._kinds
+
+    def names(self) -> Set[str]:
+        with self._lock:
+            return set(self._kinds)
+
+    def dependencies_of(self, name: str) -> Set[str]:
+        with self._lock:
+            return set(self._dependencies.get(_short_name(name), ()))
+
+    def dependents_of(self, name: str) -> Set[str]:
+        """依赖该包的已安装包"""
+        with self._lock:
+            return set(self._dependents.get(_short_name(name), ()) & self._kinds.keys())
+
+    def blocking_dependents(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """卸载 names 时会阻止卸载的依赖者 {包名: [依赖者]}，同批卸载的包不计入"""
+        batch = {_short_name(name) for name in names}
+        result = {}
+        with self._lock:
+            for name in batch:
+                blockers = (self._dependents.get(name, set()) & self._kinds.keys()) - batch
+                if blockers:
+                    result[name] = sorted(blockers)
+        return result
+
+    def leaves(self) -> List[str]:
+        """没有被其他已安装包依赖的 formula（与 brew leaves 一致）"""
+        with self._lock:
+            return sorted(
+                name for name, kind in self._kinds.items()
+                if kind != "cask" and not (self._dependents.get(name, set()) & self._kinds.keys())
+            )
+
+    def orphans(self) -> List[str]:
+        """作为依赖安装、但已不再被任何主动安装的包（包括 cask）需要的 formula（与 brew autoremove 一致）
+
+        formula 的依赖集合是传递闭包，cask 只有直接依赖，再并入这些依赖自己的依赖即可。
+        仍被需要的包中只要有一个依赖未知，就无法确定哪些包可以删除，此时返回空列表。
+        """
+        with self._lock:
+            needed = set(self._on_request)
+            for name in self._on_request:
+                for dep in self._dependencies.get(name, ()):
+                    needed.add(dep)
+                    needed |= self._dependencies.get(dep, set())
+            unknown = needed & self._unknown
+            if unknown:
+                logging.info(f"Dependencies of {', '.join(sorted(unknown))} are unknown, not listing orphans")
+                return []
+            return sorted(
+                name for name, kind in self._kinds.items()
+                if kind != "cask" and name not in needed
+            )
@@ -0,0 +1,251 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_utils import get_cache_dir, load_json_cache, save_json_cache
+from inventory import current_version, list_dirs, version_key
+from search_index import get_homebrew_cache_dir
+
+# 缓存格式变化时递增
+DISK_USAGE_CACHE_VERSION = 1
+# 并行遍历目录的线程数（遍历主要在等待文件系统，线程数可以多于 CPU 核数）
+DISK_SCAN_WORKERS = 8
+
+
+def _entry_size(st: os.stat_result) -> int:
+    """文件实际占用的磁盘空间（与 du 一致），不支持 st_blocks 的平台使用文件大小"""
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def _scan_tree(root: str, previous: Dict[str, Any]) -> Tuple[int, Dict[Tuple[int, int], int], Dict[str, Any]]:
+    """统计一棵目录树的大小，返回 (独占字节数, {(dev, inode): 字节数}, 新的目录缓存)
+
+    每个目录缓存自身直接包含的文件大小，以目录的 mtime 为键：目录下增删或重命名文件会改变其 mtime，
+    mtime 未变的目录只需 stat 一次，不必再列出其中的文件。
+    硬链接数大于 1 的文件按 inode 单独返回，由调用方跨目录树去重。
+    """
+    unique_bytes = 0
+    linked: Dict[Tuple[int, int], int] = {}
+    entries: Dict[str, Any] = {}
+    try:
+        stack = [(root, os.lstat(root).st_mtime_ns)]
+    except OSError:
+        return 0, linked, entries
+
+    while stack:
+        path, mtime = stack.pop()
+        cached = previous.get(path)
+        if cached is None or cached["mtime"] != mtime:
+            own_bytes = 0
+            own_linked = []
+            dirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                dirs.append([entry.name, entry.stat(follow_symlinks=False).st_mtime_ns])
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                if st.st_nlink > 1:
+                                    own_linked.append([st.st_dev, st.st_ino, _entry_size(st)])
+                                else:
+                                    own_bytes += _entry_size(st)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logging.debug(f"Cannot scan {path}: {e}")
+                continue
+            cached = {"mtime": mtime, "bytes": own_bytes, "linked": own_linked,
+                      "dirs": [name for name, _ in dirs]}
+            children = [(os.path.join(path, name), child_mtime) for name, child_mtime in dirs]
+        else:
+            children = []
+            for name in cached["dirs"]:
+                child = os.path.join(path, name)
+                try:
+                    children.append((child, os.lstat(child).st_mtime_ns))
+                except OSError:
+                    continue
+
+        entries[path] = cached
+        unique_bytes += cached["bytes"]
+        for dev, ino, size in cached["linked"]:
+            linked[(dev, ino)] = size
+        stack.extend(children)
+
+    return unique_bytes, linked, entries
+
+
+@dataclass
+class PackageUsage:
+    """一个已安装包在 Cellar 或 Caskroom 中占用的空间"""
+    name: str
+    # "formula" 或 "cask"
+    kind: str
+    # 版本 -> 字节数
+    versions: Dict[str, int] = field(default_factory=dict)
+    current_version: str = ""
+    pinned: bool = False
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.versions.values())
+
+    @property
+    def old_bytes(self) -> int:
+        """非当前版本占用的空间，brew cleanup 会删除（固定的包除外）"""
+        if self.pinned:
+            return 0
+        return sum(size for version, size in self.versions.items() if version != self.current_version)
+
+
+@dataclass
+class DiskUsageReport:
+    packages: List[PackageUsage] = field(default_factory=list)
+    # Homebrew 下载缓存（brew --cache）占用的空间
+    cache_bytes: int = 0
+    scan_seconds: float = 0.0
+
+    @property
+    def installed_bytes(self) -> int:
+        return sum(package.total_bytes for package in self.packages)
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        """brew cleanup --prune=all 可以释放的空间估计：旧版本加上整个下载缓存"""
+        return sum(package.old_bytes for package in self.packages) + self.cache_bytes
+
+
+class DiskUsageAnalyzer:
+    """并行统计 Cellar、Caskroom 与 Homebrew 下载缓存的磁盘占用
+
+    每个包的每个版本目录、下载缓存的每个子目录作为一个任务提交到线程池，workers 为 1 时在调用线程中依次遍历。
+    各目录的统计结果按 mtime 缓存在磁盘上，再次扫描时只重新列出有变化的目录。
+    最近一次的结果保存在内存中，安装/卸载/升级后由 invalidate() 标记为过期。
+    """
+
+    def __init__(self, prefix: str, homebrew_cache: Optional[str] = None,
+                 cache_path: Optional[str] = None, workers: int = DISK_SCAN_WORKERS):
+        self.prefix = prefix
+        self.homebrew_cache = homebrew_cache or get_homebrew_cache_dir()
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "disk_usage.json")
+        self.workers = workers
+        self._entries: Optional[Dict[str, Any]] = None
+        self._report: Optional[DiskUsageReport] = None
+        # 每次 invalidate() 递增，扫描期间发生变化时不保存扫描结果
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def cached_report(self) -> Optional[DiskUsageReport]:
+        """最近一次扫描的结果，尚未扫描或已过期时返回 None"""
+        with self._lock:
+            return self._report
+
+    def invalidate(self):
+        """已安装的包变化后丢弃保存的结果（目录缓存仍然有效，下次扫描只重新列出有变化的目录）"""
+        with self._lock:
+            self._report = None
+            self._generation += 1
+
+    def _pinned(self) -> set:
+        try:
+            return set(os.listdir(os.path.join(self.prefix, "var", "homebrew", "pinned")))
+        except OSError:
+            return set()
+
+    def _package_roots(self) -> Tuple[List[PackageUsage], List[Tuple[PackageUsage, str, str]]]:
+        """列出所有包及其版本目录，返回 (包列表, [(包, 版本, 路径)])"""
+        packages = []
+        roots = []
+        pinned = self._pinned()
+        for directory, kind in (("Cellar", "formula"), ("Caskroom", "cask")):
+            try:
+                kegs = sorted(list_dirs(os.path.join(self.prefix, directory)), key=lambda e: e.name)
+            except OSError:
+                continue
+            for keg in kegs:
+                try:
+                    versions = list_dirs(keg.path)
+                except OSError:
+                    continue
+                if not versions:
+                    continue
+                if kind == "formula":
+                    current = current_version(self.prefix, keg.name, [v.name for v in versions])
+                else:
+                    # Caskroom 中一般只有一个版本，有多个时最近写入的是当前版本
+                    current = max(versions, key=lambda v: v.stat().st_mtime_ns).name
+                package = PackageUsage(keg.name, kind, current_version=current, pinned=keg.name in pinned)
+                packages.append(package)
+                for version in sorted(versions, key=lambda v: version_key(v.name)):
+                    roots.append((package, version.name, version.path))
+        return packages, roots
+
+    def _cache_roots(self) -> Tuple[int, List[str]]:
+        """下载缓存顶层的文件大小与子目录"""
+        top_bytes = 0
+        roots = []
+        try:
+            with os.scandir(self.homebrew_cache) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            roots.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            top_bytes += _entry_size(entry.stat(follow_symlinks=False))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return top_bytes, roots
+
+    def scan(self) -> DiskUsageReport:
+        started = time.perf_counter()
+        with self._lock:
+            if self._entries is None:
+                self._entries = load_json_cache(self.cache_path, DISK_USAGE_CACHE_VERSION) or {}
+            previous = self._entries
+            generation = self._generation
+
+        packages, package_roots = self._package_roots()
+        cache_top_bytes, cache_roots = self._cache_roots()
+        paths = [path for _, _, path in package_roots] + cache_roots
+
+        if self.workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="disk-usage") as pool:
+                results = list(pool.map(lambda path: _scan_tree(path, previous), paths))
+        else:
+            results = [_scan_tree(path, previous) for path in paths]
+
+        # 硬链接的文件只计入第一个遇到它的目录树
+        seen: set = set()
+        entries: Dict[str, Any] = {}
+        sizes = []
+        for unique_bytes, linked, tree_entries in results:
+            entries.update(tree_entries)
+            for key, size in linked.items():
+                if key not in seen:
+                    seen.add(key)
+                    unique_bytes += size
+            sizes.append(unique_bytes)
+
+        for (package, version, _), size in zip(package_roots, sizes):
+            package.versions[version] = size
+        report = DiskUsageReport(packages, cache_top_bytes + sum(sizes[len(package_roots):]))
+
+        report.scan_seconds = time.perf_counter() - started
+        with self._lock:
+            changed = entries != previous
+            self._entries = entries
+            if generation == self._generation:
+                self._report = report
+        if changed:
+            save_json_cache(self.cache_path, DISK_USAGE_CACHE_VERSION, entries)
+        logging.info(f"Disk usage scan of {len(paths)} directories took {report.scan_seconds:.2f}s")
+        return report
@@ -0,0 +1,116 @@
+from typing import Any, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt
+
+from disk_usage import PackageUsage
+from inventory import version_key
+from upgrade_model import format_bytes
+
+# 磁盘占用表格的列：(字段, 标题, 对齐方式)
+DISK_USAGE_COLUMNS = [
+    ('name', '包名', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('kind', '类型', Qt.AlignmentFlag.AlignCenter),
+    ('versions', '版本数', Qt.AlignmentFlag.AlignCenter),
+    ('total', '占用空间', Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+    ('old', '旧版本', Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+]
+DISK_USAGE_COLUMN_INDEX = {key: i for i, (key, _, _) in enumerate(DISK_USAGE_COLUMNS)}
+
+# 各列的排序键
+_SORT_KEYS = {
+    'name': lambda package: package.name,
+    'kind': lambda package: (package.kind, package.name),
+    'versions': lambda package: len(package.versions),
+    'total': lambda package: package.total_bytes,
+    'old': lambda package: package.old_bytes,
+}
+
+
+class DiskUsageTableModel(QAbstractTableModel):
+    """每个包占用磁盘空间的表格模型，排序直接按字节数在模型中完成"""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._packages: List[PackageUsage] = []
+        self._placeholder: Optional[str] = None
+        self._sort_column = DISK_USAGE_COLUMN_INDEX['total']
+        self._sort_order = Qt.SortOrder.DescendingOrder
+
+    def set_packages(self, packages: List[PackageUsage]):
+        self.beginResetModel()
+        self._packages = list(packages)
+        self._placeholder = None if packages else "没有已安装的包"
+        self._sort_packages()
+        self.endResetModel()
+
+    def set_placeholder(self, text: str):
+        """清空表格，只显示一行提示文字"""
+        self.beginResetModel()
+        self._packages = []
+        self._placeholder = text
+        self.endResetModel()
+
+    def _sort_packages(self):
+        key = _SORT_KEYS[DISK_USAGE_COLUMNS[self._sort_column][0]]
+        self._packages.sort(key=key, reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    # ------------------------------------------------------------------
+    # Qt 模型接口
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._packages) or (1 if self._placeholder else 0)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(DISK_USAGE_COLUMNS)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not self._packages:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        key, _, alignment = DISK_USAGE_COLUMNS[index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return alignment
+        if role == Qt.ItemDataRole.ToolTipRole and self._packages:
+            package = self._packages[index.row()]
+            return "\n".join(
+                f"{version}{'（当前）' if version == package.current_version else ''}：{format_bytes(size)}"
+                for version, size in sorted(package.versions.items(), key=lambda item: version_key(item[0]))
+            )
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if not self._packages:
+            return self._placeholder if key == 'name' else None
+        package = self._packages[index.row()]
+        if key == 'name':
+            return package.name + ("（已固定）" if package.pinned else "")
+        if key == 'kind':
+            return package.kind
+        if key == 'versions':
+            return str(len(package.versions))
+        if key == 'total':
+            return format_bytes(package.total_bytes)
+        if key == 'old':
+            return format_bytes(package.old_bytes) if package.old_bytes else ""
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return DISK_USAGE_COLUMNS[section][1]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        if self._packages:
+            self.layoutAboutToBeChanged.emit()
+            self._sort_packages()
+            self.layoutChanged.emit()
@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cache_utils import get_cache_dir, load_json_cache, save_json_cache, remove_cache
+
+# 缓存格式变化时递增，旧缓存会被自动丢弃
+INVENTORY_CACHE_VERSION = 5
+
+# 从 INSTALL_RECEIPT.json 中保留的字段
+RECEIPT_FIELDS = ("installed_on_request", "installed_as_dependency", "poured_from_bottle", "time")
+
+
+def list_dirs(path: str) -> List[os.DirEntry]:
+    """列出目录下的子目录（忽略隐藏目录）"""
+    with os.scandir(path) as it:
+        return [entry for entry in it if not entry.name.startswith(".") and entry.is_dir()]
+
+
+def read_install_receipt(keg_path: str) -> Optional[Dict[str, Any]]:
+    """读取 keg 的 INSTALL_RECEIPT.json，只保留界面需要的字段"""
+    try:
+        with open(os.path.join(keg_path, "INSTALL_RECEIPT.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    receipt = {field: data.get(field) for field in RECEIPT_FIELDS}
+    source = data.get("source") or {}
+    receipt["tap"] = source.get("tap")
+    # 旧版 brew 写入的回执没有 runtime_dependencies，此时依赖未知，保留为 None
+    dependencies = data.get("runtime_dependencies")
+    receipt["runtime_dependencies"] = None if dependencies is None else [
+        dep.get("full_name") for dep in dependencies if isinstance(dep, dict) and dep.get("full_name")
+    ]
+    return receipt
+
+
+_CASK_FORMULA_DEPENDS = re.compile(r"depends_on\s+formula:\s*(\[[^\]]*\]|\"[^\"]+\"|'[^']+')")
+
+
+def read_cask_dependencies(cask_path: str, token: str) -> Optional[List[str]]:
+    """读取 cask 依赖的 formula（depends_on formula:），无法读取时返回 None
+
+    brew 安装 cask 时把 cask 定义保存在 .metadata/<版本>/<时间戳>/Casks/ 下，
+    从 API 安装的是 <token>.json，从 tap 安装的是 <token>.rb。
+    """
+    try:
+        versions = list(os.scandir(os.path.join(cask_path, ".metadata")))
+        versions = [entry for entry in versions if entry.is_dir()]
+        if not versions:
+            return None
+        latest = max(versions, key=lambda entry: entry.stat().st_mtime_ns)
+        stamps = list_dirs(latest.path)
+        if not stamps:
+            return None
+        casks_dir = os.path.join(max(stamps, key=lambda entry: entry.name).path, "Casks")
+        json_path = os.path.join(casks_dir, f"{token}.json")
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                depends_on = json.load(f).get("depends_on") or {}
+            formulae = (depends_on.get("formula") or []) if isinstance(depends_on, dict) else []
+            return [formulae] if isinstance(formulae, str) else [str(name) for name in formulae]
+        with open(os.path.join(casks_dir, f"{token}.rb"), "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, ValueError, AttributeError):
+        return None
+    dependencies = []
+    for match in _CASK_FORMULA_DEPENDS.finditer(source):
+        dependencies.extend(re.findall(r"[\"']([^\"']+)[\"']", match.group(1)))
+    return dependencies
+
+
+def version_key(version: str) -> Tuple:
+    """版本号的排序键：数字段按数值比较（1.10 > 1.9），字母段（rc、beta）排在同位置的数字之前
+
+    每段之后补一个结束标记，使 1.0 > 1.0rc1，而 1.0.1 > 1.0。
+    HEAD-<commit> 是从最新源码安装的版本，与 Homebrew 一致地排在所有正式版本之后。
+    """
+    parts = [(2, int(token)) if token.isdigit() else (0, token.lower())
+             for token in re.findall(r"\d+|[A-Za-z]+", version)]
+    parts.append((1, 0))
+    return (1 if version.startswith("HEAD") else 0, tuple(parts))
+
+
+def sort_versions(versions: Iterable[str]) -> List[str]:
+    """按版本号从旧到新排序"""
+    return sorted(versions, key=version_key)
+
+
+def current_version(prefix: str, name: str, versions: List[str]) -> str:
+    """确定当前使用的版本：优先取 opt/<name> 链接指向的版本，否则取最新的版本"""
+    try:
+        linked = os.path.basename(os.readlink(os.path.join(prefix, "opt", name)))
+        if linked in versions:
+            return linked
+    except OSError:
+        pass
+    return max(versions, key=version_key)
+
+
+def _formula_record(prefix: str, name: str, keg_path: str) -> Optional[Dict[str, Any]]:
+    versions = sort_versions(entry.name for entry in list_dirs(keg_path))
+    if not versions:
+        return None
+    current = current_version(prefix, name, versions)
+    return {
+        "name": name,
+        "type": "formula",
+        "versions": versions,
+        "receipt": read_install_receipt(os.path.join(keg_path, current)),
+    }
+
+
+def _cask_record(name: str, cask_path: str) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "type": "cask",
+        "versions": sort_versions(entry.name for entry in list_dirs(cask_path)),
+        "receipt": None,
+        # cask 依赖的 formula，无法读取 cask 定义时为 None
+        "dependencies": read_cask_dependencies(cask_path, name),
+    }
+
+
+def list_installed_names(prefix: str) -> Optional[Dict[str, str]]:
+    """只列出 Cellar/Caskroom 下的目录名 {名称: 类型}，不读取版本和回执"""
+    names = {}
+    try:
+        for entry in list_dirs(os.path.join(prefix, "Caskroom")):
+            names[entry.name] = "cask"
+    except OSError:
+        pass
+    try:
+        for entry in list_dirs(os.path.join(prefix, "Cellar")):
+            names[entry.name] = "formula"
+    except OSError:
+        return None
+    return names
+
+
+def scan_package(prefix: str, name: str) -> Optional[Dict[str, Any]]:
+    """读取单个已安装包的记录，未安装时返回 None"""
+    name = name.split("/")[-1]
+    try:
+        keg_path = os.path.join(prefix, "Cellar", name)
+        if os.path.isdir(keg_path):
+            return _formula_record(prefix, name, keg_path)
+        cask_path = os.path.join(prefix, "Caskroom", name)
+        if os.path.isdir(cask_path):
+            return _cask_record(name, cask_path)
+    except OSError as e:
+        logging.warning(f"Error scanning package {name}: {e}")
+    return None
+
+
+def scan_prefix(prefix: str) -> Optional[List[Dict[str, Any]]]:
+    """直接扫描 <prefix>/Cellar 与 <prefix>/Caskroom 获取已安装的包
+
+    返回的记录顺序与 brew list 一致（先 formula 后 cask，按名称排序）。
+    无法识别目录结构时返回 None，调用方应回退到 brew list。
+    """
+    cellar = os.path.join(prefix, "Cellar")
+    caskroom = os.path.join(prefix, "Caskroom")
+    if not os.path.isdir(cellar):
+        return None
+
+    records = []
+    try:
+        for keg in sorted(list_dirs(cellar), key=lambda e: e.name):
+            record = _formula_record(prefix, keg.name, keg.path)
+            if record is not None:
+                records.append(record)
+
+        if os.path.isdir(caskroom):
+            for cask in sorted(list_dirs(caskroom), key=lambda e: e.name):
+                records.append(_cask_record(cask.name, cask.path))
+    except OSError as e:
+        logging.warning(f"Error scanning Homebrew prefix {prefix}: {e}")
+        return None
+
+    return records
+
+
+class InventoryCache:
+    """已安装包列表的磁盘缓存
+
+    以 Cellar/Caskroom 目录的 mtime 作为缓存键：安装或卸载包会在这两个目录下
+    增删子目录，从而改变其 mtime，此时缓存自动失效。升级只会改变 keg 内部的版本目录，
+    因此应用内的安装/卸载/升级操作完成后需要调用 invalidate()。
+    """
+
+    def __init__(self, prefix: str, cache_path: Optional[str] = None):
+        self.prefix = prefix
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "inventory.json")
+        self._lock = threading.Lock()
+
+    def fingerprint(self) -> Dict[str, Optional[int]]:
+        """返回 Cellar/Caskroom 的 mtime 指纹"""
+        result = {}
+        for name in ("Cellar", "Caskroom"):
+            try:
+                result[name] = os.stat(os.path.join(self.prefix, name)).st_mtime_ns
+            except OSError:
+                result[name] = None
+        return result
+
+    def load(self) -> Optional[List[Dict[str, Any]]]:
+        """读取缓存的包记录，缓存缺失或已过期时返回 None"""
+        with self._lock:
+            payload = load_json_cache(self.cache_path, INVENTORY_CACHE_VERSION)
+        if not payload:
+            return None
+        if payload.get("prefix") != self.prefix or payload.get("fingerprint") != self.fingerprint():
+            logging.info("Inventory cache is stale")
+            return None
+        return payload.get("packages")
+
+    def store(self, packages: List[Dict[str, Any]], fingerprint: Dict[str, Optional[int]]) -> None:
+        """写入包记录
+
+        fingerprint 应在读取包列表之前获取，这样读取期间发生的变化会让缓存在下次读取时失效。
+        """
+        with self._lock:
+            save_json_cache(self.cache_path, INVENTORY_CACHE_VERSION, {
+                "prefix": self.prefix,
+                "fingerprint": fingerprint,
+                "packages": packages,
+            })
+
+    def invalidate(self) -> None:
+        """使缓存失效"""
+        with self._lock:
+            remove_cache(self.cache_path)
+        logging.info("Inventory cache invalidated")
@@ -1,82 +1,105 @@
+import os
 import sys
+import html
+import itertools
+import time
 import logging
+from collections import deque
+from dataclasses import dataclass, field
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                           QHBoxLayout, QPushButton, QLineEdit, QListWidget,
-                           QTabWidget, QLabel, QMessageBox, QProgressBar,
-                           QListWidgetItem, QTableWidget, QTableWidgetItem,
-                           QHeaderView)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QIcon, QColor
+                           QHBoxLayout, QPushButton, QLineEdit, QTabWidget,
+                           QLabel, QMessageBox, QProgressBar, QListView,
+                           QTableView, QAbstractItemView, QHeaderView,
+                           QPlainTextEdit, QComboBox, QSplitter, QTextBrowser,
+                           QFileDialog)
+from PyQt6.QtCore import Qt, QTimer, QPoint
+from PyQt6.QtGui import QFont, QIcon, QKeySequence, QShortcut
 from brew_manager import BrewManager
-import psutil
-import subprocess
+from task_executor import TaskExecutor
+from operation_scheduler import ItemDone
+from package_model import PackageListModel
+from styles import APP_STYLESHEET
 
 # 配置日志记录
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class BrewWorker(QThread):
-    finished = pyqtSignal(bool, str)
-    
-    def __init__(self, func, *args):
-        super().__init__()
-        self.func = func
-        self.args = args
+# 进程开始加载界面模块的时间，用于统计启动耗时
+STARTUP_STARTED_AT = time.perf_counter()
+# 启动耗时单独使用 INFO 级别记录，不受全局日志级别影响（benchmarks/bench_startup.py 也从这里读取）
+startup_logger = logging.getLogger("brew_gui.startup")
+startup_logger.setLevel(logging.INFO)
 
-    def run(self):
-        try:
-            result = self.func(*self.args)
-            self.finished.emit(*result)
-        except Exception as e:
-            logging.error(f"Error in worker thread: {e}")
-            self.finished.emit(False, f"操作失败：{str(e)}")
+# 输入停止多久后才发起搜索（毫秒）
+SEARCH_DEBOUNCE_MS = 250
+# 共享线程池的线程数
+TASK_POOL_SIZE = 4
+# 操作日志面板最多保留的行数
+OPERATION_LOG_MAX_LINES = 1000
+# 操作日志刷新到界面的间隔（毫秒），避免逐行刷新界面
+OPERATION_LOG_FLUSH_MS = 100
+# 包列表滚动停止多久后才预取可见行的元数据（毫秒）
+METADATA_PREFETCH_DEBOUNCE_MS = 150
+# 预取元数据时在可见行之外多取的行数
+METADATA_PREFETCH_MARGIN = 20
+# 端口表格各列的初始宽度（像素）；进程名称列占满剩余宽度。
+# 不使用 ResizeToContents，否则每次数据变化都要测量所有行的文本
+PORT_COLUMN_WIDTHS = {'port': 80, 'protocol': 70, 'address': 160, 'pid': 80, 'user': 100, 'status': 80}
+# 端口过滤输入停止多久后才重新过滤（毫秒）
+PORT_FILTER_DEBOUNCE_MS = 150
+# 端口自动刷新间隔的选项：(标题, 毫秒)，0 表示关闭
+PORT_POLL_INTERVALS = [("关闭", 0), ("2 秒", 2000), ("5 秒", 5000), ("10 秒", 10000), ("30 秒", 30000)]
+# 默认的端口自动刷新间隔（毫秒）
+PORT_POLL_DEFAULT_MS = 5000
+# 刷新状态栏中操作队列的间隔（毫秒）
+OPERATION_QUEUE_REFRESH_MS = 500
+# 升级进行中刷新日志和下载速度的间隔（毫秒）
+UPGRADE_REFRESH_MS = 500
+# 诊断页默认隐藏，按下快捷键或设置该环境变量时才显示
+DIAGNOSTICS_SHORTCUT = "Ctrl+Shift+D"
+DIAGNOSTICS_ENV = "BREW_GUI_DIAGNOSTICS"
+# 诊断页可见时刷新统计表格的间隔（毫秒）
+DIAGNOSTICS_REFRESH_MS = 1000
+
+@dataclass
+class OperationProgress:
+    """一个进行中的批量操作的进度：要处理的项目和已经处理完的项目"""
+    operation: str
+    items: set
+    done: set = field(default_factory=set)
 
-class PortWorker(QThread):
-    finished = pyqtSignal(list)
-    
-    def run(self):
-        try:
-            # 使用 lsof 命令获取端口信息
-            cmd = ['sudo', 'lsof', '-i', '-n', '-P']
-            try:
-                output = subprocess.check_output(cmd, stderr=subprocess.PIPE, text=True)
-            except subprocess.CalledProcessError:
-                # 如果没有sudo权限，尝试不使用sudo
-                cmd = ['lsof', '-i', '-n', '-P']
-                output = subprocess.check_output(cmd, stderr=subprocess.PIPE, text=True)
-
-            port_info = []
-            lines = output.split('\n')
-            
-            # 跳过标题行
-            for line in lines[1:]:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 9 and '(LISTEN)' in line:
-                        name = parts[0]
-                        pid = parts[1]
-                        # 从地址字段提取端口
-                        addr_part = parts[8]
-                        port = addr_part.split(':')[-1].split(')')[0]
-                        if port.isdigit():
-                            port_info.append({
-                                'port': int(port),
-                                'pid': int(pid),
-                                'name': name,
-                                'status': 'LISTEN'
-                            })
-
-            # 按端口号排序
-            port_info.sort(key=lambda x: x['port'])
-            self.finished.emit(port_info)
-        except Exception as e:
-            logging.error(f"Error getting port information: {str(e)}")
-            self.finished.emit([])
 
 class BrewGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         try:
             self.brew_manager = BrewManager()
+            # 所有 BrewManager 调用都提交到这个线程池，结果通过信号回到界面
+            self.executor = TaskExecutor(TASK_POOL_SIZE, self)
+            # 互不依赖的查询通过 asyncio 并行执行；asyncio 导入较慢，首次绘制后再创建
+            self.async_brew_manager = None
+            self.async_bridge = None
+            # 搜索状态：每次发起新查询时递增代数，旧代数的结果直接丢弃
+            self.search_generation = 0
+            self.search_task = None
+            self.pending_search = None
+            self.last_search = None
+            # 包详情：正在运行的 brew info 任务与等待查询的包名
+            self.metadata_task = None
+            self.metadata_pending = []
+            # 启动阶段尚未加载完成的数据，全部加载完成即视为可交互
+            self.startup_pending = {"packages", "services", "ports"}
+            self.first_paint_logged = False
+            # 端口与服务的模型和定时采样在首次绘制后由 create_data_models 创建（见 load_initial_data）
+            self.port_monitor = None
+            self.port_model = None
+            self.port_proxy = None
+            self.service_model = None
+            self.health_watcher = None
+            # 升级计划：模型随升级标签页创建，步骤由后台线程更新，界面定时重绘
+            self.upgrade_model = None
+            self.upgrade_task = None
+            # 磁盘占用：正在运行的统计任务
+            self.disk_usage_task = None
             self.init_ui()
         except Exception as e:
             QMessageBox.critical(None, "错误", f"初始化失败：{str(e)}")
@@ -91,98 +114,145 @@ class BrewGUI(QMainWindow):
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
 
-        # 创建标签页
-        tabs = QTabWidget()
-        tabs.addTab(self.create_packages_tab(), "包管理")
-        tabs.addTab(self.create_services_tab(), "服务管理")
-        tabs.addTab(self.create_ports_tab(), "端口管理")
+        # 创建标签页：只有包管理页立即构建，其余标签页在首次显示时才构建
+        self.service_list = None
+        self.port_table = None
+        self.port_count_label = None
+        self.upgrade_table = None
+        self.diagnostics_tab_index = None
+        self.diagnostics_timer = None
+        self.tab_builders = {}
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.create_packages_tab(), "包管理")
+        self.add_lazy_tab(self.create_services_tab, "服务管理")
+        self.add_lazy_tab(self.create_ports_tab, "端口管理")
+        self.add_lazy_tab(self.create_upgrades_tab, "升级")
+        self.add_lazy_tab(self.create_disk_usage_tab, "磁盘占用")
         
         # 连接标签页切换信号
-        tabs.currentChanged.connect(self.on_tab_changed)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         
-        main_layout.addWidget(tabs)
-
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #2d2d2d;
-            }
-            QWidget {
-                color: #ffffff;
-                background-color: #2d2d2d;
-            }
-            QTabWidget::pane {
-                border: 1px solid #3d3d3d;
-                background-color: #2d2d2d;
-                border-radius: 5px;
-            }
-            QTabBar::tab {
-                background-color: #383838;
-                color: #ffffff;
-                padding: 8px 20px;
-                margin-right: 2px;
-                border-top-left-radius: 4px;
-                border-top-right-radius: 4px;
-            }
-            QTabBar::tab:selected {
-                background-color: #454545;
-                border-bottom: 2px solid #4CAF50;
-            }
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                min-width: 100px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QPushButton:pressed {
-                background-color: #3d8b40;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #3d3d3d;
-                border-radius: 4px;
-                background-color: #383838;
-                color: white;
-            }
-            QLineEdit:focus {
-                border: 1px solid #4CAF50;
-            }
-            QListWidget {
-                border: 1px solid #3d3d3d;
-                border-radius: 4px;
-                padding: 5px;
-                background-color: #383838;
-                color: white;
-            }
-            QListWidget::item {
-                padding: 5px;
-                border-radius: 2px;
-            }
-            QListWidget::item:selected {
-                background-color: #4CAF50;
-                color: white;
-            }
-            QListWidget::item:hover {
-                background-color: #454545;
-            }
-            QMessageBox {
-                background-color: #2d2d2d;
-                color: white;
-            }
-            QMessageBox QLabel {
-                color: white;
-            }
-            QMessageBox QPushButton {
-                min-width: 80px;
-            }
-        """)
-
-        self.refresh_packages()
-        self.refresh_services()
+        main_layout.addWidget(self.tabs)
+
+        # 状态栏显示正在执行和排队等待的修改操作
+        self.operation_queue_label = QLabel("")
+        self.operation_queue_label.setObjectName("tabHint")
+        self.statusBar().addWidget(self.operation_queue_label, 1)
+        self.operation_queue_timer = QTimer(self)
+        self.operation_queue_timer.setInterval(OPERATION_QUEUE_REFRESH_MS)
+        self.operation_queue_timer.timeout.connect(self.update_operation_queue)
+        self.operation_queue_timer.start()
+
+        # 诊断页：每条 brew 命令、BrewManager 调用和界面刷新的耗时统计
+        QShortcut(QKeySequence(DIAGNOSTICS_SHORTCUT), self, activated=self.show_diagnostics_tab)
+        if os.environ.get(DIAGNOSTICS_ENV):
+            self.show_diagnostics_tab(select=False)
+
+        # 整个窗口只设置一次样式表
+        self.setStyleSheet(APP_STYLESHEET)
+
+        # 先显示占位内容，窗口首次绘制后再开始加载数据（见 paintEvent）
+        self.package_model.set_placeholder("正在加载已安装的包...")
+
+    def add_lazy_tab(self, builder, title):
+        """添加一个延迟构建的标签页，首次显示时才调用 builder 构建内容"""
+        container = QWidget()
+        container_layout = QVBoxLayout(container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        index = self.tabs.addTab(container, title)
+        self.tab_builders[index] = builder
+        return index
+
+    def ensure_tab_built(self, index):
+        """构建尚未构建的标签页"""
+        builder = self.tab_builders.pop(index, None)
+        if builder is not None:
+            started = time.perf_counter()
+            self.tabs.widget(index).layout().addWidget(builder())
+            logging.debug(f"Built tab {self.tabs.tabText(index)} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def start_async_bridge(self):
+        """创建 asyncio 桥接（延迟导入 asyncio）"""
+        if self.async_bridge is None:
+            from async_bridge import AsyncBridge
+            from async_brew_manager import AsyncBrewManager
+
+            self.async_brew_manager = AsyncBrewManager(self.brew_manager)
+            self.async_bridge = AsyncBridge(self)
+
+    def create_data_models(self):
+        """创建端口、服务的模型与定时采样（延迟导入，不计入首次绘制前的启动时间）"""
+        if self.port_monitor is not None:
+            return
+        from port_monitor import PortMonitor
+        from port_model import PortFilterProxyModel, PortTableModel
+        from service_health import ServiceHealthWatcher
+        from service_model import ServiceListModel
+
+        # 定时扫描端口，只把变化的行更新到表格
+        self.port_monitor = PortMonitor(self.executor, PORT_POLL_DEFAULT_MS, parent=self)
+        # 端口数据始终更新到模型中，端口标签页构建后直接使用
+        self.port_model = PortTableModel(self)
+        self.port_proxy = PortFilterProxyModel(self)
+        self.port_proxy.setSourceModel(self.port_model)
+        self.port_monitor.changed.connect(self.update_port_table)
+        self.port_monitor.snapshot.connect(self.on_ports_scanned)
+        self.port_monitor.failed.connect(self.on_port_scan_failed)
+        # 服务数据同样始终更新到模型中
+        self.service_model = ServiceListModel(self)
+        self.service_model.set_placeholder("正在加载服务...")
+        # 定时采样正在运行的服务的资源占用，显示在服务列表中
+        self.health_watcher = ServiceHealthWatcher(self.executor, self.running_service_pids, parent=self)
+        self.health_watcher.sampled.connect(
+            lambda _samples: self.service_model.set_health(self.health_watcher.history)
+        )
+
+    def load_initial_data(self):
+        """并行加载包、服务和端口数据，各自到达后立即填充"""
+        self.create_data_models()
+        self.start_async_bridge()
+
+        def loaded(name, update):
+            def on_result(data):
+                update(data)
+                self.mark_startup_loaded(name)
+            return on_result
+
+        def failed(name, title):
+            def on_error(msg):
+                self.mark_startup_loaded(name)
+                self.show_task_error(title, msg)
+            return on_error
+
+        self.async_bridge.submit(
+            self.async_brew_manager.get_installed_packages(),
+            on_result=loaded("packages", self.update_package_list),
+            on_error=failed("packages", "刷新包列表失败")
+        )
+        self.async_bridge.submit(
+            self.async_brew_manager.get_services(),
+            on_result=loaded("services", self.update_service_list),
+            on_error=failed("services", "刷新服务列表失败")
+        )
+        self.refresh_ports()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_logged:
+            self.first_paint_logged = True
+            elapsed = (time.perf_counter() - STARTUP_STARTED_AT) * 1000
+            startup_logger.info(f"Startup: time to first paint {elapsed:.0f} ms")
+            QTimer.singleShot(0, self.load_initial_data)
+
+    def mark_startup_loaded(self, name):
+        """记录启动阶段某项数据加载完成，全部完成时记录可交互时间"""
+        if name not in self.startup_pending:
+            return
+        self.startup_pending.discard(name)
+        elapsed = (time.perf_counter() - STARTUP_STARTED_AT) * 1000
+        startup_logger.info(f"Startup: {name} loaded after {elapsed:.0f} ms")
+        if not self.startup_pending:
+            startup_logger.info(f"Startup: time to interactive {elapsed:.0f} ms")
 
     def create_packages_tab(self):
         widget = QWidget()
@@ -193,7 +263,7 @@ class BrewGUI(QMainWindow):
         # 标题
         title_label = QLabel("包管理")
         title_label.setFont(QFont('', 16, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #4CAF50; margin-bottom: 10px;")
+        title_label.setObjectName("tabTitle")
         layout.addWidget(title_label)
 
         # 搜索区域
@@ -204,68 +274,98 @@ class BrewGUI(QMainWindow):
         search_button = QPushButton("搜索")
         search_button.setMinimumHeight(36)
         search_button.clicked.connect(self.search_packages)
+
+        # 边输入边搜索：输入停顿后才真正发起查询
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_packages)
+        self.search_input.textChanged.connect(lambda _text: self.search_timer.start())
+        self.search_input.returnPressed.connect(self.search_packages)
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_button)
         layout.addLayout(search_layout)
 
-        # 包列表
-        self.package_list = QListWidget()
+        # 包列表：已安装的包和搜索结果共用一个模型，行高一致，视图无需逐行测量
+        self.package_model = PackageListModel(self)
+        self.package_list = QListView()
+        self.package_list.setModel(self.package_model)
+        self.package_list.setUniformItemSizes(True)
         self.package_list.setSpacing(2)
         self.package_list.setMinimumHeight(300)
-        self.package_list.setStyleSheet("""
-            QListWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #3d3d3d;
-            }
-            QListWidget::item:selected {
-                background-color: #4CAF50;
-                color: white;
-                border-radius: 4px;
-            }
-            QListWidget::item:hover {
-                background-color: #454545;
-                border-radius: 4px;
-            }
-        """)
-        layout.addWidget(self.package_list)
+        # 支持多选，批量安装/卸载
+        self.package_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.package_list.setObjectName("packageList")
+        self.package_list.selectionModel().currentChanged.connect(lambda current, _previous: self.show_package_details())
+
+        # 包详情面板：元数据由 brew info 批量查询，命中缓存时立即显示
+        self.package_details = QTextBrowser()
+        self.package_details.setOpenExternalLinks(True)
+        self.package_details.setObjectName("packageDetails")
+        self.package_details.setPlaceholderText("选择一个包查看详情")
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.package_list)
+        splitter.addWidget(self.package_details)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
+        layout.addWidget(splitter)
+
+        # 滚动或列表内容变化后，预取可见行的元数据
+        self.metadata_prefetch_timer = QTimer(self)
+        self.metadata_prefetch_timer.setSingleShot(True)
+        self.metadata_prefetch_timer.setInterval(METADATA_PREFETCH_DEBOUNCE_MS)
+        self.metadata_prefetch_timer.timeout.connect(self.prefetch_visible_metadata)
+        self.package_list.verticalScrollBar().valueChanged.connect(lambda _value: self.metadata_prefetch_timer.start())
+        self.package_model.modelReset.connect(self.metadata_prefetch_timer.start)
+        self.package_model.rowsInserted.connect(lambda *_args: self.metadata_prefetch_timer.start())
+
+        # 操作进度与实时日志
+        self.operation_progress = QProgressBar()
+        self.operation_progress.setVisible(False)
+        self.operation_progress.setMaximumHeight(18)
+        layout.addWidget(self.operation_progress)
+
+        self.operation_log = QPlainTextEdit()
+        self.operation_log.setReadOnly(True)
+        self.operation_log.setMaximumBlockCount(OPERATION_LOG_MAX_LINES)
+        self.operation_log.setMaximumHeight(140)
+        self.operation_log.setPlaceholderText("操作日志")
+        self.operation_log.setObjectName("operationLog")
+        layout.addWidget(self.operation_log)
+
+        # 输出先进入有界缓冲区，由定时器批量刷新到日志面板
+        self.log_buffer = deque(maxlen=OPERATION_LOG_MAX_LINES)
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setInterval(OPERATION_LOG_FLUSH_MS)
+        self.log_flush_timer.timeout.connect(self.flush_operation_log)
+        # 进行中的批量操作的进度，按 start_progress 返回的编号区分，进度条显示所有操作的合计
+        self.operation_progresses = {}
+        self.progress_ids = itertools.count()
 
         # 操作按钮
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
         
         refresh_button = QPushButton("刷新列表")
+        orphans_button = QPushButton("清理孤立依赖")
         install_button = QPushButton("安装")
         uninstall_button = QPushButton("卸载")
 
-        for button in [refresh_button, install_button, uninstall_button]:
+        for button in [refresh_button, orphans_button, install_button, uninstall_button]:
             button.setMinimumHeight(36)
             button.setMinimumWidth(120)
 
-        install_button.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
-
-        uninstall_button.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
+        install_button.setProperty("variant", "primary")
+        uninstall_button.setProperty("variant", "danger")
 
         refresh_button.clicked.connect(self.refresh_packages)
+        orphans_button.clicked.connect(self.remove_orphans)
         install_button.clicked.connect(self.install_package)
         uninstall_button.clicked.connect(self.uninstall_package)
 
         button_layout.addWidget(refresh_button)
+        button_layout.addWidget(orphans_button)
         button_layout.addStretch()
         button_layout.addWidget(install_button)
         button_layout.addWidget(uninstall_button)
@@ -274,6 +374,9 @@ class BrewGUI(QMainWindow):
         return widget
 
     def create_services_tab(self):
+        from service_model import STATUS_TEXTS, ServiceDelegate
+
+        self.create_data_models()
         widget = QWidget()
         layout = QVBoxLayout(widget)
         layout.setSpacing(10)
@@ -282,48 +385,27 @@ class BrewGUI(QMainWindow):
         # 标题
         title_label = QLabel("服务管理")
         title_label.setFont(QFont('', 16, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #4CAF50; margin-bottom: 10px;")
+        title_label.setObjectName("tabTitle")
         layout.addWidget(title_label)
 
-        # 服务列表
-        self.service_list = QListWidget()
+        # 服务列表：由委托直接绘制每一行，选中效果由视图绘制
+        self.service_list = QListView()
+        self.service_list.setModel(self.service_model)
+        self.service_list.setItemDelegate(ServiceDelegate(self.service_list))
+        self.service_list.setUniformItemSizes(True)
         self.service_list.setSpacing(2)
         self.service_list.setMinimumHeight(300)
-        self.service_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #3d3d3d;
-                border-radius: 4px;
-                padding: 5px;
-                background-color: #383838;
-            }
-            QListWidget::item {
-                border-radius: 4px;
-                margin: 2px;
-                padding: 0px;
-            }
-            QListWidget::item:selected {
-                background-color: #4CAF50;
-            }
-            QListWidget::item:hover {
-                background-color: #454545;
-            }
-        """)
-        
-        # 连接选择变化信号
-        self.service_list.itemSelectionChanged.connect(self.on_service_selection_changed)
+        # 支持多选，批量启动/停止/重启
+        self.service_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.service_list.setObjectName("serviceList")
         layout.addWidget(self.service_list)
 
         # 状态指示器布局
         status_layout = QHBoxLayout()
-        status_indicators = [
-            ("运行中", "#4CAF50"),
-            ("已停止", "#f44336"),
-            ("未知", "#FFA500")
-        ]
-        
-        for status, color in status_indicators:
-            indicator = QLabel(f"● {status}")
-            indicator.setStyleSheet(f"color: {color}; font-weight: bold; padding: 5px;")
+        for status, status_text in STATUS_TEXTS.items():
+            indicator = QLabel(f"● {status_text}")
+            indicator.setObjectName("statusLegend")
+            indicator.setProperty("status", status)
             status_layout.addWidget(indicator)
         
         status_layout.addStretch()
@@ -342,35 +424,9 @@ class BrewGUI(QMainWindow):
             button.setMinimumHeight(36)
             button.setMinimumWidth(100)
 
-        start_button.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
-
-        stop_button.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
-
-        restart_button.setStyleSheet("""
-            QPushButton {
-                background-color: #FF9800;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #F57C00;
-            }
-        """)
+        start_button.setProperty("variant", "primary")
+        stop_button.setProperty("variant", "danger")
+        restart_button.setProperty("variant", "warning")
 
         refresh_button.clicked.connect(self.refresh_services)
         start_button.clicked.connect(lambda: self.manage_service("start"))
@@ -387,6 +443,9 @@ class BrewGUI(QMainWindow):
         return widget
 
     def create_ports_tab(self):
+        from port_model import PORT_COLUMN_INDEX
+
+        self.create_data_models()
         widget = QWidget()
         layout = QVBoxLayout(widget)
         layout.setSpacing(10)
@@ -397,66 +456,62 @@ class BrewGUI(QMainWindow):
         
         title_label = QLabel("端口管理")
         title_label.setFont(QFont('', 16, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #4CAF50; margin-bottom: 10px;")
+        title_label.setObjectName("tabTitle")
         
         info_label = QLabel("(显示所有正在监听的端口)")
-        info_label.setStyleSheet("color: #888888; margin-bottom: 10px;")
+        info_label.setObjectName("tabHint")
+        
+        self.port_count_label = QLabel()
+        self.port_count_label.setObjectName("tabHint")
         
         title_layout.addWidget(title_label)
         title_layout.addWidget(info_label)
         title_layout.addStretch()
+        title_layout.addWidget(self.port_count_label)
         
         layout.addLayout(title_layout)
 
-        # 创建端口表格
-        self.port_table = QTableWidget()
-        self.port_table.setColumnCount(4)
-        self.port_table.setHorizontalHeaderLabels(['端口', 'PID', '进程名称', '状态'])
-        
-        # 设置表格样式
-        self.port_table.setStyleSheet("""
-            QTableWidget {
-                background-color: #383838;
-                border: 1px solid #3d3d3d;
-                border-radius: 4px;
-                gridline-color: #2d2d2d;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                color: white;
-            }
-            QTableWidget::item:selected {
-                background-color: #4CAF50;
-            }
-            QHeaderView::section {
-                background-color: #2d2d2d;
-                color: white;
-                padding: 8px;
-                border: 1px solid #3d3d3d;
-                font-weight: bold;
-            }
-            QTableCornerButton::section {
-                background-color: #2d2d2d;
-                border: 1px solid #3d3d3d;
-            }
-        """)
+        # 过滤输入框：进程名、地址、端口或端口范围
+        self.port_filter_input = QLineEdit()
+        self.port_filter_input.setPlaceholderText("过滤：进程名、地址、端口或端口范围（如 8000-9000）")
+        self.port_filter_timer = QTimer(self)
+        self.port_filter_timer.setSingleShot(True)
+        self.port_filter_timer.setInterval(PORT_FILTER_DEBOUNCE_MS)
+        self.port_filter_timer.timeout.connect(self.apply_port_filter)
+        self.port_filter_input.textChanged.connect(lambda _text: self.port_filter_timer.start())
+        layout.addWidget(self.port_filter_input)
+
+        # 创建端口表格，数据来自 port_model，经 port_proxy 排序和过滤
+        self.port_table = QTableView()
+        self.port_table.setModel(self.port_proxy)
+        self.port_table.setObjectName("portTable")
+        self.port_table.setSortingEnabled(True)
+        self.port_table.sortByColumn(PORT_COLUMN_INDEX['port'], Qt.SortOrder.AscendingOrder)
         
-        # 设置表格头部样式
+        # 固定列宽和行高，数据变化时不必重新测量单元格
         header = self.port_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        for key, width in PORT_COLUMN_WIDTHS.items():
+            header.resizeSection(PORT_COLUMN_INDEX[key], width)
+        header.setSectionResizeMode(PORT_COLUMN_INDEX['name'], QHeaderView.ResizeMode.Stretch)
+        vertical_header = self.port_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.fontMetrics().height() + 16)
         
         # 设置垂直表头不可见
-        self.port_table.verticalHeader().setVisible(False)
+        vertical_header.setVisible(False)
         
         # 设置表格选择模式
-        self.port_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.port_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.port_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.port_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         
         layout.addWidget(self.port_table)
 
+        for signal in (self.port_proxy.rowsInserted, self.port_proxy.rowsRemoved,
+                       self.port_proxy.modelReset, self.port_proxy.layoutChanged):
+            signal.connect(self.update_port_count)
+        self.update_port_count()
+
         # 按钮布局
         button_layout = QHBoxLayout()
         
@@ -468,20 +523,24 @@ class BrewGUI(QMainWindow):
         refresh_button.setMinimumWidth(120)
         kill_button.setMinimumWidth(120)
         
-        kill_button.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #da190b;
-            }
-        """)
+        kill_button.setProperty("variant", "danger")
         
         refresh_button.clicked.connect(self.refresh_ports)
         kill_button.clicked.connect(self.kill_process)
+
+        # 自动刷新间隔
+        interval_label = QLabel("自动刷新：")
+        interval_combo = QComboBox()
+        for title, interval_ms in PORT_POLL_INTERVALS:
+            interval_combo.addItem(title, interval_ms)
+        interval_combo.setCurrentIndex(interval_combo.findData(self.port_monitor.interval_ms))
+        interval_combo.currentIndexChanged.connect(
+            lambda index: self.port_monitor.set_interval(interval_combo.itemData(index))
+        )
         
         button_layout.addWidget(refresh_button)
+        button_layout.addWidget(interval_label)
+        button_layout.addWidget(interval_combo)
         button_layout.addStretch()
         button_layout.addWidget(kill_button)
         
@@ -489,131 +548,505 @@ class BrewGUI(QMainWindow):
         
         return widget
 
+    def create_upgrades_tab(self):
+        from upgrade_model import UPGRADE_COLUMN_INDEX, UpgradeTableModel
+
+        self.upgrade_model = UpgradeTableModel(self)
+        self.upgrade_model.set_placeholder("点击“检查更新”查询可升级的包")
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # 标题
+        title_label = QLabel("升级")
+        title_label.setFont(QFont('', 16, QFont.Weight.Bold))
+        title_label.setObjectName("tabTitle")
+        layout.addWidget(title_label)
+
+        info_label = QLabel("先并行下载所有新版本，再逐个安装")
+        info_label.setObjectName("tabHint")
+        layout.addWidget(info_label)
+
+        # 升级计划表格：每个包的版本、状态、下载大小和两个阶段的耗时
+        self.upgrade_table = QTableView()
+        self.upgrade_table.setModel(self.upgrade_model)
+        self.upgrade_table.setObjectName("upgradeTable")
+        self.upgrade_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.upgrade_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.upgrade_table.verticalHeader().setVisible(False)
+        header = self.upgrade_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(UPGRADE_COLUMN_INDEX['versions'], QHeaderView.ResizeMode.Stretch)
+        header.resizeSection(UPGRADE_COLUMN_INDEX['name'], 180)
+        layout.addWidget(self.upgrade_table)
+
+        # 下载速度与各阶段耗时
+        self.upgrade_summary_label = QLabel("")
+        self.upgrade_summary_label.setObjectName("tabHint")
+        layout.addWidget(self.upgrade_summary_label)
+
+        self.upgrade_log = QPlainTextEdit()
+        self.upgrade_log.setReadOnly(True)
+        self.upgrade_log.setMaximumBlockCount(OPERATION_LOG_MAX_LINES)
+        self.upgrade_log.setMaximumHeight(140)
+        self.upgrade_log.setPlaceholderText("升级日志")
+        self.upgrade_log.setObjectName("operationLog")
+        layout.addWidget(self.upgrade_log)
+
+        # 升级进行中定时重绘表格、刷新日志；输出同样先进入有界缓冲区
+        self.upgrade_log_buffer = deque(maxlen=OPERATION_LOG_MAX_LINES)
+        self.upgrade_refresh_timer = QTimer(self)
+        self.upgrade_refresh_timer.setInterval(UPGRADE_REFRESH_MS)
+        self.upgrade_refresh_timer.timeout.connect(self.refresh_upgrade_progress)
+
+        # 操作按钮
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        check_button = QPushButton("检查更新")
+        upgrade_selected_button = QPushButton("升级所选")
+        upgrade_all_button = QPushButton("全部升级")
+
+        for button in [check_button, upgrade_selected_button, upgrade_all_button]:
+            button.setMinimumHeight(36)
+            button.setMinimumWidth(120)
+
+        upgrade_all_button.setProperty("variant", "primary")
+
+        check_button.clicked.connect(self.check_outdated)
+        upgrade_selected_button.clicked.connect(lambda: self.upgrade_packages(selected_only=True))
+        upgrade_all_button.clicked.connect(lambda: self.upgrade_packages(selected_only=False))
+
+        button_layout.addWidget(check_button)
+        button_layout.addStretch()
+        button_layout.addWidget(upgrade_selected_button)
+        button_layout.addWidget(upgrade_all_button)
+        layout.addLayout(button_layout)
+
+        return widget
+
+    def create_disk_usage_tab(self):
+        from disk_usage_model import DISK_USAGE_COLUMN_INDEX, DiskUsageTableModel
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # 标题
+        title_label = QLabel("磁盘占用")
+        title_label.setFont(QFont('', 16, QFont.Weight.Bold))
+        title_label.setObjectName("tabTitle")
+        layout.addWidget(title_label)
+
+        # 总占用与可清理的空间
+        self.disk_usage_summary_label = QLabel("正在统计磁盘占用...")
+        self.disk_usage_summary_label.setObjectName("tabHint")
+        layout.addWidget(self.disk_usage_summary_label)
+
+        self.disk_usage_model = DiskUsageTableModel(self)
+        self.disk_usage_model.set_placeholder("正在统计磁盘占用...")
+        disk_usage_table = QTableView()
+        disk_usage_table.setModel(self.disk_usage_model)
+        disk_usage_table.setObjectName("diskUsageTable")
+        disk_usage_table.setSortingEnabled(True)
+        disk_usage_table.sortByColumn(DISK_USAGE_COLUMN_INDEX['total'], Qt.SortOrder.DescendingOrder)
+        disk_usage_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        disk_usage_table.verticalHeader().setVisible(False)
+        header = disk_usage_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(DISK_USAGE_COLUMN_INDEX['name'], QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(disk_usage_table)
+
+        # 操作按钮
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        refresh_button = QPushButton("重新统计")
+        refresh_button.setMinimumHeight(36)
+        refresh_button.setMinimumWidth(120)
+        refresh_button.clicked.connect(self.refresh_disk_usage)
+
+        button_layout.addWidget(refresh_button)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+
+        self.refresh_disk_usage()
+        return widget
+
+    def create_diagnostics_tab(self):
+        from metrics_model import METRICS_COLUMN_INDEX, MetricsTableModel
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # 标题
+        title_label = QLabel("诊断")
+        title_label.setFont(QFont('', 16, QFont.Weight.Bold))
+        title_label.setObjectName("tabTitle")
+        layout.addWidget(title_label)
+
+        info_label = QLabel("brew 命令、BrewManager 调用（manager.*）和界面刷新（ui.*）的次数与耗时分布，"
+                            "分位数按每项最近的调用计算")
+        info_label.setObjectName("tabHint")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        self.metrics_model = MetricsTableModel(self)
+        metrics_table = QTableView()
+        metrics_table.setModel(self.metrics_model)
+        metrics_table.setObjectName("metricsTable")
+        metrics_table.setSortingEnabled(True)
+        metrics_table.sortByColumn(METRICS_COLUMN_INDEX['total'], Qt.SortOrder.DescendingOrder)
+        metrics_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        metrics_table.verticalHeader().setVisible(False)
+        header = metrics_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(METRICS_COLUMN_INDEX['name'], QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(metrics_table)
+
+        # 操作按钮
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        reset_button = QPushButton("清空统计")
+        export_json_button = QPushButton("导出 JSON")
+        export_prometheus_button = QPushButton("导出 Prometheus")
+
+        for button in [reset_button, export_json_button, export_prometheus_button]:
+            button.setMinimumHeight(36)
+            button.setMinimumWidth(120)
+
+        reset_button.clicked.connect(self.reset_metrics)
+        export_json_button.clicked.connect(lambda: self.export_metrics("json"))
+        export_prometheus_button.clicked.connect(lambda: self.export_metrics("prometheus"))
+
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(export_json_button)
+        button_layout.addWidget(export_prometheus_button)
+        layout.addLayout(button_layout)
+
+        # 只在诊断页可见时定时刷新
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(DIAGNOSTICS_REFRESH_MS)
+        self.diagnostics_timer.timeout.connect(self.refresh_metrics)
+        self.diagnostics_timer.start()
+        return widget
+
+    def show_diagnostics_tab(self, select=True):
+        """显示隐藏的诊断页"""
+        if self.diagnostics_tab_index is None:
+            self.diagnostics_tab_index = self.add_lazy_tab(self.create_diagnostics_tab, "诊断")
+        if select:
+            self.tabs.setCurrentIndex(self.diagnostics_tab_index)
+
+    def refresh_metrics(self):
+        if self.tabs.currentIndex() != self.diagnostics_tab_index or self.isMinimized():
+            return
+        self.metrics_model.set_metrics(self.brew_manager.metrics.snapshot())
+
+    def reset_metrics(self):
+        self.brew_manager.metrics.reset()
+        self.metrics_model.set_metrics([])
+
+    def export_metrics(self, fmt):
+        """把统计结果导出为 JSON 或 Prometheus 文本格式"""
+        if fmt == "json":
+            default_name, file_filter = "brew-gui-metrics.json", "JSON (*.json)"
+        else:
+            default_name, file_filter = "brew-gui-metrics.prom", "Prometheus (*.prom *.txt)"
+        path, _ = QFileDialog.getSaveFileName(self, "导出诊断数据", default_name, file_filter)
+        if not path:
+            return
+        metrics = self.brew_manager.metrics
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(metrics.to_json() if fmt == "json" else metrics.to_prometheus())
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出失败：{str(e)}")
+
+    def timed_result(self, name, on_result):
+        """包装 on_result，记录从提交后台任务到界面更新完成的耗时（指标名 ui.<name>）"""
+        started = time.perf_counter()
+
+        def wrapped(data):
+            try:
+                on_result(data)
+            finally:
+                self.brew_manager.metrics.record(f"ui.{name}", time.perf_counter() - started)
+        return wrapped
+
+    def refresh_disk_usage(self):
+        """在后台统计磁盘占用，已有统计在运行时不重复发起"""
+        if self.disk_usage_task is not None:
+            return
+        self.disk_usage_summary_label.setText("正在统计磁盘占用...")
+        self.disk_usage_task = self.executor.submit(
+            self.brew_manager.get_disk_usage,
+            on_result=self.update_disk_usage,
+            on_error=self.on_disk_usage_failed
+        )
+
+    def refresh_disk_usage_if_stale(self):
+        """磁盘占用页可见且统计结果已过期（安装/卸载/升级之后）时重新统计"""
+        if self.tabs.tabText(self.tabs.currentIndex()) != "磁盘占用":
+            return
+        if self.brew_manager.disk_usage.cached_report() is None:
+            self.refresh_disk_usage()
+
+    def on_disk_usage_failed(self, msg):
+        self.disk_usage_task = None
+        self.disk_usage_summary_label.setText("统计磁盘占用失败")
+        self.show_task_error("统计磁盘占用失败", msg)
+
+    def update_disk_usage(self, report):
+        from upgrade_model import format_bytes
+
+        self.disk_usage_task = None
+        self.disk_usage_model.set_packages(report.packages)
+        self.disk_usage_summary_label.setText(
+            f"已安装的包共 {format_bytes(report.installed_bytes)}，"
+            f"下载缓存 {format_bytes(report.cache_bytes)}，"
+            f"brew cleanup 可释放约 {format_bytes(report.reclaimable_bytes)}"
+            f"（统计用时 {report.scan_seconds:.1f} 秒）"
+        )
+        # 统计期间有包被安装或卸载时，结果已经过期，重新统计
+        self.refresh_disk_usage_if_stale()
+
     def refresh_packages(self):
+        """在后台获取已安装包列表"""
+        self.executor.submit(
+            self.brew_manager.get_installed_packages,
+            on_result=self.timed_result("refresh_packages", self.update_package_list),
+            on_error=lambda msg: self.show_task_error("刷新包列表失败", msg)
+        )
+
+    def update_package_list(self, packages):
         try:
-            self.package_list.clear()
-            packages = self.brew_manager.get_installed_packages()
+            self.package_model.set_packages(packages)
             if not packages:
                 logging.warning("No packages found or error occurred")
                 QMessageBox.warning(self, "警告", "获取包列表失败或没有安装的包")
                 return
-            self.package_list.addItems(packages)
         except Exception as e:
             logging.error(f"Error refreshing packages: {e}")
             QMessageBox.critical(self, "错误", f"刷新包列表失败：{str(e)}")
 
     def refresh_services(self):
+        """在后台获取服务列表"""
+        self.executor.submit(
+            self.brew_manager.get_services,
+            on_result=self.timed_result("refresh_services", self.update_service_list),
+            on_error=lambda msg: self.show_task_error("刷新服务列表失败", msg)
+        )
+
+    def refresh_service(self, service_name):
+        """在后台重新查询单个服务的状态"""
+        self.executor.submit(
+            self.brew_manager.refresh_service, service_name,
+            on_result=self.update_service,
+            on_error=lambda msg: self.show_task_error("刷新服务状态失败", msg)
+        )
+
+    def running_service_pids(self):
+        """从缓存的服务状态中取出正在运行的服务的 PID"""
+        return {record.name: record.pid for record in self.brew_manager.services_snapshot() if record.pid}
+
+    def update_service(self, record):
+        # 查询失败或列表中还没有该服务时刷新整个列表
+        if record is None or not self.service_model.update_service(record):
+            self.refresh_services()
+
+    def update_service_list(self, services):
         try:
-            self.service_list.clear()
-            services = self.brew_manager.get_services()
             if not services:
                 logging.warning("No services found or error occurred")
-                return
-            
-            for service in services:
-                if service.strip():
-                    service_parts = service.split()
-                    if len(service_parts) >= 2:
-                        name = service_parts[0]
-                        status = service_parts[1]
-                        
-                        # 创建带有状态标识的服务项
-                        if status.lower() == "started":
-                            status_color = "#4CAF50"  # 绿色
-                            status_text = "运行中"
-                        elif status.lower() == "none":
-                            status_color = "#f44336"  # 红色
-                            status_text = "已停止"
-                        else:
-                            status_color = "#FFA500"  # 橙色
-                            status_text = "未知"
-                        
-                        # 创建自定义部件
-                        container = QWidget()
-                        container.setObjectName("serviceContainer")
-                        container.setStyleSheet("""
-                            QWidget#serviceContainer {
-                                border-radius: 4px;
-                                padding: 5px;
-                            }
-                        """)
-                        
-                        layout = QHBoxLayout(container)
-                        layout.setContentsMargins(8, 8, 8, 8)
-                        layout.setSpacing(15)
-                        
-                        # 服务名称标签
-                        name_label = QLabel(name)
-                        name_label.setStyleSheet("color: white;")
-                        name_label.setFont(QFont('', 12))
-                        name_label.setMinimumWidth(150)
-                        
-                        # 状态指示器标签
-                        status_label = QLabel(f"● {status_text}")
-                        status_label.setStyleSheet(f"color: {status_color};")
-                        status_label.setFont(QFont('', 12))
-                        status_label.setMinimumWidth(100)
-                        
-                        layout.addWidget(name_label)
-                        layout.addStretch()
-                        layout.addWidget(status_label)
-                        
-                        # 设置容器的固定高度
-                        container.setFixedHeight(40)
-                        
-                        # 创建列表项
-                        item = QListWidgetItem()
-                        item.setData(Qt.ItemDataRole.UserRole, name)
-                        item.setSizeHint(container.sizeHint())
-                        
-                        self.service_list.addItem(item)
-                        self.service_list.setItemWidget(item, container)
-                        
+            self.service_model.set_services(services)
         except Exception as e:
             logging.error(f"Error refreshing services: {e}")
             QMessageBox.critical(self, "错误", f"刷新服务列表失败：{str(e)}")
 
+    def show_task_error(self, title, message):
+        """显示后台任务抛出的异常"""
+        QMessageBox.critical(self, "错误", f"{title}：{message}")
+
     def search_packages(self):
+        """发起搜索（输入防抖结束、回车或点击搜索按钮时调用）"""
         try:
-            query = self.search_input.text()
-            if query:
-                self.package_list.clear()
-                results = self.brew_manager.search_package(query)
-                self.package_list.addItems(results)
+            self.search_timer.stop()
+            query = self.search_input.text().strip()
+            self.search_generation += 1
+
+            if not query:
+                # 清空搜索框时恢复已安装包列表
+                self.pending_search = None
+                self.last_search = None
+                self.executor.cancel(self.search_task)
+                self.refresh_packages()
+                return
+
+            if self.search_task is not None:
+                # 取消正在进行的查询，只保留最新的一个，等当前查询结束后再发起
+                self.pending_search = query
+                self.brew_manager.cancel_search()
+                return
+
+            self.start_search(query)
         except Exception as e:
             logging.error(f"Error searching packages: {e}")
             QMessageBox.critical(self, "错误", f"搜索包失败：{str(e)}")
 
+    def start_search(self, query):
+        """在后台线程中执行查询"""
+        within = None
+        if self.last_search and query.startswith(self.last_search[0]):
+            # 新查询是上一次查询的延伸，只需在上一次的结果中缩小范围
+            within = self.last_search[1]
+
+        generation = self.search_generation
+        self.search_task = self.executor.submit(
+            self.brew_manager.search_package, query, within,
+            on_result=lambda results: self.on_search_finished(generation, query, results),
+            on_error=lambda _msg: self.on_search_finished(generation, query, []),
+            on_cancel=self.on_search_cancelled
+        )
+
+    def on_search_cancelled(self):
+        """搜索任务被取消后不会再返回结果，在这里结束正在运行的 brew search 并允许发起新查询"""
+        self.search_task = None
+        self.brew_manager.cancel_search()
+
+    def on_search_finished(self, generation, query, results):
+        """处理搜索结果，丢弃过期的结果"""
+        try:
+            self.search_task = None
+            if self.pending_search is not None:
+                pending, self.pending_search = self.pending_search, None
+                self.start_search(pending)
+                return
+            if generation != self.search_generation:
+                return
+
+            self.last_search = (query, results)
+            self.package_model.set_packages(results)
+        except Exception as e:
+            logging.error(f"Error handling search results: {e}")
+            QMessageBox.critical(self, "错误", f"搜索包失败：{str(e)}")
+
+    def selected_package_names(self):
+        """返回包列表中选中的包名（保持列表中的顺序）"""
+        rows = sorted(index.row() for index in self.package_list.selectionModel().selectedRows())
+        names = [self.package_model.name_at(row) for row in rows]
+        return [name.split()[0] for name in names if name.strip()]  # Get first word only
+
+    def current_package_name(self):
+        """返回包列表当前行的包名，没有时返回 None"""
+        index = self.package_list.currentIndex()
+        if not index.isValid():
+            return None
+        names = self.package_model.names_in_rows(index.row(), index.row())
+        return names[0].split()[0] if names and names[0].strip() else None
+
+    def show_package_details(self):
+        """显示当前包的详情，未缓存时在后台查询"""
+        name = self.current_package_name()
+        if name is None:
+            self.package_details.clear()
+            return
+        hit, info = self.brew_manager.package_info.cached(name)
+        if hit:
+            self.package_details.setHtml(format_package_details(name, info))
+            return
+        self.package_details.setHtml(f"<h3>{html.escape(name)}</h3><p>正在加载...</p>")
+        self.request_metadata([name], urgent=True)
+
+    def prefetch_visible_metadata(self):
+        """预取可见行（以及上下各 METADATA_PREFETCH_MARGIN 行）的元数据"""
+        viewport = self.package_list.viewport()
+        first = self.package_list.indexAt(QPoint(0, 0)).row()
+        last = self.package_list.indexAt(QPoint(0, viewport.height() - 1)).row()
+        if first < 0:
+            return
+        if last < 0:
+            last = self.package_model.rowCount() - 1
+        names = [name.split()[0] for name in self.package_model.names_in_rows(
+            first - METADATA_PREFETCH_MARGIN, last + METADATA_PREFETCH_MARGIN) if name.strip()]
+        self.request_metadata([name for name in names if not self.brew_manager.package_info.cached(name)[0]])
+
+    def request_metadata(self, names, urgent=False):
+        """排队查询元数据；同一时间只有一个查询任务，结束后再查询排队的包名
+
+        urgent 的包名（当前选中的包）排在最前面，其余的包名只保留最近一次请求的。
+        """
+        if not names:
+            return
+        if urgent:
+            self.metadata_pending = list(dict.fromkeys(names + self.metadata_pending))
+        else:
+            current = self.current_package_name()
+            kept = [current] if current in self.metadata_pending else []
+            self.metadata_pending = list(dict.fromkeys(kept + names))
+        if self.metadata_task is None:
+            self.start_metadata_fetch()
+
+    def start_metadata_fetch(self):
+        names, self.metadata_pending = self.metadata_pending, []
+        self.metadata_task = self.executor.submit(
+            self.brew_manager.get_package_info, names,
+            on_result=self.on_metadata_fetched,
+            on_error=lambda _msg: self.on_metadata_fetched({})
+        )
+
+    def on_metadata_fetched(self, results):
+        self.metadata_task = None
+        name = self.current_package_name()
+        if name is not None and name in results:
+            self.package_details.setHtml(format_package_details(name, results[name]))
+        if self.metadata_pending:
+            self.start_metadata_fetch()
+
     def install_package(self):
         try:
-            package = self.package_list.currentItem()
-            if not package:
+            package_names = self.selected_package_names()
+            if not package_names:
                 QMessageBox.warning(self, "警告", "请选择要安装的包")
                 return
 
-            package_name = package.text().split()[0]  # Get first word only
-            self.worker = BrewWorker(self.brew_manager.install_package, package_name)
-            self.worker.finished.connect(lambda success, msg: self.handle_operation_result(success, msg, "安装"))
-            self.worker.start()
+            jobs = [("install", package_name, False) for package_name in package_names]
+            # 整个批次结束后只刷新一次
+            self.run_operation("安装", self.brew_manager.run_operations, jobs, items=package_names)
         except Exception as e:
             logging.error(f"Error installing package: {e}")
             QMessageBox.critical(self, "错误", f"安装包失败：{str(e)}")
 
     def uninstall_package(self):
         try:
-            package = self.package_list.currentItem()
-            if not package:
+            package_names = self.selected_package_names()
+            if not package_names:
                 QMessageBox.warning(self, "警告", "请选择要卸载的包")
                 return
 
-            # 获取完整的包名（包括版本号等）
-            package_text = package.text().strip()
+            package_text = " ".join(package_names)
             logging.info(f"Attempting to uninstall package: {package_text}")
-            
+
+            # 依赖关系已加载时，在确认前就列出依赖这些包的已安装包
+            dependents_text = ""
+            graph = self.brew_manager.cached_dependency_graph()
+            if graph is not None:
+                blockers = graph.blocking_dependents(package_names)
+                if blockers:
+                    lines = [f"{name}：{', '.join(dependents)}" for name, dependents in sorted(blockers.items())]
+                    dependents_text = "以下已安装的包依赖于要卸载的包：\n" + "\n".join(lines) + "\n\n"
+
             # 创建详细的确认消息
             confirm_message = (
                 f"您确定要卸载以下包吗？\n\n"
                 f"包名: {package_text}\n\n"
+                f"{dependents_text}"
                 "警告：\n"
                 "1. 此操作将删除该包及其配置文件\n"
                 "2. 如果其他包依赖于此包，可能会影响其他软件的运行\n"
@@ -643,15 +1076,17 @@ class BrewGUI(QMainWindow):
             # 尝试卸载
             def try_uninstall(ignore_deps=False):
                 try:
-                    self.worker = BrewWorker(
-                        self.brew_manager.uninstall_package,
-                        package_text,
-                        ignore_deps
-                    )
-                    self.worker.finished.connect(
-                        lambda success, msg: self.handle_uninstall_result(success, msg, package_text)
+                    jobs = [("uninstall", package_name, ignore_deps) for package_name in package_names]
+                    progress_id = self.start_progress("卸载", package_names)
+                    self.executor.submit_operation(
+                        self.brew_manager.run_operations, jobs,
+                        on_result=lambda result: (self.finish_progress(progress_id),
+                                                  self.handle_uninstall_result(*result, package_names)),
+                        on_error=lambda msg: (self.finish_progress(progress_id),
+                                              self.handle_uninstall_result(False, f"操作失败：{msg}", package_names)),
+                        on_progress=self.on_operation_output,
+                        on_event=lambda event: self.on_operation_event(progress_id, event)
                     )
-                    self.worker.start()
                 except Exception as e:
                     logging.error(f"Error starting uninstall worker: {e}")
                     QMessageBox.critical(self, "错误", f"启动卸载操作失败：{str(e)}")
@@ -661,8 +1096,33 @@ class BrewGUI(QMainWindow):
             logging.error(f"Error in uninstall_package: {e}")
             QMessageBox.critical(self, "错误", f"卸载操作失败：{str(e)}")
 
-    def handle_uninstall_result(self, success: bool, message: str, package_name: str):
+    def remove_orphans(self):
+        """列出孤立的依赖，确认后卸载"""
+        self.executor.submit(
+            lambda: self.brew_manager.dependency_graph().orphans(),
+            on_result=self.confirm_remove_orphans,
+            on_error=lambda msg: self.show_task_error("查询孤立依赖失败", msg)
+        )
+
+    def confirm_remove_orphans(self, orphans):
+        if not orphans:
+            QMessageBox.information(self, "提示", "没有孤立的依赖")
+            return
+        reply = QMessageBox.question(
+            self,
+            "确认清理",
+            f"以下 {len(orphans)} 个包是作为依赖安装的，已不再被任何包需要：\n\n"
+            f"{', '.join(orphans)}\n\n确定要卸载吗？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.run_operation("清理孤立依赖", self.brew_manager.uninstall_packages, orphans,
+                               items=orphans)
+
+    def handle_uninstall_result(self, success: bool, message: str, package_names: list):
         try:
+            package_name = " ".join(package_names)
             logging.info(f"Handling uninstall result for {package_name}: success={success}, message={message}")
             
             if not success:
@@ -696,15 +1156,9 @@ class BrewGUI(QMainWindow):
                         logging.info(f"User confirmed force uninstall for {package_name}")
                         # 使用 ignore-dependencies 重试卸载
                         try:
-                            self.worker = BrewWorker(
-                                self.brew_manager.uninstall_package,
-                                package_name,
-                                True  # ignore_dependencies=True
-                            )
-                            self.worker.finished.connect(
-                                lambda s, m: self.handle_operation_result(s, m, "卸载")
-                            )
-                            self.worker.start()
+                            jobs = [("uninstall", name, True) for name in package_names]  # ignore_dependencies=True
+                            self.run_operation("卸载", self.brew_manager.run_operations, jobs,
+                                               items=package_names)
                         except Exception as e:
                             logging.error(f"Error starting force uninstall: {e}")
                             QMessageBox.critical(self, "错误", f"启动强制卸载失败：{str(e)}")
@@ -720,111 +1174,308 @@ class BrewGUI(QMainWindow):
 
     def manage_service(self, action):
         try:
-            selected_items = self.service_list.selectedItems()
-            if not selected_items:
+            selected_rows = self.service_list.selectionModel().selectedRows()
+            if not selected_rows:
                 QMessageBox.warning(self, "警告", "请选择要管理的服务")
                 return
 
-            service_name = selected_items[0].data(Qt.ItemDataRole.UserRole)
-            if not service_name:
+            service_names = [self.service_model.name_at(row)
+                             for row in sorted(index.row() for index in selected_rows)]
+            if len(service_names) == 1:
+                # 操作完成后只重新查询这一个服务
+                service_name = service_names[0]
+                self.run_operation(f"服务{action}", self.brew_manager.manage_service, service_name, action,
+                                   refresh=lambda: self.refresh_service(service_name))
                 return
 
-            self.worker = BrewWorker(self.brew_manager.manage_service, service_name, action)
-            self.worker.finished.connect(lambda success, msg: self.handle_operation_result(success, msg, f"服务{action}"))
-            self.worker.start()
+            # 多个服务并行执行，全部结束后只刷新一次服务列表
+            self.run_operation(f"服务{action}", self.brew_manager.manage_services, service_names, action,
+                               items=service_names, refresh=self.refresh_services)
         except Exception as e:
             logging.error(f"Error managing service: {e}")
             QMessageBox.critical(self, "错误", f"管理服务失败：{str(e)}")
 
-    def handle_operation_result(self, success: bool, message: str, operation: str):
+    def run_operation(self, operation: str, func, *args, items=None, refresh=None):
+        """把返回 (success, message) 的 BrewManager 修改操作加入操作队列
+
+        指定 items（要处理的包名或服务名）时，func 的输出会实时显示在日志面板中，
+        func 对这些项目发出的 ItemDone 事件用于更新进度条。
+        指定 refresh 时无论成功与否都会调用（批量操作可能部分生效），否则只在成功后刷新包列表和服务列表。
+        """
+        progress_id = None
+        on_progress = None
+        on_event = None
+        if items is not None:
+            progress_id = self.start_progress(operation, items)
+            on_progress = self.on_operation_output
+            on_event = lambda event: self.on_operation_event(progress_id, event)
+        return self.executor.submit_operation(
+            func, *args,
+            on_result=lambda result: (self.finish_progress(progress_id),
+                                      self.handle_operation_result(*result, operation, refresh)),
+            on_error=lambda msg: (self.finish_progress(progress_id),
+                                  self.handle_operation_result(False, f"操作失败：{msg}", operation, refresh)),
+            on_progress=on_progress,
+            on_event=on_event
+        )
+
+    def start_progress(self, operation: str, items) -> int:
+        """登记一个批量操作的进度并开始接收操作输出，返回传给 on_operation_event/finish_progress 的编号"""
+        progress_id = next(self.progress_ids)
+        self.operation_progresses[progress_id] = OperationProgress(operation, set(items))
+        self.update_progress_bar()
+        self.log_buffer.append(f"==> {operation}开始")
+        self.log_flush_timer.start()
+        return progress_id
+
+    def on_operation_output(self, line: str):
+        """接收后台命令的一行输出"""
+        self.log_buffer.append(line)
+
+    def on_operation_event(self, progress_id: int, event):
+        """接收后台操作发出的进度事件，只统计该操作请求处理的项目"""
+        progress = self.operation_progresses.get(progress_id)
+        if progress is None or not isinstance(event, ItemDone) or event.name not in progress.items:
+            return
+        progress.done.add(event.name)
+        self.update_progress_bar()
+
+    def update_progress_bar(self):
+        """进度条显示所有进行中的批量操作的合计进度，没有时隐藏"""
+        progresses = list(self.operation_progresses.values())
+        if not progresses:
+            self.operation_progress.setVisible(False)
+            return
+        label = progresses[0].operation if len(progresses) == 1 else f"{len(progresses)} 个操作"
+        self.operation_progress.setRange(0, sum(len(progress.items) for progress in progresses))
+        self.operation_progress.setValue(sum(len(progress.done) for progress in progresses))
+        self.operation_progress.setFormat(f"{label}：%v/%m")
+        self.operation_progress.setVisible(True)
+
+    def flush_operation_log(self):
+        """把缓冲的输出一次性追加到日志面板"""
+        if self.log_buffer:
+            lines = list(self.log_buffer)
+            self.log_buffer.clear()
+            self.operation_log.appendPlainText("\n".join(lines))
+
+    def finish_progress(self, progress_id):
+        """操作结束，移除它的进度；所有批量操作都结束后隐藏进度条"""
+        if progress_id is None:
+            return
+        self.operation_progresses.pop(progress_id, None)
+        self.flush_operation_log()
+        if not self.operation_progresses:
+            self.log_flush_timer.stop()
+        self.update_progress_bar()
+
+    def handle_operation_result(self, success: bool, message: str, operation: str, refresh=None):
         try:
             if success:
                 logging.info(f"{operation}操作完成")
                 QMessageBox.information(self, "成功", f"{operation}操作完成")
-                self.refresh_packages()
-                self.refresh_services()
+                if refresh is not None:
+                    refresh()
+                else:
+                    self.refresh_packages()
+                    self.refresh_services()
             else:
                 if "是否强���卸载？" not in message:  # 避免重复显示依赖警告
                     logging.warning(f"{operation}失败: {message}")
                     QMessageBox.warning(self, "错误", f"{operation}失败: {message}")
+                if refresh is not None:
+                    refresh()
+            self.refresh_disk_usage_if_stale()
         except Exception as e:
             logging.error(f"Error in handle_operation_result: {e}")
             QMessageBox.critical(self, "错误", f"处理操作结果时发生错误：{str(e)}")
 
-    def on_service_selection_changed(self):
-        """处理服务选择变化"""
-        for i in range(self.service_list.count()):
-            item = self.service_list.item(i)
-            container = self.service_list.itemWidget(item)
-            if container:
-                if item.isSelected():
-                    # 选中状态
-                    container.setStyleSheet("""
-                        QWidget#serviceContainer {
-                            background-color: #4CAF50;
-                            border-radius: 4px;
-                            padding: 5px;
-                        }
-                        QLabel {
-                            color: white !important;
-                        }
-                    """)
-                else:
-                    # 未选中状态
-                    container.setStyleSheet("""
-                        QWidget#serviceContainer {
-                            border-radius: 4px;
-                            padding: 5px;
-                        }
-                    """)
+    def check_outdated(self):
+        """在后台查询可升级的包并生成升级计划"""
+        if self.upgrade_task is not None:
+            QMessageBox.warning(self, "警告", "正在升级，请等待完成")
+            return
+        self.upgrade_model.set_placeholder("正在检查可升级的包...")
+        self.upgrade_summary_label.setText("")
+        self.executor.submit(
+            self.brew_manager.plan_upgrade,
+            on_result=self.on_upgrade_plan,
+            on_error=lambda msg: (self.upgrade_model.set_placeholder("检查更新失败"),
+                                  self.show_task_error("检查更新失败", msg))
+        )
+
+    def on_upgrade_plan(self, plan):
+        self.upgrade_model.set_plan(plan)
+        pinned = len(plan.steps) - len(plan.runnable_steps())
+        text = f"共 {len(plan.steps)} 个包可升级"
+        if pinned:
+            text += f"，其中 {pinned} 个已固定"
+        self.upgrade_summary_label.setText(text)
+
+    def upgrade_packages(self, selected_only: bool):
+        """按当前计划升级全部或选中的包"""
+        try:
+            if self.upgrade_task is not None:
+                QMessageBox.warning(self, "警告", "正在升级，请等待完成")
+                return
+            plan = self.upgrade_model.plan
+            if selected_only:
+                rows = sorted(index.row() for index in self.upgrade_table.selectionModel().selectedRows())
+                if not rows:
+                    QMessageBox.warning(self, "警告", "请选择要升级的包")
+                    return
+                plan = plan.subset(self.upgrade_model.names_at(rows))
+            elif any(step.stage != "pending" for step in plan.runnable_steps()):
+                # 已执行过的计划重新生成步骤，避免沿用上一次的结果
+                plan = plan.subset([step.name for step in plan.steps])
+            if not plan.runnable_steps():
+                QMessageBox.warning(self, "警告", "没有可升级的包，请先检查更新")
+                return
+
+            self.upgrade_model.set_plan(plan)
+            self.upgrade_log_buffer.append(f"==> 升级 {len(plan.runnable_steps())} 个包")
+            self.upgrade_refresh_timer.start()
+            # 下载不修改前缀，在线程池中执行；下载结束后安装阶段再加入操作队列。
+            # 后台线程只修改自己的副本，表格显示通过 on_event 送回的快照
+            self.upgrade_task = self.executor.submit(
+                self.brew_manager.fetch_upgrades, plan.snapshot(),
+                on_result=self.install_upgrades,
+                on_error=lambda msg: self.on_upgrade_finished(None, msg),
+                on_progress=self.upgrade_log_buffer.append,
+                on_event=self.upgrade_model.apply_snapshot
+            )
+        except Exception as e:
+            logging.error(f"Error upgrading packages: {e}")
+            QMessageBox.critical(self, "错误", f"升级失败：{str(e)}")
+
+    def install_upgrades(self, plan):
+        """升级的安装阶段，与其他修改操作一起排队；plan 是下载阶段返回的后台副本，这里只转交"""
+        self.upgrade_task = self.executor.submit_operation(
+            self.brew_manager.install_upgrades, plan,
+            on_result=self.on_upgrade_finished,
+            on_error=lambda msg: self.on_upgrade_finished(None, msg),
+            on_progress=self.upgrade_log_buffer.append,
+            on_event=self.upgrade_model.apply_snapshot
+        )
+
+    def refresh_upgrade_progress(self):
+        """刷新升级日志和下载速度（表格随快照更新）"""
+        from upgrade_model import format_bytes
+
+        if self.upgrade_log_buffer:
+            lines = list(self.upgrade_log_buffer)
+            self.upgrade_log_buffer.clear()
+            self.upgrade_log.appendPlainText("\n".join(lines))
+
+        plan = self.upgrade_model.plan
+        parts = []
+        if plan.fetch_started is not None:
+            parts.append(f"下载 {format_bytes(plan.downloaded_bytes)}，"
+                         f"{format_bytes(plan.throughput)}/s，{plan.fetch_seconds:.1f} 秒")
+        if plan.install_started is not None:
+            parts.append(f"安装 {plan.install_seconds:.1f} 秒")
+        if parts:
+            self.upgrade_summary_label.setText("；".join(parts))
+
+    def on_upgrade_finished(self, plan, error=None):
+        self.upgrade_task = None
+        self.upgrade_refresh_timer.stop()
+        self.refresh_upgrade_progress()
+        if plan is None:
+            self.handle_operation_result(False, f"操作失败：{error}", "升级")
+            return
+        success, message = plan.summary()
+        self.handle_operation_result(success, message, "升级", refresh=self.refresh_packages)
+
+    def update_operation_queue(self):
+        """在状态栏显示操作队列：正在执行、等待中的操作，空闲时显示上一个操作的耗时"""
+        running, waiting, history = self.brew_manager.scheduler.snapshot()
+        parts = []
+        if running is not None:
+            parts.append(f"正在执行：{running.description}（{running.run_seconds:.0f} 秒）")
+        if waiting:
+            parts.append("等待中：" + "，".join(
+                f"{job.description}（已等待 {job.wait_seconds:.0f} 秒）" for job in waiting
+            ))
+        if not parts and history:
+            last = history[-1]
+            parts.append(f"上一个操作：{last.description}，等待 {last.wait_seconds:.1f} 秒，"
+                         f"执行 {last.run_seconds:.1f} 秒")
+        text = "　｜　".join(parts)
+        if self.operation_queue_label.text() != text:
+            self.operation_queue_label.setText(text)
 
     def on_tab_changed(self, index):
         """处理标签页切换"""
-        if self.sender().tabText(index) == "端口管理":
-            self.refresh_ports()
+        self.ensure_tab_built(index)
+        if index == self.diagnostics_tab_index:
+            self.refresh_metrics()
+        self.refresh_disk_usage_if_stale()
+        # 切换到端口页时立即扫描，离开后降低扫描频率；服务资源占用只在服务页可见时采样
+        self.update_monitor_visibility()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.WindowStateChange:
+            self.update_monitor_visibility()
+
+    def update_monitor_visibility(self):
+        """按端口页、服务页是否对用户可见（当前标签页且窗口未最小化）启停对应的定时采样"""
+        if not hasattr(self, "tabs") or self.port_monitor is None:
+            return
+        current = None if self.isMinimized() else self.tabs.tabText(self.tabs.currentIndex())
+        self.port_monitor.set_visible(current == "端口管理")
+        self.health_watcher.set_visible(current == "服务管理")
 
     def refresh_ports(self):
         """刷新端口列表"""
-        self.port_worker = PortWorker()
-        self.port_worker.finished.connect(self.update_port_table)
-        self.port_worker.start()
-
-    def update_port_table(self, port_info):
-        """更新端口表格"""
-        self.port_table.setRowCount(0)
-        for info in port_info:
-            row = self.port_table.rowCount()
-            self.port_table.insertRow(row)
-            
-            # 设置单元格内容
-            port_item = QTableWidgetItem(str(info['port']))
-            pid_item = QTableWidgetItem(str(info['pid']))
-            name_item = QTableWidgetItem(info['name'])
-            status_item = QTableWidgetItem(info['status'])
-            
-            # 设置单元格对齐方式
-            port_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            pid_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            name_item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # 添加单元格
-            self.port_table.setItem(row, 0, port_item)
-            self.port_table.setItem(row, 1, pid_item)
-            self.port_table.setItem(row, 2, name_item)
-            self.port_table.setItem(row, 3, status_item)
+        self.port_monitor.poll()
+
+    def update_port_table(self, added, removed, changed):
+        """把两次端口扫描之间的差异应用到表格"""
+        with self.brew_manager.metrics.timer("ui.update_port_table"):
+            self.port_model.apply_changes(added, removed, changed)
+
+    def on_ports_scanned(self, port_info):
+        self.mark_startup_loaded("ports")
+        self.update_port_count()
+
+    def on_port_scan_failed(self, message):
+        # 启动阶段的首次扫描失败也算加载结束，否则永远记录不到可交互时间
+        self.mark_startup_loaded("ports")
+        if self.port_count_label is not None and not self.port_monitor.listeners:
+            self.port_count_label.setText("获取端口信息失败")
+
+    def apply_port_filter(self):
+        self.port_proxy.set_filter_text(self.port_filter_input.text())
+
+    def update_port_count(self, *args):
+        """显示过滤后与全部监听端口的数量"""
+        if self.port_count_label is None:
+            return
+        if "ports" in self.startup_pending:
+            self.port_count_label.setText("正在加载端口信息...")
+            return
+        total = self.port_model.rowCount()
+        shown = self.port_proxy.rowCount()
+        text = f"共 {total} 个" if shown == total else f"显示 {shown} / 共 {total} 个"
+        self.port_count_label.setText(text)
 
     def kill_process(self):
         """结束选中的进程"""
-        selected_items = self.port_table.selectedItems()
-        if not selected_items:
+        selected_rows = self.port_table.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "警告", "请选择要结束的进程")
             return
         
-        # 获取选中行的PID
-        row = selected_items[0].row()
-        pid = int(self.port_table.item(row, 1).text())
-        process_name = self.port_table.item(row, 2).text()
+        # 获取选中行的PID（视图中的行号需要映射回模型中的行号）
+        row = self.port_proxy.mapToSource(selected_rows[0]).row()
+        pid = self.port_model.value(row, 'pid')
+        process_name = self.port_model.value(row, 'name')
+        if pid <= 0:
+            # 没有权限查看该 socket 所属的进程
+            QMessageBox.warning(self, "警告", "无法确定该端口所属的进程")
+            return
         
         # 确认对话框
         reply = QMessageBox.question(
@@ -836,6 +1487,8 @@ class BrewGUI(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            import subprocess
+
             try:
                 # 先尝试使用 sudo kill
                 try:
@@ -852,6 +1505,50 @@ class BrewGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"操作失败：{str(e)}")
 
+    def closeEvent(self, event):
+        """关闭窗口时取消排队中的任务"""
+        if self.port_monitor is not None:
+            self.port_monitor.stop()
+            self.health_watcher.stop()
+        self.operation_queue_timer.stop()
+        if self.diagnostics_timer is not None:
+            self.diagnostics_timer.stop()
+        self.executor.shutdown()
+        if self.async_bridge is not None:
+            self.async_bridge.shutdown()
+        super().closeEvent(event)
+
+def format_package_details(name, info):
+    """把 PackageInfo 格式化为详情面板的 HTML"""
+    escape = html.escape
+    if info is None:
+        return f"<h3>{escape(name)}</h3><p>无法获取该包的信息</p>"
+    rows = [("类型", info.kind), ("最新版本", info.version)]
+    if info.installed_versions:
+        installed = ", ".join(info.installed_versions)
+        if info.outdated:
+            installed += "（有新版本）"
+        if info.pinned:
+            installed += "（已固定）"
+        rows.append(("已安装", installed))
+    rows.append(("Tap", info.tap))
+    rows.append(("许可证", info.license))
+    if info.dependencies:
+        rows.append(("依赖", ", ".join(info.dependencies)))
+    parts = [f"<h3>{escape(info.name)}</h3>"]
+    if info.desc:
+        parts.append(f"<p>{escape(info.desc)}</p>")
+    parts.append("<table>")
+    parts.extend(f"<tr><td><b>{escape(label)}</b>&nbsp;&nbsp;</td><td>{escape(value)}</td></tr>"
+                 for label, value in rows if value)
+    if info.homepage:
+        url = escape(info.homepage, quote=True)
+        parts.append(f"<tr><td><b>主页</b>&nbsp;&nbsp;</td><td><a href=\"{url}\">{url}</a></td></tr>")
+    parts.append("</table>")
+    if info.caveats:
+        parts.append(f"<p><b>注意事项</b></p><pre>{escape(info.caveats)}</pre>")
+    return "".join(parts)
+
 def main():
     app = QApplication(sys.argv)
     window = BrewGUI()
@@ -0,0 +1,190 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+# 每个指标保留的最近样本数，分位数按这些样本计算，内存占用与调用次数无关
+METRICS_SAMPLE_SIZE = 1000
+# 导出的分位数
+METRICS_QUANTILES = (0.5, 0.95, 0.99)
+# Prometheus 指标名的前缀
+PROMETHEUS_PREFIX = "brew_gui"
+
+
+@dataclass
+class MetricSummary:
+    """一个指标的统计结果（耗时单位为秒）"""
+    name: str
+    count: int
+    errors: int
+    total_seconds: float
+    p50: float
+    p95: float
+    p99: float
+    max_seconds: float
+    output_bytes: int
+    # 子进程峰值常驻内存的最大值（字节），没有子进程或无法获取时为 None
+    peak_rss: Optional[int]
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+def quantile(sorted_samples: List[float], q: float) -> float:
+    """最近秩法计算分位数，samples 必须已排序"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+class _Histogram:
+    def __init__(self, sample_size: int):
+        self.samples = deque(maxlen=sample_size)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.output_bytes = 0
+        self.peak_rss: Optional[int] = None
+
+    def summary(self, name: str) -> MetricSummary:
+        ordered = sorted(self.samples)
+        p50, p95, p99 = (quantile(ordered, q) for q in METRICS_QUANTILES)
+        return MetricSummary(name, self.count, self.errors, self.total_seconds, p50, p95, p99,
+                             self.max_seconds, self.output_bytes, self.peak_rss)
+
+
+class MetricsRegistry:
+    """按名称记录调用次数、耗时分布、输出字节数和峰值内存
+
+    记录只是在锁内更新几个数字，分位数在读取时才计算，因此可以包住每一次命令和界面刷新。
+    名称约定："brew <子命令>" 为一条 brew 命令，"manager.<方法>" 为一次 BrewManager 调用，
+    "ui.<方法>" 为一次界面刷新。
+    """
+
+    def __init__(self, sample_size: int = METRICS_SAMPLE_SIZE,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.sample_size = sample_size
+        self.clock = clock
+        self.started_at = time.time()
+        self._histograms: Dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, output_bytes: int = 0, failed: bool = False,
+               peak_rss: Optional[int] = None):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(self.sample_size)
+            histogram.samples.append(seconds)
+            histogram.count += 1
+            histogram.total_seconds += seconds
+            histogram.max_seconds = max(histogram.max_seconds, seconds)
+            histogram.output_bytes += output_bytes
+            if failed:
+                histogram.errors += 1
+            if peak_rss is not None:
+                histogram.peak_rss = max(histogram.peak_rss or 0, peak_rss)
+
+    def record_command(self, result, output_bytes: Optional[int] = None):
+        """记录一条命令的 CommandResult；output_bytes 省略时按结果中的 stdout/stderr 计算"""
+        if output_bytes is None:
+            output_bytes = len(result.stdout.encode()) + len(result.stderr.encode())
+        self.record(command_label(result.command), result.wall_seconds, output_bytes,
+                    not result.success, result.peak_rss)
+
+    @contextmanager
+    def timer(self, name: str):
+        """记录 with 块的耗时，块内抛出异常时计为一次失败"""
+        started = self.clock()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.record(name, self.clock() - started, failed=failed)
+
+    def snapshot(self) -> List[MetricSummary]:
+        """按总耗时从大到小返回所有指标"""
+        with self._lock:
+            summaries = [histogram.summary(name) for name, histogram in self._histograms.items()]
+        summaries.sort(key=lambda summary: summary.total_seconds, reverse=True)
+        return summaries
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "started_at": self.started_at,
+            "sample_size": self.sample_size,
+            "metrics": [asdict(summary) for summary in self.snapshot()],
+        }, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式（耗时为 summary 类型）"""
+        summaries = self.snapshot()
+        prefix = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {prefix}_duration_seconds Wall time of brew commands, BrewManager calls and UI refreshes.",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for summary in summaries:
+            label = _prometheus_label(summary.name)
+            for q, value in zip(METRICS_QUANTILES, (summary.p50, summary.p95, summary.p99)):
+                lines.append(f'{prefix}_duration_seconds{{name="{label}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{name="{label}"}} {summary.total_seconds:.6f}')
+            lines.append(f'{prefix}_duration_seconds_count{{name="{label}"}} {summary.count}')
+        for metric, kind, help_text, value_of in (
+            ("errors_total", "counter", "Calls that failed.", lambda s: s.errors),
+            ("output_bytes_total", "counter", "Bytes written to stdout and stderr.", lambda s: s.output_bytes),
+            ("peak_rss_bytes", "gauge", "Largest peak resident set size of a child process.", lambda s: s.peak_rss),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for summary in summaries:
+                value = value_of(summary)
+                if value is not None:
+                    lines.append(f'{prefix}_{metric}{{name="{_prometheus_label(summary.name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def command_label(command: List[str]) -> str:
+    """命令的指标名：可执行文件名加子命令，不含包名，例如 "brew services info" """
+    if not command:
+        return "unknown"
+    words = [os.path.basename(command[0])]
+    arguments = [argument for argument in command[1:] if not argument.startswith("-")]
+    if arguments:
+        words.append(arguments[0])
+        # brew services 的第二个词是动作
+        if arguments[0] == "services" and len(arguments) > 1:
+            words.append(arguments[1])
+    return " ".join(words)
+
+
+def _prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def timed(name: Optional[str] = None):
+    """记录 BrewManager 方法的每次调用（经 self.metrics），默认名称为 "manager.<方法名>" """
+    def decorator(method):
+        metric = name or f"manager.{method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(metric):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,118 @@
+from typing import Any, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt
+
+from metrics import MetricSummary
+from upgrade_model import format_bytes
+
+_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+# 诊断表格的列：(字段, 标题, 对齐方式)
+METRICS_COLUMNS = [
+    ('name', '名称', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('count', '次数', _RIGHT),
+    ('errors', '失败', _RIGHT),
+    ('p50', 'p50', _RIGHT),
+    ('p95', 'p95', _RIGHT),
+    ('p99', 'p99', _RIGHT),
+    ('max', '最长', _RIGHT),
+    ('total', '总耗时', _RIGHT),
+    ('output', '输出', _RIGHT),
+    ('rss', '峰值内存', _RIGHT),
+]
+METRICS_COLUMN_INDEX = {key: i for i, (key, _, _) in enumerate(METRICS_COLUMNS)}
+
+# 各列的排序键
+_SORT_KEYS = {
+    'name': lambda metric: metric.name,
+    'count': lambda metric: metric.count,
+    'errors': lambda metric: metric.errors,
+    'p50': lambda metric: metric.p50,
+    'p95': lambda metric: metric.p95,
+    'p99': lambda metric: metric.p99,
+    'max': lambda metric: metric.max_seconds,
+    'total': lambda metric: metric.total_seconds,
+    'output': lambda metric: metric.output_bytes,
+    'rss': lambda metric: metric.peak_rss or 0,
+}
+
+
+def format_duration(seconds: float) -> str:
+    """1 秒以内显示毫秒，否则显示秒"""
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+class MetricsTableModel(QAbstractTableModel):
+    """命令、BrewManager 调用和界面刷新的耗时统计表格"""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._metrics: List[MetricSummary] = []
+        self._sort_column = METRICS_COLUMN_INDEX['total']
+        self._sort_order = Qt.SortOrder.DescendingOrder
+
+    def set_metrics(self, metrics: List[MetricSummary]):
+        self.beginResetModel()
+        self._metrics = list(metrics)
+        self._sort_metrics()
+        self.endResetModel()
+
+    def _sort_metrics(self):
+        key = _SORT_KEYS[METRICS_COLUMNS[self._sort_column][0]]
+        self._metrics.sort(key=key, reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    # ------------------------------------------------------------------
+    # Qt 模型接口
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._metrics)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(METRICS_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        key, _, alignment = METRICS_COLUMNS[index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return alignment
+        metric = self._metrics[index.row()]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"平均 {format_duration(metric.mean_seconds)}"
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if key == 'name':
+            return metric.name
+        if key == 'count':
+            return str(metric.count)
+        if key == 'errors':
+            return str(metric.errors) if metric.errors else ""
+        if key in ('p50', 'p95', 'p99'):
+            return format_duration(getattr(metric, key))
+        if key == 'max':
+            return format_duration(metric.max_seconds)
+        if key == 'total':
+            return format_duration(metric.total_seconds)
+        if key == 'output':
+            return format_bytes(metric.output_bytes) if metric.output_bytes else ""
+        if key == 'rss':
+            return format_bytes(metric.peak_rss) if metric.peak_rss else ""
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return METRICS_COLUMNS[section][1]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        if self._metrics:
+            self.layoutAboutToBeChanged.emit()
+            self._sort_metrics()
+            self.layoutChanged.emit()
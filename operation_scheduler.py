@@ -0,0 +1,218 @@
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+# 保留的已完成操作记录数
+JOB_HISTORY_SIZE = 50
+# 接收操作输出（文本行和进度事件）的回调参数名，合并的操作把输出转发给每个调用方
+CALLBACK_PARAMETERS = ("on_output", "on_event")
+
+
+class ItemDone(NamedTuple):
+    """批量操作中的一项（一个包或一个服务）已处理完，通过 on_event 发出，用于计算进度"""
+    name: str
+    success: bool
+
+
+@dataclass
+class OperationJob:
+    """一个修改 Homebrew 前缀的操作（安装、卸载、升级、服务管理）"""
+    job_id: int
+    description: str
+    # 相同 key 的操作在排队期间会被合并
+    key: Optional[Hashable] = None
+    # "waiting"、"running"、"done"、"failed" 或 "cancelled"
+    state: str = "waiting"
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # 合并到这个操作中的其他调用数
+    coalesced: int = 0
+    result: Any = None
+    error: Optional[BaseException] = None
+    # 要执行的调用，参数已绑定
+    call: Optional[Callable[[], Any]] = field(default=None, repr=False)
+    # 所有调用方（包括合并进来的）共用的结果
+    future: Future = field(default_factory=Future, repr=False)
+    # 回调参数名 -> 所有调用方传入的回调，操作的输出转发给每一个
+    listeners: Dict[str, List[Callable]] = field(default_factory=dict, repr=False)
+
+    @property
+    def wait_seconds(self) -> float:
+        """在队列中等待的时间，尚未开始时为到目前为止的时间"""
+        end = self.started_at if self.started_at is not None else time.perf_counter()
+        return end - self.enqueued_at
+
+    @property
+    def run_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+
+class OperationScheduler:
+    """同一 Homebrew 前缀上的修改操作按提交顺序逐个执行
+
+    brew 自身在安装、卸载等操作期间持有前缀锁，同时运行两个修改操作时后一个会直接报错。
+    这里在进程内先排队：等待中的操作只保存在队列里，由调度器自己的一个线程逐个执行，
+    调用方通过 Future 取得结果，不必占用线程池的线程等待。只读查询不经过调度器，仍然并行执行。
+    排队中的相同操作（key 相同）合并为一次执行，所有调用方得到同一个结果，也都收到操作的输出。
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._cond = threading.Condition()
+        self._waiting: deque = deque()
+        self._running: Optional[OperationJob] = None
+        # 执行操作的线程，首次提交时启动
+        self._runner: Optional[threading.Thread] = None
+        self._history: deque = deque(maxlen=JOB_HISTORY_SIZE)
+        self._ids = itertools.count(1)
+
+    def submit(self, description: str, func: Callable, args: Tuple = (),
+               kwargs: Optional[Dict[str, Any]] = None, key: Optional[Hashable] = None,
+               callbacks: Optional[Dict[str, Optional[Callable]]] = None) -> Future:
+        """把 func(*args, **kwargs) 加入队列，立即返回 Future
+
+        callbacks 为 {参数名: 回调}（例如 on_output），func 收到的是转发给所有调用方回调的函数。
+        """
+        callbacks = callbacks or {}
+        with self._cond:
+            target = None
+            if key is not None:
+                target = next((job for job in self._waiting
+                               if job.key == key and not job.future.cancelled()), None)
+            if target is not None:
+                target.coalesced += 1
+                for name, callback in callbacks.items():
+                    if callback is not None and name in target.listeners:
+                        target.listeners[name].append(callback)
+                logging.info(f"Operation '{description}' coalesced into job {target.job_id}")
+                return target.future
+
+            job = OperationJob(next(self._ids), description, key)
+            job.listeners = {name: [callback] if callback is not None else []
+                             for name, callback in callbacks.items()}
+            forwarders = {name: self._forwarder(job, name) for name in callbacks}
+            job.call = functools.partial(func, *args, **(kwargs or {}), **forwarders)
+            if self._running is not None or self._waiting:
+                logging.info(f"Operation '{description}' queued behind {len(self._waiting) + 1} other(s)")
+            self._waiting.append(job)
+            if self._runner is None:
+                self._runner = threading.Thread(target=self._run_jobs, name="brew-operations", daemon=True)
+                self._runner.start()
+            self._cond.notify_all()
+            return job.future
+
+    @staticmethod
+    def _forwarder(job: OperationJob, name: str) -> Callable:
+        def forward(*values):
+            # 操作开始执行后不会再有调用方合并进来，无需加锁
+            for listener in job.listeners[name]:
+                listener(*values)
+        return forward
+
+    def in_runner(self) -> bool:
+        """当前线程是否为执行操作的线程（即处于某个操作内部）"""
+        return threading.current_thread() is self._runner
+
+    def _run_jobs(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._waiting))
+                job = self._waiting.popleft()
+                cancelled = not job.future.set_running_or_notify_cancel()
+                if not cancelled:
+                    self._running = job
+                    job.state = "running"
+                    job.started_at = time.perf_counter()
+            if cancelled:
+                job.state = "cancelled"
+                logging.info(f"Operation '{job.description}' was cancelled before it started")
+                continue
+
+            try:
+                result = job.call()
+            except BaseException as e:
+                self._finish(job, error=e)
+                job.future.set_exception(e)
+            else:
+                self._finish(job, result)
+                job.future.set_result(result)
+
+    def _finish(self, job: OperationJob, result: Any = None, error: Optional[BaseException] = None):
+        with self._cond:
+            job.finished_at = time.perf_counter()
+            job.result = result
+            job.error = error
+            job.state = "failed" if error is not None else "done"
+            job.call = None
+            self._running = None
+            self._history.append(job)
+        logging.info(f"Operation '{job.description}' waited {job.wait_seconds:.2f}s, ran {job.run_seconds:.2f}s")
+
+    def run(self, description: str, func: Callable, *args, key: Optional[Hashable] = None, **kwargs) -> Any:
+        """排队执行 func(*args, **kwargs)，等待并返回其结果；在操作内部调用时直接执行"""
+        if self.in_runner():
+            return func(*args, **kwargs)
+        return self.submit(description, func, args, kwargs, key).result()
+
+    def snapshot(self) -> Tuple[Optional[OperationJob], List[OperationJob], List[OperationJob]]:
+        """返回 (正在执行的操作, 等待中的操作, 最近完成的操作)"""
+        with self._cond:
+            waiting = [job for job in self._waiting if not job.future.cancelled()]
+            return self._running, waiting, list(self._history)
+
+
+_schedulers: Dict[str, OperationScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for_prefix(prefix: str) -> OperationScheduler:
+    """同一前缀的所有 BrewManager 共用一个调度器"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(prefix)
+        if scheduler is None:
+            scheduler = _schedulers[prefix] = OperationScheduler(prefix)
+        return scheduler
+
+
+def exclusive(describe: Callable[..., Tuple[str, Optional[Hashable]]]):
+    """把 BrewManager 的方法声明为修改操作，经 self.scheduler 排队执行
+
+    describe 接收与方法相同的参数（不含 self），返回 (描述, 合并用的 key)。
+    直接调用时阻塞到操作结束；在操作内部调用时直接执行。
+    submit_exclusive() 只把操作加入队列并返回 Future，供不能阻塞的调用方（线程池、事件循环）使用。
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        callback_names = [name for name in CALLBACK_PARAMETERS if name in signature.parameters]
+
+        def submit(self, *args, **kwargs) -> Future:
+            description, key = describe(*args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            callbacks = {name: bound.arguments.pop(name, None) for name in callback_names}
+            return self.scheduler.submit(description, method, bound.args, bound.kwargs, key, callbacks)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.scheduler.in_runner():
+                return method(self, *args, **kwargs)
+            return submit(self, *args, **kwargs).result()
+
+        wrapper.submit_exclusive = submit
+        return wrapper
+    return decorator
+
+
+def submit_exclusive(method: Callable, *args, **kwargs) -> Future:
+    """把用 exclusive 声明的绑定方法加入其调度器的队列，立即返回 Future"""
+    return method.__func__.submit_exclusive(method.__self__, *args, **kwargs)
@@ -0,0 +1,214 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from command_result import CommandResult
+
+# 一条 brew info 命令最多查询的包数
+INFO_BATCH_SIZE = 50
+# 元数据缓存最多保存的包数
+INFO_CACHE_MAX_ENTRIES = 2000
+# 元数据缓存的有效期（秒）
+INFO_CACHE_TTL = 3600
+
+
+@dataclass
+class PackageInfo:
+    """一个包的元数据（来自 brew info --json=v2）"""
+    name: str
+    # "formula" 或 "cask"
+    kind: str
+    desc: str = ""
+    homepage: str = ""
+    tap: str = ""
+    license: str = ""
+    # 最新的稳定版本
+    version: str = ""
+    installed_versions: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    caveats: str = ""
+    outdated: bool = False
+    pinned: bool = False
+    # 查询时可以使用的其他名称（完整名称、别名、曾用名）
+    aliases: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_formula_json(cls, data: Dict[str, Any]) -> "PackageInfo":
+        versions = data.get("versions") or {}
+        return cls(
+            name=data.get("name") or "",
+            kind="formula",
+            desc=data.get("desc") or "",
+            homepage=data.get("homepage") or "",
+            tap=data.get("tap") or "",
+            license=data.get("license") or "",
+            version=str(versions.get("stable") or ""),
+            installed_versions=[str(keg.get("version")) for keg in data.get("installed") or []
+                                if isinstance(keg, dict) and keg.get("version")],
+            dependencies=list(data.get("dependencies") or []),
+            caveats=data.get("caveats") or "",
+            outdated=bool(data.get("outdated")),
+            pinned=bool(data.get("pinned")),
+            aliases=[data.get("full_name") or ""] + list(data.get("aliases") or []) + list(data.get("oldnames") or []),
+        )
+
+    @classmethod
+    def from_cask_json(cls, data: Dict[str, Any]) -> "PackageInfo":
+        installed = data.get("installed")
+        depends_on = data.get("depends_on") or {}
+        names = [name for name in data.get("name") or [] if isinstance(name, str)]
+        return cls(
+            name=data.get("token") or "",
+            kind="cask",
+            desc=data.get("desc") or (names[0] if names else ""),
+            homepage=data.get("homepage") or "",
+            tap=data.get("tap") or "",
+            version=str(data.get("version") or ""),
+            installed_versions=[str(installed)] if installed else [],
+            dependencies=list(depends_on.get("formula") or []) if isinstance(depends_on, dict) else [],
+            caveats=data.get("caveats") or "",
+            outdated=bool(data.get("outdated")),
+            aliases=[data.get("full_token") or ""] + list(data.get("old_tokens") or []),
+        )
+
+
+def parse_info_json(output: str) -> Optional[List[PackageInfo]]:
+    """解析 brew info --json=v2 的输出，无法解析时返回 None"""
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    packages = []
+    for item in data.get("formulae") or []:
+        if isinstance(item, dict) and item.get("name"):
+            packages.append(PackageInfo.from_formula_json(item))
+    for item in data.get("casks") or []:
+        if isinstance(item, dict) and item.get("token"):
+            packages.append(PackageInfo.from_cask_json(item))
+    return packages
+
+
+class InfoCache:
+    """按包名保存 PackageInfo 的 LRU 缓存，超过条数上限或有效期的条目被淘汰
+
+    查询失败（例如包名不存在）的结果同样缓存为 None，避免反复查询。
+    """
+
+    def __init__(self, max_entries: int = INFO_CACHE_MAX_ENTRIES, ttl: float = INFO_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Optional[PackageInfo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, name: str) -> Tuple[bool, Optional[PackageInfo]]:
+        """返回 (是否命中, 元数据)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return False, None
+            stored_at, info = entry
+            if self.clock() - stored_at > self.ttl:
+                del self._entries[name]
+                return False, None
+            self._entries.move_to_end(name)
+            return True, info
+
+    def put(self, name: str, info: Optional[PackageInfo]):
+        with self._lock:
+            self._entries[name] = (self.clock(), info)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, names: Optional[Iterable[str]] = None):
+        """删除指定包的条目；names 为 None 时清空"""
+        with self._lock:
+            if names is None:
+                self._entries.clear()
+                return
+            for name in names:
+                self._entries.pop(name, None)
+
+
+class PackageInfoFetcher:
+    """批量获取包的元数据
+
+    未缓存的包按 INFO_BATCH_SIZE 分批，每批只运行一条 brew info --json=v2，而不是每个包一条。
+    某一批中有 brew 不认识的包名时整批都会失败，此时把这一批对半拆开重试，
+    只为出错的包名多运行几次命令，最终确认不存在的包名缓存为 None。
+    其他原因的失败（brew 被锁、命令无法启动、超时）不拆分也不缓存，下次请求时重新查询。
+    """
+
+    def __init__(self, run_command: Callable[[List[str]], CommandResult], brew_path: str,
+                 cache: Optional[InfoCache] = None, batch_size: int = INFO_BATCH_SIZE):
+        self.run_command = run_command
+        self.brew_path = brew_path
+        self.cache = cache or InfoCache()
+        self.batch_size = batch_size
+        # 其他线程正在查询的包名，避免重复查询
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def cached(self, name: str) -> Tuple[bool, Optional[PackageInfo]]:
+        """只查缓存，不运行命令（供界面线程使用）"""
+        return self.cache.lookup(name)
+
+    def fetch(self, names: Iterable[str]) -> Dict[str, Optional[PackageInfo]]:
+        """返回 {包名: 元数据}，查询失败的包为 None；其他线程正在查询的包不包含在结果中"""
+        result = {}
+        missing = []
+        with self._lock:
+            for name in dict.fromkeys(names):
+                hit, info = self.cache.lookup(name)
+                if hit:
+                    result[name] = info
+                elif name not in self._in_flight:
+                    self._in_flight.add(name)
+                    missing.append(name)
+        try:
+            for start in range(0, len(missing), self.batch_size):
+                result.update(self._fetch_batch(missing[start:start + self.batch_size]))
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(missing)
+        return result
+
+    def _fetch_batch(self, names: List[str]) -> Dict[str, Optional[PackageInfo]]:
+        output = self.run_command([self.brew_path, "info", "--json=v2"] + names)
+        packages = parse_info_json(output.stdout) if output.success and output.stdout else None
+        if packages is None:
+            if output.error_kind != "not_found":
+                logging.warning(f"Could not get info for {len(names)} package(s): {output.stderr}")
+                return {name: None for name in names}
+            if len(names) > 1:
+                middle = len(names) // 2
+                result = self._fetch_batch(names[:middle])
+                result.update(self._fetch_batch(names[middle:]))
+                return result
+            logging.warning(f"Could not get info for {names[0]}: {output.stderr}")
+            self.cache.put(names[0], None)
+            return {names[0]: None}
+
+        # 请求的名称可能是别名或带 tap 前缀的完整名称
+        by_name = {}
+        for info in packages:
+            for key in [info.name] + info.aliases:
+                if key:
+                    by_name.setdefault(key, info)
+        result = {}
+        for name in names:
+            info = by_name.get(name) or by_name.get(name.split("/")[-1])
+            self.cache.put(name, info)
+            result[name] = info
+        return result
@@ -0,0 +1,166 @@
+from typing import Any, List, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PyQt6.QtGui import QColor
+
+from styles import PLACEHOLDER_COLOR
+
+# 每次 fetchMore 向视图提供的行数
+FETCH_BATCH_SIZE = 256
+
+
+class PackageListModel(QAbstractListModel):
+    """已安装包与搜索结果共用的列表模型
+
+    数据只是一个字符串列表，不为每一行创建 QListWidgetItem。行按需分批交给视图
+    （canFetchMore/fetchMore），数千条搜索结果也只渲染可见的部分。
+    列表变化时按差异插入或删除行，选中状态和滚动位置得以保留。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._names: List[str] = []
+        # 已经交给视图的行数
+        self._loaded = 0
+        self._placeholder: Optional[str] = None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return 1 if self._placeholder is not None else self._loaded
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if self._placeholder is not None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self._placeholder
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(PLACEHOLDER_COLOR)
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._names[index.row()]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if self._placeholder is not None:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._placeholder is None and self._loaded < len(self._names)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH_SIZE, len(self._names) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def name_at(self, row: int) -> str:
+        return self._names[row]
+
+    def names_in_rows(self, first: int, last: int) -> List[str]:
+        """返回已交给视图的 first..last 行的名称（占位状态下为空）"""
+        if self._placeholder is not None:
+            return []
+        return self._names[max(first, 0):min(last, self._loaded - 1) + 1]
+
+    def set_placeholder(self, text: str):
+        """清空列表，只显示一行不可选中的提示文字"""
+        self.beginResetModel()
+        self._names = []
+        self._loaded = 0
+        self._placeholder = text
+        self.endResetModel()
+
+    def set_packages(self, names: List[str]):
+        """更新列表内容
+
+        新旧列表有共同的名称且相对顺序不变时（例如安装或卸载之后），只删除和插入有变化的行；
+        否则（例如换成了另一组搜索结果）重置模型。
+        """
+        names = list(names)
+        if self._placeholder is not None or not self._can_diff(names):
+            self.beginResetModel()
+            self._placeholder = None
+            self._names = names
+            self._loaded = min(FETCH_BATCH_SIZE, len(names))
+            self.endResetModel()
+            return
+
+        new_set = set(names)
+        removed_rows = [row for row, name in enumerate(self._names) if name not in new_set]
+        for first, last in reversed(_runs(removed_rows)):
+            self._remove_rows(first, last)
+
+        # 删除之后旧列表是新列表的子序列，按新列表顺序补上缺少的行
+        row = 0
+        while row < len(names):
+            if row < len(self._names) and self._names[row] == names[row]:
+                row += 1
+                continue
+            end = row
+            current = self._names[row] if row < len(self._names) else None
+            while end < len(names) and names[end] != current:
+                end += 1
+            self._insert_rows(row, names[row:end])
+            row = end
+
+        if self._names != names:
+            # 列表中有重复名称时差异可能不准确，直接重置
+            self.beginResetModel()
+            self._names = names
+            self._loaded = min(max(self._loaded, FETCH_BATCH_SIZE), len(names))
+            self.endResetModel()
+
+    def _can_diff(self, names: List[str]) -> bool:
+        old_set = set(self._names)
+        new_set = set(names)
+        common = [name for name in self._names if name in new_set]
+        return bool(common) and common == [name for name in names if name in old_set]
+
+    def _remove_rows(self, first: int, last: int):
+        # 只有已交给视图的行需要通知视图
+        visible_last = min(last, self._loaded - 1)
+        if first <= visible_last:
+            self.beginRemoveRows(QModelIndex(), first, visible_last)
+            del self._names[first:last + 1]
+            self._loaded -= visible_last - first + 1
+            self.endRemoveRows()
+        else:
+            del self._names[first:last + 1]
+
+    def _insert_rows(self, row: int, names: List[str]):
+        if row < self._loaded:
+            self.beginInsertRows(QModelIndex(), row, row + len(names) - 1)
+            self._names[row:row] = names
+            self._loaded += len(names)
+            self.endInsertRows()
+        elif row == self._loaded == len(self._names):
+            # 追加到已全部交给视图的列表末尾，先提供一批，其余的由 fetchMore 提供
+            count = min(len(names), FETCH_BATCH_SIZE)
+            self.beginInsertRows(QModelIndex(), row, row + count - 1)
+            self._names[row:row] = names
+            self._loaded += count
+            self.endInsertRows()
+        else:
+            # 尚未交给视图的部分，等视图滚动到这里时由 fetchMore 提供
+            self._names[row:row] = names
+
+
+def _runs(rows: List[int]) -> List[List[int]]:
+    """把升序的行号合并为连续的 [first, last] 行段"""
+    runs: List[List[int]] = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
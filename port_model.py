@@ -0,0 +1,361 @@
+import bisect
+import re
+from array import array
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, Qt
+
+from port_monitor import listener_key
+
+# 端口表格的列：(字段, 标题, 对齐方式)
+PORT_COLUMNS = [
+    ('port', '端口', Qt.AlignmentFlag.AlignCenter),
+    ('protocol', '协议', Qt.AlignmentFlag.AlignCenter),
+    ('address', '地址', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('pid', 'PID', Qt.AlignmentFlag.AlignCenter),
+    ('name', '进程名称', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('user', '用户', Qt.AlignmentFlag.AlignCenter),
+    ('status', '状态', Qt.AlignmentFlag.AlignCenter),
+]
+PORT_COLUMN_INDEX = {key: i for i, (key, _, _) in enumerate(PORT_COLUMNS)}
+# 直接以整数保存的字段，其余字段保存为字符串池中的下标
+INTEGER_FIELDS = {'port', 'pid'}
+
+# 一次删除的不连续行段超过该数量时改为重置模型，避免逐段发出删除信号
+MAX_REMOVE_RUNS = 64
+# 一次新增的行数不超过该值时逐行插入到排序位置，否则追加后整体重新排序
+MAX_SORTED_INSERTS = 64
+# 字符串池超过该大小且已翻倍时，丢弃不再被任何行引用的字符串
+STRING_POOL_MIN_COMPACT = 1024
+
+
+class _SortKeys:
+    """按升序访问模型各行排序键的只读序列，供 bisect 使用（降序时从末尾往前读）"""
+
+    def __init__(self, model: "PortTableModel"):
+        self.model = model
+        self.descending = model._sort_order == Qt.SortOrder.DescendingOrder
+
+    def __len__(self) -> int:
+        return len(self.model._keys)
+
+    def __getitem__(self, i: int) -> Tuple:
+        return self.model._sort_key(len(self) - 1 - i if self.descending else i)
+
+
+class PortTableModel(QAbstractTableModel):
+    """监听端口表格的数据模型
+
+    每列保存在一个紧凑的 array('i') 中，进程名、地址等字符串只在字符串池中保存一份，
+    行只以下标存在，数万行也不会为每个单元格创建对象。进程不断启停时字符串池会积累
+    不再使用的字符串，池的大小翻倍后重建一次，只保留仍被引用的字符串。
+
+    排序也在模型中完成：对各列数组做一次重排，而不是让 QSortFilterProxyModel
+    在每次比较时调用 data()。少量新增的行直接插入到排好序的位置。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._columns: Dict[str, array] = {key: array('i') for key, _, _ in PORT_COLUMNS}
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        # 字符串池超过该大小时重建
+        self._compact_at = STRING_POOL_MIN_COMPACT
+        self._keys: List[Tuple] = []
+        # listener_key -> 行号，行号变化后置为 None，下次使用时再重建
+        self._rows: Optional[Dict[Tuple, int]] = {}
+        self._sort_column = PORT_COLUMN_INDEX['port']
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    # ------------------------------------------------------------------
+    # Qt 模型接口
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(PORT_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        key, _, alignment = PORT_COLUMNS[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.value(index.row(), key))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return alignment
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return PORT_COLUMNS[section][1]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        if column == self._sort_column and order == self._sort_order:
+            return
+        self._sort_column = column
+        self._sort_order = order
+        self._resort()
+
+    def _resort(self):
+        self.layoutAboutToBeChanged.emit()
+        keys = self._sort_keys()
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        self._reorder(sorted(range(len(keys)), key=keys.__getitem__, reverse=descending))
+        self.layoutChanged.emit()
+
+    # ------------------------------------------------------------------
+    # 列数据访问（供代理模型过滤和界面读取选中行）
+    # ------------------------------------------------------------------
+
+    def value(self, row: int, key: str) -> Any:
+        value = self._columns[key][row]
+        return value if key in INTEGER_FIELDS else self._strings[value]
+
+    def _intern(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def _row_index(self) -> Dict[Tuple, int]:
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self._keys)}
+        return self._rows
+
+    def _encode(self, info: Dict, key: str) -> int:
+        if key in INTEGER_FIELDS:
+            return int(info.get(key) or 0)
+        return self._intern(str(info.get(key, '')))
+
+    def _make_sort_key(self, value: int, port: int) -> Tuple:
+        """排序键：排序列的值，相同时按端口号"""
+        field = PORT_COLUMNS[self._sort_column][0]
+        if field not in INTEGER_FIELDS:
+            return (self._strings[value].lower(), port)
+        return (value, port)
+
+    def _sort_key(self, row: int) -> Tuple:
+        field = PORT_COLUMNS[self._sort_column][0]
+        return self._make_sort_key(self._columns[field][row], self._columns['port'][row])
+
+    def _sort_keys(self) -> List[Tuple]:
+        """一次性计算所有行的排序键；字符串列先换算成按字母顺序的名次，避免逐行比较字符串"""
+        field = PORT_COLUMNS[self._sort_column][0]
+        primary = self._columns[field]
+        if field not in INTEGER_FIELDS:
+            ranks = [0] * len(self._strings)
+            ordered = sorted(range(len(self._strings)), key=lambda i: self._strings[i].lower())
+            for rank, string_id in enumerate(ordered):
+                ranks[string_id] = rank
+            primary = [ranks[value] for value in primary]
+        return list(zip(primary, self._columns['port']))
+
+    def _reorder(self, order: List[int]):
+        """按 order 重排所有行，并更新视图持有的持久索引（选中行等）"""
+        if len(order) < 2:
+            return
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_rows = [0] * len(order)
+            for new_row, old_row in enumerate(order):
+                new_rows[old_row] = new_row
+            self.changePersistentIndexList(
+                persistent, [self.index(new_rows[index.row()], index.column()) for index in persistent]
+            )
+        take = itemgetter(*order)
+        for key, column in list(self._columns.items()):
+            self._columns[key] = array('i', take(column))
+        self._keys = list(take(self._keys))
+        self._rows = None
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+
+    def apply_changes(self, added: List[Dict], removed: List[Tuple], changed: List[Dict]):
+        """应用两次快照之间的差异，只对变化的行发出信号"""
+        self._remove(removed)
+
+        last_column = len(PORT_COLUMNS) - 1
+        needs_sort = False
+        rows = self._row_index()
+        for info in changed:
+            row = rows.get(listener_key(info))
+            if row is None:
+                continue
+            for key, column in self._columns.items():
+                column[row] = self._encode(info, key)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+            needs_sort = needs_sort or not self._in_order(row)
+
+        added = [info for info in added if listener_key(info) not in rows]
+        if len(added) > MAX_SORTED_INSERTS:
+            # 大量新增（例如首次加载）时追加到末尾后整体排序一次
+            self._append(added)
+            needs_sort = True
+        else:
+            for info in added:
+                self._insert_sorted(info)
+
+        if needs_sort:
+            self._resort()
+        if len(self._strings) > self._compact_at:
+            self._compact_strings()
+
+    def _compact_strings(self):
+        """重建字符串池，只保留仍被引用的字符串并重新编号
+
+        只有模型内部使用字符串编号，视图通过 data() 读取的是字符串本身，因此不需要发出信号。
+        """
+        string_columns = [key for key in self._columns if key not in INTEGER_FIELDS]
+        used = set()
+        for key in string_columns:
+            used.update(self._columns[key])
+        ordered = sorted(used)
+        remap = [0] * len(self._strings)
+        for new_id, old_id in enumerate(ordered):
+            remap[old_id] = new_id
+        self._strings = [self._strings[string_id] for string_id in ordered]
+        self._string_ids = {text: string_id for string_id, text in enumerate(self._strings)}
+        for key in string_columns:
+            self._columns[key] = array('i', map(remap.__getitem__, self._columns[key]))
+        self._compact_at = max(STRING_POOL_MIN_COMPACT, 2 * len(self._strings))
+
+    def _in_order(self, row: int) -> bool:
+        key = self._sort_key(row)
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        if row > 0:
+            previous = self._sort_key(row - 1)
+            if (previous < key) if descending else (previous > key):
+                return False
+        if row + 1 < len(self._keys):
+            following = self._sort_key(row + 1)
+            if (following > key) if descending else (following < key):
+                return False
+        return True
+
+    def _append(self, added: List[Dict]):
+        first = len(self._keys)
+        self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+        intern = self._intern
+        for key, column in self._columns.items():
+            if key in INTEGER_FIELDS:
+                column.extend([int(info.get(key) or 0) for info in added])
+            else:
+                column.extend([intern(str(info.get(key, ''))) for info in added])
+        self._keys.extend(listener_key(info) for info in added)
+        self._rows = None
+        self.endInsertRows()
+
+    def _insert_sorted(self, info: Dict):
+        values = {key: self._encode(info, key) for key in self._columns}
+        field = PORT_COLUMNS[self._sort_column][0]
+        key = self._make_sort_key(values[field], values['port'])
+        # 行已按排序键有序，二分查找插入位置，只需计算 O(log n) 行的排序键
+        keys = _SortKeys(self)
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            row = len(keys) - bisect.bisect_left(keys, key)
+        else:
+            row = bisect.bisect_right(keys, key)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        for column_key, column in self._columns.items():
+            column.insert(row, values[column_key])
+        self._keys.insert(row, listener_key(info))
+        self._rows = None
+        self.endInsertRows()
+
+    def _remove(self, removed: List[Tuple]):
+        index = self._row_index()
+        rows = sorted((index[key] for key in removed if key in index), reverse=True)
+        if not rows:
+            return
+
+        # 把要删除的行合并为连续的行段，从后往前删除，前面的行号不受影响
+        runs = []
+        for row in rows:
+            if runs and runs[-1][0] == row + 1:
+                runs[-1][0] = row
+            else:
+                runs.append([row, row])
+
+        if len(runs) > MAX_REMOVE_RUNS:
+            removed_rows = set(rows)
+            self.beginResetModel()
+            for key, column in self._columns.items():
+                self._columns[key] = array('i', (value for row, value in enumerate(column)
+                                                 if row not in removed_rows))
+            self._keys = [key for row, key in enumerate(self._keys) if row not in removed_rows]
+        else:
+            for first, last in runs:
+                self.beginRemoveRows(QModelIndex(), first, last)
+                for column in self._columns.values():
+                    del column[first:last + 1]
+                del self._keys[first:last + 1]
+                self.endRemoveRows()
+
+        self._rows = None
+        if len(runs) > MAX_REMOVE_RUNS:
+            self.endResetModel()
+
+
+def parse_port_filter(text: str) -> List[Tuple[str, Any]]:
+    """解析过滤条件，多个条件之间为“与”关系
+
+    支持端口范围（8000-9000）、单个数字（匹配端口或 PID）和任意文本（匹配进程名、地址、用户、协议）。
+    """
+    conditions = []
+    for token in text.lower().split():
+        match = re.fullmatch(r':?(\d+)-(\d+)', token)
+        if match:
+            low, high = sorted((int(match.group(1)), int(match.group(2))))
+            conditions.append(('range', (low, high)))
+        elif re.fullmatch(r':?\d+', token):
+            conditions.append(('number', int(token.lstrip(':'))))
+        else:
+            conditions.append(('text', token))
+    return conditions
+
+
+class PortFilterProxyModel(QSortFilterProxyModel):
+    """按文本和端口范围过滤端口模型；排序转交给 PortTableModel"""
+
+    TEXT_FIELDS = ('name', 'address', 'user', 'protocol')
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.setDynamicSortFilter(True)
+        self._conditions: List[Tuple[str, Any]] = []
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        # 代理模型保持源模型的顺序，不在每次比较时调用 data()
+        self.sourceModel().sort(column, order)
+
+    def set_filter_text(self, text: str):
+        conditions = parse_port_filter(text)
+        if conditions != self._conditions:
+            self._conditions = conditions
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._conditions:
+            return True
+        model: PortTableModel = self.sourceModel()
+        port = model.value(source_row, 'port')
+        for kind, value in self._conditions:
+            if kind == 'range':
+                if not value[0] <= port <= value[1]:
+                    return False
+            elif kind == 'number':
+                if port != value and model.value(source_row, 'pid') != value:
+                    return False
+            elif not any(value in model.value(source_row, field).lower() for field in self.TEXT_FIELDS):
+                return False
+        return True
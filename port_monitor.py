@@ -0,0 +1,116 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from task_executor import BrewTask, TaskExecutor
+
+# 默认轮询间隔（毫秒）
+DEFAULT_POLL_INTERVAL_MS = 5000
+# 端口页不可见时轮询间隔逐次翻倍，最长不超过该值（毫秒）
+MAX_HIDDEN_POLL_INTERVAL_MS = 60000
+BACKOFF_FACTOR = 2
+
+
+def listener_key(info: Dict) -> Tuple:
+    """监听端口的唯一标识，同一端口可能同时被多个进程或地址监听"""
+    return (info['port'], info['pid'], info['protocol'], info['address'])
+
+
+def diff_listeners(old: List[Dict], new: List[Dict]) -> Tuple[List[Dict], List[Tuple], List[Dict]]:
+    """比较两次快照，返回 (新增的记录, 消失的键, 内容有变化的记录)"""
+    old_by_key = {listener_key(info): info for info in old}
+    new_by_key = {listener_key(info): info for info in new}
+    added = [info for key, info in new_by_key.items() if key not in old_by_key]
+    removed = [key for key in old_by_key if key not in new_by_key]
+    changed = [info for key, info in new_by_key.items()
+               if key in old_by_key and old_by_key[key] != info]
+    return added, removed, changed
+
+
+def _scan() -> List[Dict]:
+    # 延迟导入，启动时不加载端口扫描模块
+    from port_scanner import scan_listeners
+
+    return scan_listeners()
+
+
+class PortMonitor(QObject):
+    """定时扫描监听端口，只把两次快照之间的差异通知界面
+
+    端口页可见时按设定间隔轮询；不可见时每次轮询后间隔翻倍，重新可见时立即扫描并恢复原间隔。
+    间隔为 0 时关闭自动刷新，只在调用 poll() 时扫描。
+    """
+    # 每次扫描完成后发出完整快照
+    snapshot = pyqtSignal(list)
+    # 快照有变化时发出 (新增, 消失的键, 内容变化)
+    changed = pyqtSignal(list, list, list)
+    # 扫描失败时发出错误信息
+    failed = pyqtSignal(str)
+
+    def __init__(self, executor: TaskExecutor, interval_ms: int = DEFAULT_POLL_INTERVAL_MS,
+                 max_hidden_interval_ms: int = MAX_HIDDEN_POLL_INTERVAL_MS,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.executor = executor
+        self.interval_ms = interval_ms
+        self.max_hidden_interval_ms = max_hidden_interval_ms
+        self.listeners: List[Dict] = []
+        self.visible = False
+        self._current_interval = interval_ms
+        self._task: Optional[BrewTask] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.poll)
+
+    def set_interval(self, interval_ms: int):
+        """修改轮询间隔，0 表示关闭自动刷新"""
+        self.interval_ms = interval_ms
+        self._current_interval = interval_ms
+        self._timer.stop()
+        self._schedule()
+
+    def set_visible(self, visible: bool):
+        """端口页显示或隐藏时调用"""
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible:
+            self._current_interval = self.interval_ms
+            self.poll()
+
+    def poll(self):
+        """立即扫描一次；上一次扫描尚未完成时忽略"""
+        self._timer.stop()
+        if self._task is not None:
+            return
+        self._task = self.executor.submit(_scan, on_result=self._on_scanned, on_error=self._on_error)
+
+    def stop(self):
+        self._timer.stop()
+        self.executor.cancel(self._task)
+        self._task = None
+
+    def _on_scanned(self, listeners: List[Dict]):
+        self._task = None
+        added, removed, changed = diff_listeners(self.listeners, listeners)
+        self.listeners = listeners
+        if added or removed or changed:
+            logging.debug(f"Ports changed: +{len(added)} -{len(removed)} ~{len(changed)}")
+            self.changed.emit(added, removed, changed)
+        self.snapshot.emit(listeners)
+        self._schedule()
+
+    def _on_error(self, message: str):
+        self._task = None
+        logging.error(f"Error getting port information: {message}")
+        self.failed.emit(message)
+        self._schedule()
+
+    def _schedule(self):
+        if self.interval_ms <= 0 or self._task is not None:
+            return
+        if not self.visible:
+            self._current_interval = min(self._current_interval * BACKOFF_FACTOR,
+                                         max(self.max_hidden_interval_ms, self.interval_ms))
+        self._timer.start(self._current_interval)
@@ -0,0 +1,279 @@
+import logging
+import os
+import socket
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Optional, Set
+
+# /proc/net/tcp 中 LISTEN 状态的编码
+PROC_TCP_LISTEN = "0A"
+
+
+class PartialListeners(list):
+    """部分进程没有权限查询时的不完整结果
+
+    scan_listeners 收到它后继续尝试后面的后端（例如可以用 sudo 运行的 lsof），都不可用时才使用它。
+    """
+
+
+def _listener(port: int, pid: Optional[int], name: str, protocol: str, address: str, user: str) -> Dict:
+    return {
+        'port': port,
+        'pid': pid if pid is not None else 0,
+        'name': name or "?",
+        'status': 'LISTEN',
+        'protocol': protocol,
+        'address': address,
+        'user': user or "",
+    }
+
+
+def _unique(listeners: Iterable[Dict]) -> List[Dict]:
+    """去重（排序由界面的代理模型负责）"""
+    seen = set()
+    result = []
+    for info in listeners:
+        key = (info['port'], info['pid'], info['protocol'], info['address'])
+        if key not in seen:
+            seen.add(key)
+            result.append(info)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Linux：直接读取 /proc/net/tcp{,6}
+# ---------------------------------------------------------------------------
+
+def _decode_proc_address(hex_address: str, ipv6: bool) -> str:
+    """把 /proc/net/tcp 中的十六进制地址转换为可读形式"""
+    raw = bytes.fromhex(hex_address)
+    if ipv6:
+        # 每 4 字节为一组小端序
+        raw = b"".join(raw[i:i + 4][::-1] for i in range(0, 16, 4))
+        return socket.inet_ntop(socket.AF_INET6, raw)
+    return socket.inet_ntop(socket.AF_INET, raw[::-1])
+
+
+def _proc_socket_owners(inodes: Set[str]) -> Dict[str, int]:
+    """遍历 /proc/<pid>/fd 找出监听 socket 的所属进程，找齐后立即停止"""
+    owners: Dict[str, int] = {}
+    remaining = set(inodes)
+    with os.scandir("/proc") as procs:
+        for proc in procs:
+            if not remaining:
+                break
+            if not proc.name.isdigit():
+                continue
+            try:
+                with os.scandir(f"/proc/{proc.name}/fd") as fds:
+                    for fd in fds:
+                        try:
+                            target = os.readlink(fd.path)
+                        except OSError:
+                            continue
+                        if target.startswith("socket:["):
+                            inode = target[8:-1]
+                            if inode in remaining:
+                                owners[inode] = int(proc.name)
+                                remaining.discard(inode)
+            except OSError:
+                # 进程已退出或没有权限
+                continue
+    return owners
+
+
+def _proc_process_info(pid: int) -> Dict[str, str]:
+    info = {"name": "?", "user": ""}
+    try:
+        with open(f"/proc/{pid}/comm", "r") as f:
+            info["name"] = f.read().strip()
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("Uid:"):
+                    uid = int(line.split()[1])
+                    try:
+                        import pwd
+                        info["user"] = pwd.getpwuid(uid).pw_name
+                    except KeyError:
+                        info["user"] = str(uid)
+                    break
+    except OSError:
+        pass
+    return info
+
+
+def scan_proc() -> Optional[List[Dict]]:
+    """Linux 快速路径：解析 /proc/net/tcp 与 /proc/net/tcp6，不可用时返回 None"""
+    if not sys.platform.startswith("linux") or not os.path.exists("/proc/net/tcp"):
+        return None
+
+    sockets = []
+    for path, protocol, ipv6 in (("/proc/net/tcp", "TCP", False), ("/proc/net/tcp6", "TCP6", True)):
+        try:
+            with open(path, "r") as f:
+                next(f, None)  # 跳过标题行
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 10 or fields[3] != PROC_TCP_LISTEN:
+                        continue
+                    address, port = fields[1].rsplit(":", 1)
+                    sockets.append((int(port, 16), _decode_proc_address(address, ipv6), protocol, fields[9]))
+        except OSError:
+            continue
+
+    owners = _proc_socket_owners({inode for _, _, _, inode in sockets})
+    process_info: Dict[int, Dict[str, str]] = {}
+    listeners = []
+    for port, address, protocol, inode in sockets:
+        pid = owners.get(inode)
+        if pid is not None and pid not in process_info:
+            process_info[pid] = _proc_process_info(pid)
+        info = process_info.get(pid, {"name": "?", "user": ""})
+        listeners.append(_listener(port, pid, info["name"], protocol, address, info["user"]))
+    return _unique(listeners)
+
+
+# ---------------------------------------------------------------------------
+# psutil
+# ---------------------------------------------------------------------------
+
+def scan_psutil() -> Optional[List[Dict]]:
+    """通过 psutil 枚举监听端口，psutil 不可用时返回 None
+
+    macOS 上 net_connections() 需要 root 权限；没有权限时逐个进程查询，
+    只能看到当前用户有权限访问的进程，有进程被拒绝访问时返回 PartialListeners。
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    # 一次遍历获取所有进程的名称和用户
+    processes = {}
+    for proc in psutil.process_iter(['pid', 'name', 'username']):
+        processes[proc.info['pid']] = proc
+
+    def describe(pid):
+        proc = processes.get(pid)
+        if proc is None:
+            return "?", ""
+        return proc.info.get('name') or "?", proc.info.get('username') or ""
+
+    listeners = []
+    try:
+        connections = psutil.net_connections(kind='inet')
+    except psutil.AccessDenied:
+        connections = None
+
+    if connections is not None:
+        for conn in connections:
+            if conn.status != psutil.CONN_LISTEN or not conn.laddr:
+                continue
+            name, user = describe(conn.pid)
+            protocol = "TCP6" if conn.family == socket.AF_INET6 else "TCP"
+            listeners.append(_listener(conn.laddr.port, conn.pid, name, protocol, conn.laddr.ip, user))
+        return _unique(listeners)
+
+    denied = False
+    for pid, proc in processes.items():
+        try:
+            # psutil 6.0 起改名为 net_connections
+            get_connections = getattr(proc, "net_connections", None) or proc.connections
+            connections = get_connections(kind='inet')
+        except psutil.AccessDenied:
+            denied = True
+            continue
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            continue
+        for conn in connections:
+            if conn.status != psutil.CONN_LISTEN or not conn.laddr:
+                continue
+            name, user = describe(pid)
+            protocol = "TCP6" if conn.family == socket.AF_INET6 else "TCP"
+            listeners.append(_listener(conn.laddr.port, pid, name, protocol, conn.laddr.ip, user))
+    if denied:
+        return PartialListeners(_unique(listeners))
+    return _unique(listeners)
+
+
+# ---------------------------------------------------------------------------
+# lsof
+# ---------------------------------------------------------------------------
+
+def parse_lsof_fields(output: str) -> List[Dict]:
+    """解析 lsof -F pcLPn 的字段输出
+
+    每行以一个字段标识符开头：p 为 PID，c 为命令名，L 为用户，P 为协议，n 为地址。
+    进程字段出现一次，其后跟随该进程的各个文件描述符。
+    """
+    listeners = []
+    pid, name, user, protocol = None, "?", "", "TCP"
+    for line in output.splitlines():
+        if not line:
+            continue
+        tag, value = line[0], line[1:]
+        if tag == 'p':
+            pid, name, user, protocol = int(value), "?", "", "TCP"
+        elif tag == 'c':
+            name = value
+        elif tag == 'L':
+            user = value
+        elif tag == 'P':
+            protocol = value
+        elif tag == 'n':
+            address, _, port = value.rpartition(':')
+            if port.isdigit():
+                address = address.strip('[]')
+                fd_protocol = "TCP6" if ':' in address else protocol
+                listeners.append(_listener(int(port), pid, name, fd_protocol, address, user))
+    return listeners
+
+
+def scan_lsof() -> Optional[List[Dict]]:
+    """通过 lsof 枚举监听端口；先以免密码 sudo 尝试，失败时以当前用户运行"""
+    command = ['lsof', '-nP', '-iTCP', '-sTCP:LISTEN', '-F', 'pcLPn']
+    for prefix in (['sudo', '-n'], []):
+        try:
+            result = subprocess.run(prefix + command, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.debug(f"lsof failed: {e}")
+            continue
+        # 没有任何监听端口时 lsof 也返回 1，因此以是否有输出判断
+        if result.returncode == 0 or result.stdout:
+            return _unique(parse_lsof_fields(result.stdout))
+    return None
+
+
+# 依次尝试的后端
+BACKENDS = (
+    ("proc", scan_proc),
+    ("psutil", scan_psutil),
+    ("lsof", scan_lsof),
+)
+
+
+def scan_listeners() -> List[Dict]:
+    """获取所有正在监听的端口
+
+    后端返回不完整的结果（PartialListeners）时继续尝试后面的后端，都不可用时才使用不完整的结果。
+    """
+    partial = None
+    for name, backend in BACKENDS:
+        try:
+            listeners = backend()
+        except Exception as e:
+            logging.warning(f"Port scanner backend {name} failed: {e}")
+            continue
+        if isinstance(listeners, PartialListeners):
+            logging.debug(f"Port scanner backend {name} could not see every process, trying the next one")
+            if partial is None:
+                partial = list(listeners)
+            continue
+        if listeners is not None:
+            logging.debug(f"Port scanner backend {name} found {len(listeners)} listeners")
+            return listeners
+    if partial is not None:
+        logging.warning("Port scan is incomplete: some processes could not be inspected")
+        return partial
+    logging.error("No port scanner backend available")
+    return []
@@ -0,0 +1,293 @@
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from cache_utils import get_cache_dir, load_json_cache, save_json_cache
+
+# 索引缓存格式变化时递增
+SEARCH_INDEX_VERSION = 1
+
+# 模糊匹配的最低三元组相似度
+FUZZY_THRESHOLD = 0.3
+# 模糊匹配最多返回的条目数
+FUZZY_LIMIT = 30
+# 没有 API 目录文件时，由 brew info 构建的索引的有效期（秒）；没有文件 mtime 可比较，只能按时间过期
+FALLBACK_INDEX_TTL = 24 * 60 * 60
+
+
+def get_homebrew_cache_dir() -> str:
+    """获取 Homebrew 自身的缓存目录（与 brew --cache 一致）"""
+    if os.environ.get("HOMEBREW_CACHE"):
+        return os.environ["HOMEBREW_CACHE"]
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "Homebrew")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                        "Homebrew")
+
+
+def catalogue_sources(homebrew_cache: Optional[str] = None) -> Dict[str, str]:
+    """返回可用的 API 目录文件 {类型: 路径}，新版 .jws.json 优先"""
+    api_dir = os.path.join(homebrew_cache or get_homebrew_cache_dir(), "api")
+    sources = {}
+    for kind in ("formula", "cask"):
+        for filename in (f"{kind}.jws.json", f"{kind}.json"):
+            path = os.path.join(api_dir, filename)
+            if os.path.isfile(path):
+                sources[kind] = path
+                break
+    return sources
+
+
+def _load_catalogue_file(path: str) -> List[Dict[str, Any]]:
+    """读取 API 目录文件，.jws.json 的实际内容在 payload 字段中"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "payload" in data:
+        data = json.loads(data["payload"])
+    return data if isinstance(data, list) else []
+
+
+def compact_entries(kind: str, items: Iterable[Dict[str, Any]]) -> List[List[Any]]:
+    """把 formula/cask 的 JSON 精简为 [名称, 类型, 描述, 别名列表]"""
+    entries = []
+    for item in items:
+        if kind == "cask":
+            name = item.get("token")
+            aliases = list(item.get("old_tokens") or []) + [
+                n for n in item.get("name") or [] if isinstance(n, str)
+            ]
+        else:
+            name = item.get("name")
+            aliases = list(item.get("aliases") or []) + list(item.get("oldnames") or [])
+        if name:
+            entries.append([name, kind, item.get("desc") or "", aliases])
+    return entries
+
+
+def trigrams(text: str) -> Set[str]:
+    """计算字符串的三元组集合（首尾补空格，以便短词也能匹配）"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _tokenize(text: str) -> List[str]:
+    return [token for token in "".join(c if c.isalnum() else " " for c in text.lower()).split() if token]
+
+
+class SearchIndex:
+    """基于 Homebrew API 目录文件的本地搜索索引
+
+    支持前缀、子串、描述和三元组模糊匹配。精简后的条目按来源文件持久化，
+    只有对应文件的 mtime 变化时才重新解析该来源；由 fallback_loader 构建的条目超过 fallback_ttl 后重新获取。
+    """
+
+    def __init__(self, homebrew_cache: Optional[str] = None, cache_path: Optional[str] = None,
+                 fallback_loader: Optional[Callable[[], Dict[str, List[Dict[str, Any]]]]] = None,
+                 fallback_ttl: float = FALLBACK_INDEX_TTL):
+        self.homebrew_cache = homebrew_cache or get_homebrew_cache_dir()
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "search_index.json")
+        # 没有 API 目录文件时用于获取完整目录的回调（例如 brew info --json=v2 --eval-all）
+        self.fallback_loader = fallback_loader
+        self.fallback_ttl = fallback_ttl
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        # 当前条目来自 fallback_loader 时为其构建时间
+        self._fallback_built_at: Optional[float] = None
+        self._entries: List[List[Any]] = []
+        self._sorted_names: List[Tuple[str, int]] = []
+        self._trigram_index: Dict[str, List[int]] = {}
+        self._tokens: List[str] = []
+        self._token_index: Dict[str, List[int]] = {}
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ensure_loaded(self) -> bool:
+        """加载或增量更新索引，返回索引是否可用"""
+        with self._lock:
+            if self._loaded and not self._sources_changed():
+                return bool(self._entries)
+            self._refresh()
+            self._loaded = True
+            return bool(self._entries)
+
+    def _fallback_expired(self, built_at: Any) -> bool:
+        return not isinstance(built_at, (int, float)) or time.time() - built_at >= self.fallback_ttl
+
+    def _sources_changed(self) -> bool:
+        if self._fallback_built_at is not None and self._fallback_expired(self._fallback_built_at):
+            return True
+        for kind, path in catalogue_sources(self.homebrew_cache).items():
+            cached = self._sources.get(kind)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return True
+            if not cached or cached["path"] != path or cached["mtime"] != mtime:
+                return True
+        return False
+
+    def _refresh(self):
+        persisted = load_json_cache(self.cache_path, SEARCH_INDEX_VERSION) or {}
+        sources = {}
+        changed = False
+
+        for kind, path in catalogue_sources(self.homebrew_cache).items():
+            mtime = os.stat(path).st_mtime_ns
+            cached = self._sources.get(kind) or persisted.get(kind)
+            if cached and cached["path"] == path and cached["mtime"] == mtime:
+                sources[kind] = cached
+                continue
+            try:
+                entries = compact_entries(kind, _load_catalogue_file(path))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read Homebrew catalogue {path}: {e}")
+                continue
+            logging.info(f"Rebuilt {kind} search index from {path} ({len(entries)} entries)")
+            sources[kind] = {"path": path, "mtime": mtime, "entries": entries}
+            changed = True
+
+        if not sources and self.fallback_loader is not None:
+            fresh = "fallback" in persisted and not self._fallback_expired(persisted["fallback"])
+            sources = persisted if fresh else {}
+            if not sources:
+                logging.info("No Homebrew API catalogue found, building search index from brew info")
+                catalogue = self.fallback_loader() or {}
+                if catalogue:
+                    sources = {
+                        kind: {"path": None, "mtime": None, "entries": compact_entries(kind, catalogue.get(kind) or [])}
+                        for kind in ("formula", "cask")
+                    }
+                    sources["fallback"] = time.time()
+                    changed = True
+                elif "fallback" in persisted:
+                    # 获取失败时继续使用过期的条目，过一个有效期后再重试
+                    logging.warning("Could not refresh search index from brew info, keeping the previous one")
+                    sources = dict(persisted, fallback=time.time())
+
+        if changed:
+            save_json_cache(self.cache_path, SEARCH_INDEX_VERSION, sources)
+        built_at = sources.get("fallback")
+        self._fallback_built_at = built_at if isinstance(built_at, (int, float)) else None
+        self._sources = {kind: source for kind, source in sources.items() if isinstance(source, dict)}
+        self._build(entry for source in self._sources.values() for entry in source["entries"])
+
+    def _build(self, entries: Iterable[List[Any]]):
+        """根据条目构建内存中的各类倒排索引"""
+        self._entries = list(entries)
+        sorted_names = []
+        trigram_index: Dict[str, List[int]] = {}
+        token_index: Dict[str, List[int]] = {}
+
+        for i, (name, _kind, desc, aliases) in enumerate(self._entries):
+            keys = {name.lower()} | {alias.lower() for alias in aliases}
+            grams = set()
+            for key in keys:
+                sorted_names.append((key, i))
+                grams |= trigrams(key)
+            for gram in grams:
+                trigram_index.setdefault(gram, []).append(i)
+            for token in set(_tokenize(desc)):
+                token_index.setdefault(token, []).append(i)
+
+        sorted_names.sort()
+        self._sorted_names = sorted_names
+        self._trigram_index = trigram_index
+        self._token_index = token_index
+        self._tokens = sorted(token_index)
+
+    def _prefix_matches(self, query: str) -> List[int]:
+        start = bisect.bisect_left(self._sorted_names, (query, -1))
+        result = []
+        for key, i in self._sorted_names[start:]:
+            if not key.startswith(query):
+                break
+            result.append(i)
+        return result
+
+    def _substring_matches(self, query: str) -> List[int]:
+        if len(query) < 3:
+            return [i for key, i in self._sorted_names if query in key]
+        # 用查询串自身的三元组求交集得到候选，再逐个校验
+        inner = [query[i:i + 3] for i in range(len(query) - 2)]
+        postings = sorted((self._trigram_index.get(gram, []) for gram in inner), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [i for i in candidates if self._matches_name(i, query)]
+
+    def _matches_name(self, i: int, query: str) -> bool:
+        name, _kind, _desc, aliases = self._entries[i]
+        return query in name.lower() or any(query in alias.lower() for alias in aliases)
+
+    def _description_matches(self, query: str) -> List[int]:
+        words = _tokenize(query)
+        if not words:
+            return []
+        result: Optional[Set[int]] = None
+        for word in words:
+            # 描述中的词按前缀匹配
+            start = bisect.bisect_left(self._tokens, word)
+            ids: Set[int] = set()
+            for token in self._tokens[start:]:
+                if not token.startswith(word):
+                    break
+                ids.update(self._token_index[token])
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        return list(result or [])
+
+    def _fuzzy_matches(self, query: str) -> List[int]:
+        query_grams = trigrams(query)
+        counts: Dict[int, int] = {}
+        for gram in query_grams:
+            for i in self._trigram_index.get(gram, []):
+                counts[i] = counts.get(i, 0) + 1
+        scored = []
+        for i, shared in counts.items():
+            name_grams = len(trigrams(self._entries[i][0].lower()))
+            score = shared / (len(query_grams) + name_grams - shared)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, self._entries[i][0], i))
+        scored.sort()
+        return [i for _score, _name, i in scored[:FUZZY_LIMIT]]
+
+    def search(self, query: str, within: Optional[Iterable[str]] = None) -> List[str]:
+        """搜索包名
+
+        结果按匹配程度排序：完全匹配、前缀、子串、描述，最后是模糊匹配。
+        within 不为空时只在给定的包名范围内查找（用于边输入边搜索时缩小结果）。
+        """
+        query = query.strip().lower()
+        if not query or not self._entries:
+            return []
+
+        allowed = set(within) if within is not None else None
+        seen: Set[int] = set()
+        results: List[str] = []
+
+        def collect(ids: Iterable[int]):
+            for i in sorted(ids, key=lambda i: self._entries[i][0]):
+                name = self._entries[i][0]
+                if i in seen or (allowed is not None and name not in allowed):
+                    continue
+                seen.add(i)
+                results.append(name)
+
+        prefix = self._prefix_matches(query)
+        collect(i for i in prefix if self._entries[i][0].lower() == query)
+        collect(prefix)
+        collect(self._substring_matches(query))
+        collect(self._description_matches(query))
+        if not results:
+            collect(self._fuzzy_matches(query))
+        return results
@@ -0,0 +1,156 @@
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from task_executor import BrewTask, TaskExecutor
+
+# 采样间隔（毫秒）
+HEALTH_SAMPLE_INTERVAL_MS = 2000
+# 每个服务保留的样本数（环形缓冲区大小），默认约两分钟
+HEALTH_HISTORY_SIZE = 60
+
+
+class HealthSample(NamedTuple):
+    """服务进程（含子进程）在某一时刻的资源占用"""
+    timestamp: float
+    cpu_percent: float
+    rss: int
+    open_files: int
+    threads: int
+
+
+def sample_services(service_pids: Dict[str, int]) -> Optional[Dict[str, HealthSample]]:
+    """对每个服务的主进程及其子进程采样一次，psutil 不可用时返回 None
+
+    所有进程只遍历一遍 process_iter，据此建立父子关系，再只读取服务相关进程的指标。
+    psutil 会缓存 process_iter 返回的 Process 对象，cpu_percent(None) 因此得到的是距上次采样的占用率。
+    进程树中任一进程的指标无权读取时不返回该服务的样本，避免把部分进程的合计当成整个服务的占用。
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    if not service_pids:
+        return {}
+
+    processes = {}
+    children: Dict[int, List[int]] = {}
+    for proc in psutil.process_iter(['ppid']):
+        processes[proc.pid] = proc
+        children.setdefault(proc.info['ppid'], []).append(proc.pid)
+
+    now = time.time()
+    samples = {}
+    for name, pid in service_pids.items():
+        if pid not in processes:
+            continue
+        tree, pending = [], [pid]
+        while pending:
+            current = pending.pop()
+            tree.append(current)
+            pending.extend(children.get(current, ()))
+
+        cpu = 0.0
+        rss = open_files = threads = 0
+        denied = False
+        for tree_pid in tree:
+            proc = processes[tree_pid]
+            try:
+                with proc.oneshot():
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                    open_files += proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+            except psutil.AccessDenied:
+                denied = True
+                break
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                # 采样期间退出的子进程不再占用资源
+                continue
+        if denied:
+            logging.debug(f"Access denied while sampling service {name}, skipping")
+            continue
+        samples[name] = HealthSample(now, cpu, rss, open_files, threads)
+    return samples
+
+
+class ServiceHealthWatcher(QObject):
+    """定时在后台采样正在运行的服务的 CPU、内存、打开文件数和线程数
+
+    每个服务的样本保存在固定长度的环形缓冲区（deque）中，服务停止后丢弃其历史。
+    只在服务页可见时由 set_visible() 启动；没有正在运行的服务时不提交采样任务。
+    """
+    # 每次采样完成后发出 {服务名: HealthSample}
+    sampled = pyqtSignal(dict)
+
+    def __init__(self, executor: TaskExecutor, pids_provider: Callable[[], Dict[str, int]],
+                 interval_ms: int = HEALTH_SAMPLE_INTERVAL_MS, history_size: int = HEALTH_HISTORY_SIZE,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.executor = executor
+        # 返回 {服务名: 主进程 PID}，在 GUI 线程中调用
+        self.pids_provider = pids_provider
+        self.history_size = history_size
+        self.history: Dict[str, Deque[HealthSample]] = {}
+        self._task: Optional[BrewTask] = None
+        # psutil 不可用时不再启动
+        self._disabled = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def set_visible(self, visible: bool):
+        """服务页显示或隐藏时调用"""
+        if visible:
+            self.start()
+        else:
+            self.stop()
+
+    def start(self):
+        if self._disabled:
+            return
+        if not self._timer.isActive():
+            self._timer.start()
+            self._tick()
+
+    def stop(self):
+        self._timer.stop()
+        self.executor.cancel(self._task)
+        self._task = None
+
+    def _tick(self):
+        # 上一次采样尚未完成时跳过本次
+        if self._task is not None:
+            return
+        pids = self.pids_provider()
+        if not pids:
+            if self.history:
+                self.history.clear()
+                self.sampled.emit({})
+            return
+        self._task = self.executor.submit(
+            sample_services, pids,
+            on_result=lambda samples: self._on_sampled(pids, samples), on_error=self._on_error
+        )
+
+    def _on_sampled(self, pids: Dict[str, int], samples: Optional[Dict[str, HealthSample]]):
+        self._task = None
+        if samples is None:
+            logging.info("psutil is not available, service health watcher disabled")
+            self._disabled = True
+            self.stop()
+            return
+        # 已停止的服务丢弃历史；本次无权读取的服务保留之前的样本
+        for name in list(self.history):
+            if name not in pids:
+                del self.history[name]
+        for name, sample in samples.items():
+            self.history.setdefault(name, deque(maxlen=self.history_size)).append(sample)
+        self.sampled.emit(samples)
+
+    def _on_error(self, message: str):
+        self._task = None
+        logging.warning(f"Error sampling service health: {message}")
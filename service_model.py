@@ -0,0 +1,230 @@
+from typing import Any, Deque, Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, QPointF, QRect, QSize, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+from service_health import HealthSample
+from services import ServiceRecord
+from styles import PLACEHOLDER_COLOR, STATUS_COLORS
+from upgrade_model import format_bytes
+
+# 显示状态对应的文字（见 ServiceRecord.display_status）
+STATUS_TEXTS = {
+    "started": "运行中",
+    "scheduled": "已计划",
+    "stopped": "已停止",
+    "error": "错误",
+    "unknown": "未知",
+}
+# 状态所在的数据角色
+StatusRole = Qt.ItemDataRole.UserRole + 1
+# 资源占用历史（HealthSample 的 deque）所在的数据角色
+HealthRole = Qt.ItemDataRole.UserRole + 2
+
+# 每行的高度与左右留白（像素）
+SERVICE_ROW_HEIGHT = 40
+SERVICE_ROW_PADDING = 8
+SERVICE_FONT_SIZE = 12
+# 服务名占用的宽度（像素），其后依次绘制 CPU 走势图和资源占用
+SERVICE_NAME_WIDTH = 180
+SPARKLINE_WIDTH = 120
+SPARKLINE_HEIGHT = 22
+METRICS_FONT_SIZE = 10
+
+
+def format_sample(sample: HealthSample) -> str:
+    return (f"CPU {sample.cpu_percent:.1f}%  内存 {format_bytes(sample.rss)}  "
+            f"线程 {sample.threads}  文件 {sample.open_files}")
+
+
+class ServiceListModel(QAbstractListModel):
+    """服务列表模型，每行是一个 ServiceRecord"""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._services: List[ServiceRecord] = []
+        self._placeholder: Optional[str] = None
+        # {服务名: 样本环形缓冲区}，由 ServiceHealthWatcher 维护
+        self._health: Dict[str, Deque[HealthSample]] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return 1 if self._placeholder is not None else len(self._services)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if self._placeholder is not None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self._placeholder
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(PLACEHOLDER_COLOR)
+            return None
+        record = self._services[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole):
+            return record.name
+        if role == StatusRole:
+            return record.display_status
+        if role == HealthRole:
+            return self._health.get(record.name)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.describe(record, self._health.get(record.name))
+        return None
+
+    @staticmethod
+    def describe(record: ServiceRecord, history: Optional[Deque[HealthSample]] = None) -> str:
+        lines = [f"状态：{record.status}"]
+        if record.pid:
+            lines.append(f"PID：{record.pid}")
+        if record.exit_code not in (None, 0):
+            lines.append(f"退出码：{record.exit_code}")
+        if record.user:
+            lines.append(f"用户：{record.user}")
+        if record.file:
+            lines.append(f"文件：{record.file}")
+        if history:
+            lines.append(format_sample(history[-1]))
+        return "\n".join(lines)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if self._placeholder is not None:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def name_at(self, row: int) -> str:
+        return self._services[row].name
+
+    def set_placeholder(self, text: str):
+        self.beginResetModel()
+        self._services = []
+        self._placeholder = text
+        self.endResetModel()
+
+    def set_services(self, services: List[ServiceRecord]):
+        """更新全部服务
+
+        服务名与顺序不变时只对有变化的行发出 dataChanged，否则重置模型。
+        """
+        services = list(services)
+        if self._placeholder is None and [s.name for s in services] == [s.name for s in self._services]:
+            for row, service in enumerate(services):
+                if service != self._services[row]:
+                    self._services[row] = service
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+            return
+
+        self.beginResetModel()
+        self._placeholder = None
+        self._services = services
+        self.endResetModel()
+
+    def set_health(self, history: Dict[str, Deque[HealthSample]]):
+        """更新资源占用历史，只重绘有样本或刚失去样本的行"""
+        changed = set(history) | set(self._health)
+        self._health = history
+        if self._placeholder is not None:
+            return
+        for row, service in enumerate(self._services):
+            if service.name in changed:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [HealthRole])
+
+    def update_service(self, record: ServiceRecord) -> bool:
+        """更新单个服务所在的行，列表中没有该服务时返回 False"""
+        if self._placeholder is not None:
+            return False
+        for row, service in enumerate(self._services):
+            if service.name == record.name:
+                if service != record:
+                    self._services[row] = record
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                return True
+        return False
+
+
+class ServiceDelegate(QStyledItemDelegate):
+    """直接绘制服务名和带颜色的状态圆点
+
+    背景（包括选中和悬停效果）由视图按样式表绘制，选中状态变化时不需要重新应用任何样式。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.font = QFont('', SERVICE_FONT_SIZE)
+        self.metrics_font = QFont('', METRICS_FONT_SIZE)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), SERVICE_ROW_HEIGHT)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        status = index.data(StatusRole)
+        if status is None:
+            # 占位行
+            super().paint(painter, option, index)
+            return
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, widget)
+
+        selected = bool(opt.state & QStyle.StateFlag.State_Selected)
+        rect = opt.rect.adjusted(SERVICE_ROW_PADDING, 0, -SERVICE_ROW_PADDING, 0)
+        status_text = f"● {STATUS_TEXTS[status]}"
+
+        painter.save()
+        painter.setFont(self.font)
+        metrics = painter.fontMetrics()
+        status_width = metrics.horizontalAdvance(status_text)
+        status_rect = QRect(rect.right() - status_width, rect.top(), status_width, rect.height())
+        name_rect = QRect(rect.left(), rect.top(), rect.width() - status_width - 15, rect.height())
+        align = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        history = index.data(HealthRole)
+        if history:
+            # 服务名之后依次是 CPU 走势图和最新的资源占用
+            name_rect.setWidth(min(name_rect.width(), SERVICE_NAME_WIDTH))
+            spark_rect = QRect(name_rect.right() + 10, rect.center().y() - SPARKLINE_HEIGHT // 2,
+                               SPARKLINE_WIDTH, SPARKLINE_HEIGHT)
+            line_color = QColor("white") if selected else QColor(STATUS_COLORS["started"])
+            self.paint_sparkline(painter, spark_rect, [s.cpu_percent for s in history], line_color)
+            metrics_rect = QRect(spark_rect.right() + 10, rect.top(),
+                                 status_rect.left() - spark_rect.right() - 25, rect.height())
+            painter.setFont(self.metrics_font)
+            painter.setPen(QColor("white") if selected else QColor(PLACEHOLDER_COLOR))
+            text = painter.fontMetrics().elidedText(format_sample(history[-1]), Qt.TextElideMode.ElideRight,
+                                                    metrics_rect.width())
+            painter.drawText(metrics_rect, align, text)
+            painter.setFont(self.font)
+
+        painter.setPen(QColor("white"))
+        name = metrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, name_rect.width())
+        painter.drawText(name_rect, align, name)
+        # 选中时背景为绿色，状态文字改为白色以保证可读
+        painter.setPen(QColor("white") if selected else QColor(STATUS_COLORS[status]))
+        painter.drawText(status_rect, align, status_text)
+        painter.restore()
+
+    @staticmethod
+    def paint_sparkline(painter: QPainter, rect: QRect, values: List[float], color: QColor):
+        """在 rect 中绘制折线，纵轴从 0 到最大值（至少 1，避免空闲服务的噪声被放大）"""
+        if len(values) < 2 or rect.width() <= 0:
+            return
+        peak = max(max(values), 1.0)
+        step = rect.width() / (len(values) - 1)
+        path = QPainterPath()
+        for i, value in enumerate(values):
+            point = QPointF(rect.left() + i * step, rect.bottom() - value / peak * rect.height())
+            if i == 0:
+                path.moveTo(point)
+            else:
+                path.lineTo(point)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(color, 1.5))
+        painter.drawPath(path)
@@ -0,0 +1,81 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# brew 的服务状态到界面显示状态的映射，未列出的状态显示为 unknown
+DISPLAY_STATUSES = {
+    "started": "started",
+    "scheduled": "scheduled",
+    "none": "stopped",
+    "stopped": "stopped",
+    "error": "error",
+}
+
+
+@dataclass
+class ServiceRecord:
+    """一个 Homebrew 服务的状态（来自 brew services info --json）"""
+    name: str
+    # brew 报告的原始状态：started、scheduled、none、error、other、unknown 等
+    status: str
+    user: Optional[str] = None
+    # launchd plist 或 systemd unit 文件路径
+    file: Optional[str] = None
+    pid: Optional[int] = None
+    exit_code: Optional[int] = None
+    running: bool = False
+    loaded: bool = False
+
+    @property
+    def display_status(self) -> str:
+        return DISPLAY_STATUSES.get(self.status, "unknown")
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ServiceRecord":
+        return cls(
+            name=data.get("name") or "",
+            status=str(data.get("status") or "unknown").lower(),
+            user=data.get("user") or None,
+            file=data.get("file") or None,
+            pid=data.get("pid") or None,
+            exit_code=data.get("exit_code"),
+            running=bool(data.get("running")),
+            loaded=bool(data.get("loaded")),
+        )
+
+
+def parse_services_json(output: str) -> Optional[List[ServiceRecord]]:
+    """解析 brew services info --json 的输出，无法解析时返回 None"""
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return None
+    return [ServiceRecord.from_json(item) for item in data if isinstance(item, dict) and item.get("name")]
+
+
+def parse_services_list(output: str) -> List[ServiceRecord]:
+    """解析 brew services list 的文本输出（旧版 brew 不支持 --json 时使用）
+
+    列依次为 Name、Status、User、File；状态为 error 时后面还跟着退出码，User 与 File 可能为空。
+    """
+    records = []
+    for line in output.split("\n")[1:]:  # Skip header line
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        record = ServiceRecord(name=parts[0], status=parts[1].lower())
+        rest = parts[2:]
+        if record.status == "error" and rest and rest[0].isdigit():
+            record.exit_code = int(rest.pop(0))
+        # 没有 User 列时，剩下的第一列就是文件路径
+        if rest and not rest[0].startswith(("/", "~")):
+            record.user = rest.pop(0)
+        if rest:
+            record.file = " ".join(rest)
+        record.running = record.status == "started"
+        records.append(record)
+    return records
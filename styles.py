@@ -0,0 +1,226 @@
+# 整个应用共用的样式表，只在主窗口上设置一次。
+# 各控件通过 objectName 或动态属性（variant/status）匹配对应的规则，
+# 不再逐个调用 setStyleSheet，避免每个控件单独解析样式表。
+
+# 由委托直接绘制的颜色（与样式表中的图例颜色一致）
+STATUS_COLORS = {
+    "started": "#4CAF50",
+    "scheduled": "#2196F3",
+    "stopped": "#f44336",
+    "error": "#E91E63",
+    "unknown": "#FFA500",
+}
+PLACEHOLDER_COLOR = "#888888"
+
+APP_STYLESHEET = """
+    QMainWindow {
+        background-color: #2d2d2d;
+    }
+    QWidget {
+        color: #ffffff;
+        background-color: #2d2d2d;
+    }
+    QTabWidget::pane {
+        border: 1px solid #3d3d3d;
+        background-color: #2d2d2d;
+        border-radius: 5px;
+    }
+    QTabBar::tab {
+        background-color: #383838;
+        color: #ffffff;
+        padding: 8px 20px;
+        margin-right: 2px;
+        border-top-left-radius: 4px;
+        border-top-right-radius: 4px;
+    }
+    QTabBar::tab:selected {
+        background-color: #454545;
+        border-bottom: 2px solid #4CAF50;
+    }
+    QPushButton {
+        background-color: #4CAF50;
+        color: white;
+        border: none;
+        padding: 8px 16px;
+        border-radius: 4px;
+        min-width: 100px;
+    }
+    QPushButton:hover {
+        background-color: #45a049;
+    }
+    QPushButton:pressed {
+        background-color: #3d8b40;
+    }
+    QPushButton[variant="primary"] {
+        background-color: #4CAF50;
+        font-weight: bold;
+    }
+    QPushButton[variant="primary"]:hover {
+        background-color: #45a049;
+    }
+    QPushButton[variant="danger"] {
+        background-color: #f44336;
+        font-weight: bold;
+    }
+    QPushButton[variant="danger"]:hover {
+        background-color: #da190b;
+    }
+    QPushButton[variant="warning"] {
+        background-color: #FF9800;
+        font-weight: bold;
+    }
+    QPushButton[variant="warning"]:hover {
+        background-color: #F57C00;
+    }
+    QLineEdit {
+        padding: 8px;
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        background-color: #383838;
+        color: white;
+    }
+    QLineEdit:focus {
+        border: 1px solid #4CAF50;
+    }
+    QListWidget {
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        padding: 5px;
+        background-color: #383838;
+        color: white;
+    }
+    QListWidget::item {
+        padding: 5px;
+        border-radius: 2px;
+    }
+    QListWidget::item:selected {
+        background-color: #4CAF50;
+        color: white;
+    }
+    QListWidget::item:hover {
+        background-color: #454545;
+    }
+    QMessageBox {
+        background-color: #2d2d2d;
+        color: white;
+    }
+    QMessageBox QLabel {
+        color: white;
+    }
+    QMessageBox QPushButton {
+        min-width: 80px;
+    }
+
+    QLabel#tabTitle {
+        color: #4CAF50;
+        margin-bottom: 10px;
+    }
+    QLabel#tabHint {
+        color: #888888;
+        margin-bottom: 10px;
+    }
+
+    QListView#packageList {
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        padding: 5px;
+        background-color: #383838;
+        color: white;
+    }
+    QListView#packageList::item {
+        padding: 10px;
+        border-bottom: 1px solid #3d3d3d;
+    }
+    QListView#packageList::item:selected {
+        background-color: #4CAF50;
+        color: white;
+        border-radius: 4px;
+    }
+    QListView#packageList::item:hover {
+        background-color: #454545;
+        border-radius: 4px;
+    }
+
+    QTextBrowser#packageDetails {
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        padding: 8px;
+        background-color: #383838;
+        color: white;
+    }
+
+    QPlainTextEdit#operationLog {
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        background-color: #262626;
+        color: #bbbbbb;
+        font-family: Menlo, monospace;
+        font-size: 11px;
+    }
+
+    QListView#serviceList {
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        padding: 5px;
+        background-color: #383838;
+        color: white;
+    }
+    QListView#serviceList::item {
+        border-radius: 4px;
+        margin: 2px;
+        padding: 0px;
+    }
+    QListView#serviceList::item:selected {
+        background-color: #4CAF50;
+    }
+    QListView#serviceList::item:hover:!selected {
+        background-color: #454545;
+    }
+    QLabel#statusLegend[status="started"] {
+        color: #4CAF50;
+    }
+    QLabel#statusLegend[status="scheduled"] {
+        color: #2196F3;
+    }
+    QLabel#statusLegend[status="stopped"] {
+        color: #f44336;
+    }
+    QLabel#statusLegend[status="error"] {
+        color: #E91E63;
+    }
+    QLabel#statusLegend[status="unknown"] {
+        color: #FFA500;
+    }
+    QLabel#statusLegend {
+        font-weight: bold;
+        padding: 5px;
+    }
+
+    QTableView#portTable, QTableView#upgradeTable, QTableView#diskUsageTable,
+    QTableView#metricsTable {
+        background-color: #383838;
+        border: 1px solid #3d3d3d;
+        border-radius: 4px;
+        gridline-color: #2d2d2d;
+    }
+    QTableView#portTable::item, QTableView#upgradeTable::item,
+    QTableView#diskUsageTable::item, QTableView#metricsTable::item {
+        padding: 8px;
+        color: white;
+    }
+    QTableView#portTable::item:selected, QTableView#upgradeTable::item:selected,
+    QTableView#diskUsageTable::item:selected, QTableView#metricsTable::item:selected {
+        background-color: #4CAF50;
+    }
+    QHeaderView::section {
+        background-color: #2d2d2d;
+        color: white;
+        padding: 8px;
+        border: 1px solid #3d3d3d;
+        font-weight: bold;
+    }
+    QTableCornerButton::section {
+        background-color: #2d2d2d;
+        border: 1px solid #3d3d3d;
+    }
+"""
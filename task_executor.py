@@ -0,0 +1,187 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from operation_scheduler import submit_exclusive
+
+
+class TaskSignals(QObject):
+    """任务结果信号（QRunnable 本身不能发信号）"""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    # 任务执行过程中逐行输出的文本
+    progress = pyqtSignal(str)
+    # 任务执行过程中发出的进度对象（后台线程不再修改的快照）
+    event = pyqtSignal(object)
+    # 无论成功、失败还是取消都会发出，仅供 TaskExecutor 释放引用
+    completed = pyqtSignal()
+
+
+class BrewTask(QRunnable):
+    """提交到共享线程池的单个任务
+
+    结果通过 signals.finished 以队列连接的方式回到 GUI 线程。任务被取消后不会再发出任何信号。
+    """
+
+    def __init__(self, func: Callable, *args, on_cancel: Optional[Callable] = None, **kwargs):
+        super().__init__()
+        # 由 TaskExecutor 持有引用，避免 Python 对象在线程池运行前被回收
+        self.setAutoDelete(False)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_cancel = on_cancel
+        self.signals = TaskSignals()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        """取消任务：尚未开始的任务不会执行，正在执行的任务结果会被丢弃"""
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        if self.on_cancel is not None and not self.done:
+            try:
+                self.on_cancel()
+            except Exception as e:
+                logging.warning(f"Error cancelling task: {e}")
+
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            try:
+                result = self.func(*self.args, **self.kwargs)
+            except Exception as e:
+                logging.error(f"Error in worker task {getattr(self.func, '__name__', self.func)}: {e}")
+                if not self.cancelled:
+                    self.signals.error.emit(str(e))
+                return
+            if not self.cancelled:
+                self.signals.finished.emit(result)
+        finally:
+            self._done.set()
+            self.signals.completed.emit()
+
+
+class TaskExecutor(QObject):
+    """所有 BrewManager 调用共用的有界线程池
+
+    修改操作（用 exclusive 声明的方法）通过 submit_operation() 交给调度器自己的线程执行，
+    排队期间不占用线程池，查询和刷新不会被排队中的操作挡住。
+    """
+
+    def __init__(self, max_workers: int = 4, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self._tasks: Set[BrewTask] = set()
+        # 尚未结束的修改操作，关闭窗口时取消其中还在排队的
+        self._operations: Set[Future] = set()
+
+    def submit(self, func: Callable, *args,
+               on_result: Optional[Callable] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               on_cancel: Optional[Callable] = None,
+               on_progress: Optional[Callable[[str], None]] = None,
+               on_event: Optional[Callable[[object], None]] = None,
+               **kwargs) -> BrewTask:
+        """提交任务，on_result/on_error/on_progress/on_event 在 GUI 线程中调用
+
+        指定 on_progress 时，func 会收到 on_output 关键字参数，每调用一次就把一行文本转发到 GUI 线程。
+        指定 on_event 时，func 会收到同名关键字参数，用于转发进度对象。
+        """
+        task = BrewTask(func, *args, on_cancel=on_cancel, **kwargs)
+        if on_progress is not None:
+            task.kwargs["on_output"] = task.signals.progress.emit
+            task.signals.progress.connect(on_progress)
+        if on_event is not None:
+            task.kwargs["on_event"] = task.signals.event.emit
+            task.signals.event.connect(on_event)
+        if on_result is not None:
+            task.signals.finished.connect(on_result)
+        if on_error is not None:
+            task.signals.error.connect(on_error)
+        task.signals.completed.connect(lambda: self._tasks.discard(task))
+        self._tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    def submit_operation(self, method: Callable, *args,
+                         on_result: Optional[Callable] = None,
+                         on_error: Optional[Callable[[str], None]] = None,
+                         on_progress: Optional[Callable[[str], None]] = None,
+                         on_event: Optional[Callable[[object], None]] = None,
+                         **kwargs) -> Future:
+        """把 BrewManager 的修改操作加入其调度器的队列，回调与 submit() 相同，在 GUI 线程中调用
+
+        返回的 Future 在操作开始前可以取消。
+        """
+        signals = TaskSignals()
+        if on_progress is not None:
+            kwargs["on_output"] = signals.progress.emit
+            signals.progress.connect(on_progress)
+        if on_event is not None:
+            kwargs["on_event"] = signals.event.emit
+            signals.event.connect(on_event)
+        if on_result is not None:
+            signals.finished.connect(on_result)
+        if on_error is not None:
+            signals.error.connect(on_error)
+        future = submit_exclusive(method, *args, **kwargs)
+        self._operations.add(future)
+        signals.completed.connect(lambda: self._operations.discard(future))
+
+        def deliver(done: Future):
+            # 在调度器的线程中调用，信号以队列连接的方式回到 GUI 线程
+            try:
+                if done.cancelled():
+                    return
+                error = done.exception()
+                if error is not None:
+                    logging.error(f"Error in operation {getattr(method, '__name__', method)}: {error}")
+                    signals.error.emit(str(error))
+                else:
+                    signals.finished.emit(done.result())
+            finally:
+                signals.completed.emit()
+
+        future.add_done_callback(deliver)
+        return future
+
+    def cancel(self, task: Optional[BrewTask]):
+        """取消任务；尚在队列中的任务直接移出线程池"""
+        if task is None:
+            return
+        task.cancel()
+        if self.pool.tryTake(task):
+            task._done.set()
+            self._tasks.discard(task)
+
+    def active_count(self) -> int:
+        return self.pool.activeThreadCount()
+
+    def shutdown(self, wait_ms: int = 3000) -> bool:
+        """取消排队中的任务和修改操作，并等待正在运行的任务结束"""
+        for future in list(self._operations):
+            future.cancel()
+        self.pool.clear()
+        for task in list(self._tasks):
+            if not task.done:
+                task.cancel()
+        finished = self.pool.waitForDone(wait_ms)
+        if finished:
+            self._tasks.clear()
+        return finished
+
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from async_brew_manager import AsyncBrewManager
+from brew_manager import BrewManager
+from command_result import CommandResult
+from metrics import MetricsRegistry
+from operation_scheduler import OperationScheduler
+
+
+def make_manager():
+    """只记录命令及其运行线程的 BrewManager"""
+    manager = object.__new__(BrewManager)
+    manager.brew_path = "brew"
+    manager.scheduler = OperationScheduler("/tmp/prefix")
+    manager.metrics = MetricsRegistry()
+    manager.command_pool = ThreadPoolExecutor(2, thread_name_prefix="brew-command")
+    manager.commands = []
+
+    def run_command(command, process_key=None):
+        manager.commands.append((command, threading.current_thread().name))
+        return CommandResult(command, 0, "", "", 0.1)
+
+    manager.run_command = run_command
+    return manager
+
+
+def test_queries_run_in_the_command_pool_and_operations_in_the_queue():
+    manager = make_manager()
+    async_manager = AsyncBrewManager(manager)
+
+    async def run():
+        await async_manager.refresh_service("redis")
+        return await async_manager.manage_service("redis", "restart")
+
+    assert asyncio.run(run()) == (True, "")
+    (_, query_thread), (command, operation_thread) = manager.commands
+    assert query_thread.startswith("brew-command")
+    assert command == ["brew", "services", "restart", "redis"]
+    assert operation_thread == "brew-operations"
+
+
+def test_timed_out_query_cancels_its_process():
+    manager = make_manager()
+    released = threading.Event()
+    cancelled = []
+
+    def run_command(command, process_key=None):
+        released.wait(5)
+        return CommandResult(command, None, "", "terminated", 0.1)
+
+    def cancel_process(process_key):
+        cancelled.append(process_key)
+        released.set()
+        return True
+
+    manager.run_command = run_command
+    manager.cancel_process = cancel_process
+    async_manager = AsyncBrewManager(manager, query_timeout=0.05)
+
+    try:
+        asyncio.run(async_manager.refresh_service("redis"))
+    except TimeoutError as e:
+        assert "超时" in str(e)
+    else:
+        raise AssertionError("expected TimeoutError")
+    assert cancelled == ["async-0"]
+
+
+def test_timed_out_operation_returns_a_failure():
+    manager = make_manager()
+    released = threading.Event()
+    manager.run_command = lambda command, process_key=None: (released.wait(5), CommandResult(command, 0, "", "", 0))[1]
+    manager.cancel_process = lambda process_key: released.set() or True
+    async_manager = AsyncBrewManager(manager, timeout=0.05)
+
+    success, message = asyncio.run(async_manager.manage_service("redis", "restart"))
+    assert not success
+    assert "超时" in message
@@ -0,0 +1,148 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from brew_manager import BrewManager
+from command_result import CommandResult
+from metrics import MetricsRegistry
+from operation_scheduler import ItemDone, OperationScheduler
+from upgrades import OutdatedPackage, UpgradePlan
+
+
+def make_manager(failing=()):
+    """不查找 brew 的 BrewManager，安装/卸载只记录调用"""
+    manager = object.__new__(BrewManager)
+    manager.scheduler = OperationScheduler("/tmp/prefix")
+    manager.metrics = MetricsRegistry()
+    manager.batches = []
+
+    def install_packages(package_names, on_output=None, on_event=None):
+        manager.batches.append(("install", list(package_names)))
+        failed = set(package_names) & set(failing)
+        return not failed, f"安装失败：{' '.join(sorted(failed))}" if failed else "已安装"
+
+    def uninstall_packages(package_names, ignore_dependencies=False, on_output=None, on_event=None):
+        manager.batches.append(("uninstall", list(package_names)))
+        return True, "已卸载"
+
+    manager.install_packages = install_packages
+    manager.uninstall_packages = uninstall_packages
+    return manager
+
+
+def test_run_operations_batches_adjacent_jobs():
+    manager = make_manager()
+    jobs = [("install", "a", False), ("install", "b", False), ("uninstall", "c", False)]
+    assert manager.run_operations(jobs) == (True, "已安装\n已卸载")
+    assert manager.batches == [("install", ["a", "b"]), ("uninstall", ["c"])]
+
+
+def test_run_operations_lists_skipped_jobs_after_a_failure():
+    manager = make_manager(failing=["a"])
+    jobs = [("install", "a", False), ("uninstall", "b", False), ("install", "c", False)]
+    success, message = manager.run_operations(jobs)
+    assert not success
+    assert message == "安装失败：a\n\n以下操作未执行：\n卸载 b\n安装 c"
+    assert manager.batches == [("install", ["a"])]
+
+
+def test_each_call_runs_only_its_own_jobs():
+    manager = make_manager()
+    manager.run_operations([("install", "a", False)])
+    manager.run_operations([("install", "b", False)])
+    assert manager.batches == [("install", ["a"]), ("install", ["b"])]
+
+
+def make_fetching_manager(tmp_path):
+    """brew fetch 只返回下载路径的 BrewManager"""
+    manager = make_manager()
+    manager.brew_path = "brew"
+    manager.command_pool = ThreadPoolExecutor(2)
+    bottle = tmp_path / "bottle.tar.gz"
+    bottle.write_bytes(b"x" * 100)
+
+    def run_command(command):
+        if command[-1] == "broken":
+            return CommandResult(command, 1, "", "Error: download failed", 0.1)
+        return CommandResult(command, 0, f"Downloaded to: {bottle}", "", 0.1)
+
+    manager.run_command = run_command
+    return manager
+
+
+def test_fetch_upgrades_publishes_snapshots_and_leaves_the_original_plan_alone(tmp_path):
+    manager = make_fetching_manager(tmp_path)
+    plan = UpgradePlan.from_outdated([
+        OutdatedPackage("wget", "formula", ["1.0"], "1.1"),
+        OutdatedPackage("broken", "formula", ["1.0"], "1.1"),
+        OutdatedPackage("pinned", "formula", ["1.0"], "1.1", pinned=True),
+    ])
+    snapshots = []
+    result = manager.fetch_upgrades(plan.snapshot(), max_parallel=1, on_event=snapshots.append)
+
+    assert [step.stage for step in plan.steps] == ["pending", "pending", "pinned"]
+    assert [step.stage for step in result.steps] == ["fetched", "fetch_failed", "pinned"]
+    assert result.steps[0].download_bytes == 100
+    assert snapshots[0].steps[0].stage == "fetching"
+    assert snapshots[0].steps[1].stage == "pending"
+    assert [step.stage for step in snapshots[-1].steps] == ["fetched", "fetch_failed", "pinned"]
+    assert all(snapshot is not result for snapshot in snapshots)
+    assert snapshots[-1].steps[0] is not result.steps[0]
+
+
+def test_manage_services_reports_each_service_through_on_event():
+    manager = make_manager()
+    manager.command_pool = ThreadPoolExecutor(2)
+    manager._manage_service = lambda name, action, process_key=None: (name != "redis", f"{name} {action}")
+    events = []
+    success, _ = manager.manage_services(["mysql", "redis", "nginx"], "restart", on_event=events.append)
+
+    assert not success
+    assert sorted(events) == [ItemDone("mysql", True), ItemDone("nginx", True), ItemDone("redis", False)]
+
+
+def test_track_packages_reports_only_requested_packages():
+    manager = make_manager()
+    lines, events = [], []
+    on_output, finish = manager.track_packages(["wget", "homebrew/cask/firefox", "jq"], lines.append, events.append)
+    for line in ("==> Installing dependencies for wget: openssl@3",
+                 "🍺  /opt/homebrew/Cellar/openssl@3/3.3.1: 6,987 files, 32MB",
+                 "🍺  /opt/homebrew/Cellar/wget/1.24.5: 92 files, 4.5MB",
+                 "🍺  firefox was successfully installed!"):
+        on_output(line)
+    assert events == [ItemDone("wget", True), ItemDone("homebrew/cask/firefox", True)]
+
+    finish(True)
+    assert events[-1] == ItemDone("jq", True)
+    assert len(lines) == 4
+
+
+def test_parse_done_package_recognises_uninstall_lines():
+    assert BrewManager.parse_done_package("Uninstalling /usr/local/Cellar/wget/1.24.5... (92 files, 4.5MB)") == "wget"
+    assert BrewManager.parse_done_package("==> Uninstalling Cask firefox") == "firefox"
+    assert BrewManager.parse_done_package("==> Pouring wget--1.24.5.bottle.tar.gz") is None
+
+
+def test_cancel_process_terminates_every_process_under_the_key():
+    class FakeProcess:
+        def __init__(self):
+            self.terminated = False
+
+        def poll(self):
+            return 0 if self.terminated else None
+
+        def terminate(self):
+            self.terminated = True
+
+    manager = make_manager()
+    manager._processes = {}
+    manager._processes_lock = threading.Lock()
+    first, second = FakeProcess(), FakeProcess()
+    manager._register_process("services", first)
+    manager._register_process("services", second)
+
+    assert manager.cancel_process("services")
+    assert first.terminated and second.terminated
+    manager._unregister_process("services", first)
+    manager._unregister_process("services", second)
+    assert manager._processes == {}
+    assert not manager.cancel_process("services")
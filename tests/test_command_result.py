@@ -0,0 +1,75 @@
+from brew_manager import BrewManager
+from command_result import CommandResult, classify_error
+
+
+def result(returncode, stderr="", stdout=""):
+    return CommandResult(["brew"], returncode, stdout, stderr)
+
+
+def test_classify_error_names_known_failures():
+    assert classify_error("Error: Refusing to uninstall foo\nbecause it is required by bar") == "dependency"
+    assert classify_error("Error: No available formula with the name \"nope\".") == "not_found"
+    assert classify_error("Error: No such keg: /opt/homebrew/Cellar/foo") == "not_installed"
+    assert classify_error("curl: (22) The requested URL returned error: 404") == "download"
+    assert classify_error("Error: something else") == "error"
+    assert classify_error("Warning: foo is already installed") is None
+    assert classify_error("") is None
+
+
+def test_exit_zero_is_success_despite_stderr_noise():
+    assert result(0, "Warning: wget 1.21 is already installed and up-to-date.").success
+    assert result(0, "curl: (22) The requested URL returned error: 404\nRetrying...").success
+    assert result(0, "rm: /opt/homebrew/var/log: Permission denied (ignored)").success
+    assert result(0, "Error: a hint that brew printed but did not fail on").success
+    assert result(0, "Warning: noise").error_kind is None
+
+
+def test_exit_zero_explicit_failures():
+    locked = result(0, "Error: Another active Homebrew update process is already in progress.")
+    assert not locked.success
+    assert locked.error_kind == "locked"
+
+
+def test_non_zero_exit_is_failure_and_classified():
+    assert not result(1).success
+    assert result(1).error_kind == "exit"
+    assert result(1, "Warning: only a warning").error_kind == "exit"
+    assert result(1, "Error: No such keg: /x").error_kind == "not_installed"
+    assert result(1, "curl: (6) Could not resolve host").error_kind == "download"
+
+
+def test_spawn_failure():
+    spawn = CommandResult(["brew"], None, "", "No such file or directory")
+    assert not spawn.success
+    assert spawn.error_kind == "spawn"
+    assert spawn.message == "No such file or directory"
+
+
+def test_message_prefers_stdout_on_success_and_stderr_on_failure():
+    assert result(0, "Warning: x", "done").message == "done"
+    assert result(2, "Error: boom", "partial").message == "Error: boom"
+    assert result(3).message == "命令退出码 3"
+
+
+def test_parse_uninstall_result_success_with_warnings():
+    success, message = BrewManager.parse_uninstall_result(
+        "foo", result(0, "Warning: foo has config files left", "Uninstalling /opt/homebrew/Cellar/foo/1.0...")
+    )
+    assert success
+    assert message.startswith("Uninstalling")
+    assert BrewManager.parse_uninstall_result("foo", result(0)) == (True, "卸载成功")
+
+
+def test_parse_uninstall_result_dependency_error():
+    stderr = ("Error: Refusing to uninstall /opt/homebrew/Cellar/openssl@3/3.1.0\n"
+              "because it is required by curl and wget, which are currently installed.")
+    success, message = BrewManager.parse_uninstall_result("openssl@3", result(1, stderr))
+    assert not success
+    assert "curl and wget" in message
+    assert message.endswith("是否强制卸载？")
+
+
+def test_parse_uninstall_result_other_error():
+    success, message = BrewManager.parse_uninstall_result("foo", result(1, "Error: No such keg: /x/foo"))
+    assert not success
+    assert message == "卸载失败：Error: No such keg: /x/foo"
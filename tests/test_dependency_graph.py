@@ -0,0 +1,101 @@
+import json
+
+from dependency_graph import DependencyGraph
+from inventory import read_cask_dependencies
+
+
+def formula(name, dependencies=(), on_request=True):
+    return {
+        "name": name,
+        "type": "formula",
+        "versions": ["1.0"],
+        "receipt": {
+            "installed_on_request": on_request,
+            "installed_as_dependency": not on_request,
+            "runtime_dependencies": list(dependencies),
+        },
+    }
+
+
+def cask(name, dependencies=()):
+    return {"name": name, "type": "cask", "versions": ["1.0"], "receipt": None,
+            "dependencies": list(dependencies)}
+
+
+def test_blocking_dependents_ignores_packages_in_the_same_batch():
+    graph = DependencyGraph.from_inventory([
+        formula("openssl@3", on_request=False),
+        formula("curl", ["homebrew/core/openssl@3"]),
+        formula("wget", ["openssl@3"]),
+    ])
+    assert graph.blocking_dependents(["openssl@3"]) == {"openssl@3": ["curl", "wget"]}
+    assert graph.blocking_dependents(["openssl@3", "curl"]) == {"openssl@3": ["wget"]}
+    assert graph.blocking_dependents(["openssl@3", "curl", "wget"]) == {}
+
+
+def test_orphans_lists_dependencies_nothing_needs():
+    graph = DependencyGraph.from_inventory([
+        formula("libidn2", on_request=False),
+        formula("gettext", on_request=False),
+        formula("wget", ["libidn2"]),
+    ])
+    assert graph.orphans() == ["gettext"]
+
+
+def test_orphans_keeps_formulae_required_by_casks():
+    graph = DependencyGraph.from_inventory([
+        formula("libusb", on_request=False),
+        formula("ffmpeg", ["libusb"], on_request=False),
+        cask("obs", ["ffmpeg"]),
+    ])
+    assert graph.orphans() == []
+    graph.update("obs", None)
+    assert graph.orphans() == ["ffmpeg", "libusb"]
+
+
+def test_orphans_is_empty_when_dependencies_are_unknown():
+    old = formula("wget")
+    old["receipt"]["runtime_dependencies"] = None
+    graph = DependencyGraph.from_inventory([old, formula("libidn2", on_request=False)])
+    assert graph.orphans() == []
+    unreadable_cask = cask("obs")
+    unreadable_cask["dependencies"] = None
+    graph = DependencyGraph.from_inventory([unreadable_cask, formula("ffmpeg", on_request=False)])
+    assert graph.orphans() == []
+
+
+def test_update_adds_replaces_and_removes_edges():
+    graph = DependencyGraph.from_inventory([formula("wget", ["libidn2"]), formula("libidn2", on_request=False)])
+    graph.update("wget", formula("wget", ["openssl@3"]))
+    assert graph.dependencies_of("wget") == {"openssl@3"}
+    assert graph.dependents_of("libidn2") == set()
+    graph.update("openssl@3", formula("openssl@3", on_request=False))
+    assert graph.dependents_of("openssl@3") == {"wget"}
+    graph.update("wget", None)
+    assert "wget" not in graph
+    assert graph.dependents_of("openssl@3") == set()
+    assert graph.orphans() == ["libidn2", "openssl@3"]
+
+
+def _cask_metadata(tmp_path, token, filename, content):
+    casks = tmp_path / token / ".metadata" / "1.0" / "20240101000000.000" / "Casks"
+    casks.mkdir(parents=True)
+    (casks / filename).write_text(content)
+    return str(tmp_path / token)
+
+
+def test_read_cask_dependencies_from_api_json(tmp_path):
+    path = _cask_metadata(tmp_path, "obs", "obs.json",
+                          json.dumps({"depends_on": {"formula": ["ffmpeg", "x264"], "macos": {}}}))
+    assert read_cask_dependencies(path, "obs") == ["ffmpeg", "x264"]
+
+
+def test_read_cask_dependencies_from_tap_source(tmp_path):
+    path = _cask_metadata(tmp_path, "obs", "obs.rb",
+                          'cask "obs" do\n  depends_on formula: "ffmpeg"\n  depends_on macos: ">= :big_sur"\nend\n')
+    assert read_cask_dependencies(path, "obs") == ["ffmpeg"]
+
+
+def test_read_cask_dependencies_is_none_without_metadata(tmp_path):
+    (tmp_path / "obs" / "1.0").mkdir(parents=True)
+    assert read_cask_dependencies(str(tmp_path / "obs"), "obs") is None
@@ -0,0 +1,39 @@
+from disk_usage import DiskUsageAnalyzer
+
+
+def build_prefix(root):
+    for name, versions in (("wget", ("1.0", "1.1")), ("jq", ("1.7",))):
+        for version in versions:
+            directory = root / "prefix" / "Cellar" / name / version / "bin"
+            directory.mkdir(parents=True)
+            (directory / name).write_bytes(b"x" * 8192)
+    (root / "cache").mkdir()
+    (root / "cache" / "wget.tar.gz").write_bytes(b"y" * 4096)
+
+
+def test_parallel_and_serial_scans_agree(tmp_path):
+    build_prefix(tmp_path)
+    reports = [
+        DiskUsageAnalyzer(str(tmp_path / "prefix"), str(tmp_path / "cache"),
+                          str(tmp_path / f"disk_usage_{workers}.json"), workers=workers).scan()
+        for workers in (1, 4)
+    ]
+    serial, parallel = ([(package.name, package.versions) for package in report.packages] for report in reports)
+    assert serial == parallel
+    assert reports[0].cache_bytes == reports[1].cache_bytes > 0
+    wget = next(package for package in reports[1].packages if package.name == "wget")
+    assert wget.current_version == "1.1"
+    assert wget.old_bytes == wget.versions["1.0"] > 0
+
+
+def test_head_keg_is_not_counted_as_reclaimable(tmp_path):
+    for version in ("1.0", "HEAD-abc123"):
+        directory = tmp_path / "prefix" / "Cellar" / "wget" / version
+        directory.mkdir(parents=True)
+        (directory / "wget").write_bytes(b"x" * 8192)
+    (tmp_path / "cache").mkdir()
+    report = DiskUsageAnalyzer(str(tmp_path / "prefix"), str(tmp_path / "cache"),
+                               str(tmp_path / "disk_usage.json"), workers=1).scan()
+    wget = report.packages[0]
+    assert wget.current_version == "HEAD-abc123"
+    assert wget.old_bytes == wget.versions["1.0"]
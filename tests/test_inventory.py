@@ -0,0 +1,101 @@
+import json
+import os
+
+from inventory import INVENTORY_CACHE_VERSION, InventoryCache, current_version, scan_prefix, sort_versions, version_key
+
+
+def test_numeric_segments_compare_by_value():
+    assert sort_versions(["1.10", "1.9", "1.2"]) == ["1.2", "1.9", "1.10"]
+    assert version_key("1.10_1") > version_key("1.10")
+    assert version_key("3.0.10") > version_key("3.0.9")
+
+
+def test_prerelease_sorts_before_release():
+    assert version_key("1.0rc1") < version_key("1.0")
+    assert version_key("1.0") < version_key("1.0.1")
+
+
+def test_head_sorts_newest():
+    assert version_key("HEAD-abc123") > version_key("1.0")
+    assert version_key("HEAD-abc123_1") > version_key("99.9.9_9")
+    assert sort_versions(["HEAD-abc123", "2.0", "1.10"]) == ["1.10", "2.0", "HEAD-abc123"]
+
+
+def test_current_version_falls_back_to_newest(tmp_path):
+    assert current_version(str(tmp_path), "foo", ["1.10", "1.9"]) == "1.10"
+
+
+def test_current_version_without_opt_link_picks_head(tmp_path):
+    assert current_version(str(tmp_path), "foo", ["1.10", "HEAD-abc123"]) == "HEAD-abc123"
+
+
+def test_current_version_prefers_opt_link(tmp_path):
+    (tmp_path / "opt").mkdir()
+    os.symlink(str(tmp_path / "Cellar" / "foo" / "1.9"), str(tmp_path / "opt" / "foo"))
+    assert current_version(str(tmp_path), "foo", ["1.10", "1.9"]) == "1.9"
+
+
+def test_scan_prefix_lists_versions_in_version_order(tmp_path):
+    for version in ("1.9", "1.10"):
+        (tmp_path / "Cellar" / "foo" / version).mkdir(parents=True)
+    records = scan_prefix(str(tmp_path))
+    assert records[0]["versions"] == ["1.9", "1.10"]
+
+
+def make_cache(tmp_path):
+    (tmp_path / "Cellar" / "wget" / "1.0").mkdir(parents=True)
+    return InventoryCache(str(tmp_path), str(tmp_path / "cache" / "inventory.json"))
+
+
+def test_cache_round_trip(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.load() is None
+    records = scan_prefix(str(tmp_path))
+    cache.store(records, cache.fingerprint())
+    assert cache.load() == records
+
+
+def test_cache_is_stale_when_the_cellar_mtime_changes(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store(scan_prefix(str(tmp_path)), cache.fingerprint())
+    cellar = tmp_path / "Cellar"
+    stat = os.stat(cellar)
+    os.utime(cellar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.load() is None
+
+
+def test_cache_is_stale_when_caskroom_appears(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store(scan_prefix(str(tmp_path)), cache.fingerprint())
+    (tmp_path / "Caskroom").mkdir()
+    assert cache.load() is None
+
+
+def test_cache_for_another_prefix_is_ignored(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store([], cache.fingerprint())
+    assert InventoryCache(str(tmp_path / "other"), cache.cache_path).load() is None
+
+
+def test_invalidate_removes_the_cache(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store([], cache.fingerprint())
+    cache.invalidate()
+    assert not os.path.exists(cache.cache_path)
+    assert cache.load() is None
+    cache.invalidate()
+
+
+def test_corrupt_or_outdated_cache_file_is_ignored(tmp_path):
+    cache = make_cache(tmp_path)
+    os.makedirs(os.path.dirname(cache.cache_path))
+    with open(cache.cache_path, "w") as f:
+        f.write("{not json")
+    assert cache.load() is None
+
+    with open(cache.cache_path, "w") as f:
+        json.dump({"version": INVENTORY_CACHE_VERSION - 1, "payload": {}}, f)
+    assert cache.load() is None
+
+    cache.store([], cache.fingerprint())
+    assert cache.load() == []
@@ -0,0 +1,74 @@
+import pytest
+
+from command_result import CommandResult
+from metrics import MetricsRegistry, command_label, quantile
+
+
+def test_quantile_uses_the_nearest_rank():
+    samples = list(range(1, 101))
+    assert quantile(samples, 0.5) == 50
+    assert quantile(samples, 0.95) == 95
+    assert quantile(samples, 0.99) == 99
+    assert quantile([3.0], 0.99) == 3.0
+    assert quantile([], 0.5) == 0.0
+
+
+def test_summary_percentiles_and_totals():
+    registry = MetricsRegistry()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        registry.record("brew list", seconds, output_bytes=10)
+    (summary,) = registry.snapshot()
+    assert (summary.count, summary.p50, summary.p95, summary.max_seconds) == (4, 0.2, 0.4, 0.4)
+    assert summary.total_seconds == pytest.approx(1.0)
+    assert summary.output_bytes == 40
+    assert summary.peak_rss is None
+
+
+def test_samples_are_bounded_but_counts_are_not():
+    registry = MetricsRegistry(sample_size=3)
+    for seconds in (10.0, 1.0, 2.0, 3.0):
+        registry.record("ui.refresh", seconds)
+    assert len(registry._histograms["ui.refresh"].samples) == 3
+    (summary,) = registry.snapshot()
+    # 最早的样本已被淘汰，但次数、总耗时和最大值仍包含它
+    assert summary.p99 == 3.0
+    assert (summary.count, summary.max_seconds) == (4, 10.0)
+
+
+def test_timer_counts_an_exception_as_an_error():
+    ticks = iter([0.0, 1.5, 2.0, 2.25])
+    registry = MetricsRegistry(clock=lambda: next(ticks))
+    with pytest.raises(RuntimeError):
+        with registry.timer("manager.install_packages"):
+            raise RuntimeError("boom")
+    with registry.timer("manager.install_packages"):
+        pass
+    (summary,) = registry.snapshot()
+    assert (summary.count, summary.errors) == (2, 1)
+    assert summary.total_seconds == pytest.approx(1.75)
+
+
+def test_command_label_keeps_the_services_action():
+    assert command_label(["/opt/homebrew/bin/brew", "services", "restart", "redis"]) == "brew services restart"
+    assert command_label(["brew", "install", "--quiet", "wget"]) == "brew install"
+    assert command_label(["/usr/bin/lsof", "-nP"]) == "lsof"
+    assert command_label([]) == "unknown"
+
+
+def test_record_command_uses_the_command_label_and_failure():
+    registry = MetricsRegistry()
+    registry.record_command(CommandResult(["brew", "services", "stop", "redis"], 1, "ok", "", 0.5, 2048))
+    (summary,) = registry.snapshot()
+    assert (summary.name, summary.errors, summary.output_bytes, summary.peak_rss) == \
+        ("brew services stop", 1, 2, 2048)
+
+
+def test_prometheus_labels_are_escaped():
+    registry = MetricsRegistry()
+    registry.record('ui."quoted"\\path\nnext', 0.25, failed=True)
+    text = registry.to_prometheus()
+    label = 'name="ui.\\"quoted\\"\\\\path\\nnext"'
+    assert f'brew_gui_duration_seconds{{{label},quantile="0.5"}} 0.250000' in text
+    assert f"brew_gui_errors_total{{{label}}} 1" in text
+    assert "brew_gui_peak_rss_bytes{" not in text
+    assert text.endswith("\n")
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from operation_scheduler import OperationScheduler, exclusive, submit_exclusive
+
+
+class FakeManager:
+    def __init__(self):
+        self.scheduler = OperationScheduler("/tmp/prefix")
+        self.calls = []
+        self.gate = threading.Event()
+
+    @exclusive(lambda name, on_output=None: (f"install {name}", ("install", name)))
+    def install(self, name, on_output=None):
+        self.gate.wait(5)
+        self.calls.append((name, threading.current_thread().name))
+        if on_output is not None:
+            on_output(f"installed {name}")
+        return name
+
+    @exclusive(lambda names: ("batch", None))
+    def install_all(self, names):
+        # 操作内部调用的其他操作直接执行，不会等待自己
+        return [self.install(name) for name in names]
+
+    @exclusive(lambda: ("broken", None))
+    def broken(self):
+        raise RuntimeError("boom")
+
+
+def test_operations_run_in_order_on_the_scheduler_thread():
+    manager = FakeManager()
+    futures = [submit_exclusive(manager.install, name) for name in ("a", "b", "c")]
+    manager.gate.set()
+    assert [future.result(5) for future in futures] == ["a", "b", "c"]
+    assert [name for name, _ in manager.calls] == ["a", "b", "c"]
+    assert {thread for _, thread in manager.calls} == {"brew-operations"}
+
+
+def test_direct_call_blocks_until_the_operation_finishes():
+    manager = FakeManager()
+    manager.gate.set()
+    assert manager.install("a") == "a"
+    assert manager.install_all(["b", "c"]) == ["b", "c"]
+
+
+def test_coalesced_callers_share_the_result_and_the_output():
+    manager = FakeManager()
+    first_output, second_output = [], []
+    blocker = submit_exclusive(manager.install, "blocker")
+    first = submit_exclusive(manager.install, "a", on_output=first_output.append)
+    second = submit_exclusive(manager.install, "a", on_output=second_output.append)
+    assert first is second
+    manager.gate.set()
+    assert first.result(5) == "a"
+    blocker.result(5)
+    assert first_output == second_output == ["installed a"]
+    assert [name for name, _ in manager.calls] == ["blocker", "a"]
+
+
+def test_cancelled_operation_is_skipped():
+    manager = FakeManager()
+    blocker = submit_exclusive(manager.install, "blocker")
+    cancelled = submit_exclusive(manager.install, "a")
+    assert cancelled.cancel()
+    after = submit_exclusive(manager.install, "b")
+    manager.gate.set()
+    assert after.result(5) == "b"
+    blocker.result(5)
+    assert [name for name, _ in manager.calls] == ["blocker", "b"]
+    _, waiting, history = manager.scheduler.snapshot()
+    assert waiting == []
+    assert [job.description for job in history] == ["install blocker", "install b"]
+
+
+def test_errors_reach_the_caller_and_the_history():
+    manager = FakeManager()
+    with pytest.raises(RuntimeError):
+        manager.broken()
+    _, _, history = manager.scheduler.snapshot()
+    assert history[-1].state == "failed"
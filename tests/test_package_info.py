@@ -0,0 +1,66 @@
+import json
+
+from command_result import CommandResult
+from package_info import PackageInfoFetcher
+
+
+def formula(name):
+    return {"name": name, "full_name": name, "desc": f"{name} desc", "versions": {"stable": "1.0"}}
+
+
+class FakeBrew:
+    """按包名返回 brew info 的结果；unknown 中的包名让整批以 not_found 失败"""
+
+    def __init__(self, unknown=(), failure=None):
+        self.unknown = set(unknown)
+        self.failure = failure
+        self.calls = []
+
+    def __call__(self, command):
+        names = command[3:]
+        self.calls.append(names)
+        if self.failure is not None:
+            return self.failure
+        missing = [name for name in names if name in self.unknown]
+        if missing:
+            return CommandResult(command, 1, "", f'Error: No available formula with the name "{missing[0]}".')
+        return CommandResult(command, 0, json.dumps({"formulae": [formula(name) for name in names], "casks": []}))
+
+
+def test_batches_are_fetched_with_one_command():
+    brew = FakeBrew()
+    fetcher = PackageInfoFetcher(brew, "brew", batch_size=50)
+    result = fetcher.fetch(["a", "b", "c"])
+    assert len(brew.calls) == 1
+    assert {name: info.desc for name, info in result.items()} == {"a": "a desc", "b": "b desc", "c": "c desc"}
+
+
+def test_unknown_name_is_bisected_and_negatively_cached():
+    brew = FakeBrew(unknown={"nope"})
+    fetcher = PackageInfoFetcher(brew, "brew")
+    result = fetcher.fetch(["a", "b", "nope", "c"])
+    assert result["nope"] is None
+    assert result["a"].name == "a"
+    assert fetcher.cached("nope") == (True, None)
+    calls = len(brew.calls)
+    fetcher.fetch(["nope"])
+    assert len(brew.calls) == calls
+
+
+def test_transient_failure_is_neither_bisected_nor_cached():
+    locked = CommandResult(["brew"], 1, "", "Error: Another active Homebrew process is already in progress.")
+    brew = FakeBrew(failure=locked)
+    fetcher = PackageInfoFetcher(brew, "brew")
+    names = [f"pkg{i}" for i in range(50)]
+    result = fetcher.fetch(names)
+    assert len(brew.calls) == 1
+    assert result == {name: None for name in names}
+    assert fetcher.cached("pkg0") == (False, None)
+
+
+def test_spawn_failure_is_not_cached():
+    brew = FakeBrew(failure=CommandResult(["brew"], None, "", "timed out"))
+    fetcher = PackageInfoFetcher(brew, "brew")
+    fetcher.fetch(["a", "b"])
+    assert len(brew.calls) == 1
+    assert fetcher.cached("a") == (False, None)
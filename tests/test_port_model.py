@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from port_model import PortTableModel, parse_port_filter  # noqa: E402
+from port_monitor import listener_key  # noqa: E402
+
+
+def test_parse_port_filter_ranges_numbers_and_text():
+    assert parse_port_filter("8000-9000") == [('range', (8000, 9000))]
+    assert parse_port_filter(":9000-8000") == [('range', (8000, 9000))]
+    assert parse_port_filter(":443") == [('number', 443)]
+    assert parse_port_filter("5432") == [('number', 5432)]
+    assert parse_port_filter("Nginx  tcp6") == [('text', 'nginx'), ('text', 'tcp6')]
+    assert parse_port_filter("80-90 node") == [('range', (80, 90)), ('text', 'node')]
+    assert parse_port_filter("  ") == []
+
+
+def test_parse_port_filter_treats_malformed_numbers_as_text():
+    assert parse_port_filter("80-") == [('text', '80-')]
+    assert parse_port_filter("1.2.3.4") == [('text', '1.2.3.4')]
+
+
+def listener(port, pid, name):
+    return {'port': port, 'pid': pid, 'name': name, 'status': 'LISTEN',
+            'protocol': 'TCP', 'address': '127.0.0.1', 'user': 'alice'}
+
+
+def test_string_pool_drops_strings_no_row_uses():
+    model = PortTableModel()
+    model._compact_at = 8
+    first = [listener(9000 + i, 100 + i, f"worker-{i}") for i in range(4)]
+    model.apply_changes(first, [], [])
+    second = [listener(9100 + i, 200 + i, f"replacement-{i}") for i in range(4)]
+    model.apply_changes(second, [listener_key(info) for info in first], [])
+
+    assert model.rowCount() == 4
+    assert sorted(model._strings) == sorted(["LISTEN", "TCP", "127.0.0.1", "alice"]
+                                            + [f"replacement-{i}" for i in range(4)])
+    assert [model.value(row, 'name') for row in range(4)] == [f"replacement-{i}" for i in range(4)]
+    assert model._compact_at >= 8
+
+    # 压缩后新的字符串仍然正确编号，已有的字符串被复用
+    model.apply_changes([listener(8000, 300, "replacement-0")], [], [])
+    assert model.value(0, 'name') == "replacement-0"
+    assert model._strings.count("replacement-0") == 1
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from port_monitor import diff_listeners, listener_key  # noqa: E402
+
+
+def listener(port, pid, name="nginx", protocol="TCP", address="*", user="root"):
+    return {'port': port, 'pid': pid, 'name': name, 'status': 'LISTEN',
+            'protocol': protocol, 'address': address, 'user': user}
+
+
+def test_diff_reports_added_removed_and_changed_listeners():
+    old = [listener(80, 10), listener(443, 10), listener(22, 1, name="sshd")]
+    new = [listener(80, 10), listener(443, 10, user="www"), listener(8080, 20, name="node")]
+    added, removed, changed = diff_listeners(old, new)
+
+    assert added == [listener(8080, 20, name="node")]
+    assert removed == [listener_key(listener(22, 1))]
+    assert changed == [listener(443, 10, user="www")]
+
+
+def test_same_port_with_a_different_pid_is_a_new_listener():
+    old = [listener(5432, 100, name="postgres")]
+    new = [listener(5432, 200, name="postgres")]
+    added, removed, changed = diff_listeners(old, new)
+
+    assert added == new
+    assert removed == [(5432, 100, "TCP", "*")]
+    assert changed == []
+
+
+def test_identical_snapshots_have_no_changes():
+    snapshot = [listener(80, 10), listener(80, 10, protocol="TCP6", address="::")]
+    assert diff_listeners(snapshot, list(snapshot)) == ([], [], [])
@@ -0,0 +1,40 @@
+import port_scanner
+from port_scanner import PartialListeners, _decode_proc_address, parse_lsof_fields
+
+
+def test_decode_proc_ipv4_address_is_little_endian():
+    assert _decode_proc_address("0100007F", ipv6=False) == "127.0.0.1"
+    assert _decode_proc_address("00000000", ipv6=False) == "0.0.0.0"
+
+
+def test_decode_proc_ipv6_address_swaps_each_word():
+    assert _decode_proc_address("00000000000000000000000001000000", ipv6=True) == "::1"
+    assert _decode_proc_address("B80D0120000000000000000001000000", ipv6=True) == "2001:db8::1"
+
+
+def test_parse_lsof_fields_groups_descriptors_by_process():
+    output = "\n".join([
+        "p123", "cnginx", "Lroot", "PTCP", "n*:80", "n127.0.0.1:8080",
+        "p456", "credis-server", "Lalice", "PTCP", "n[::1]:6379",
+    ])
+    listeners = parse_lsof_fields(output)
+    assert [(info['pid'], info['name'], info['user'], info['address'], info['port'], info['protocol'])
+            for info in listeners] == [
+        (123, "nginx", "root", "*", 80, "TCP"),
+        (123, "nginx", "root", "127.0.0.1", 8080, "TCP"),
+        (456, "redis-server", "alice", "::1", 6379, "TCP6"),
+    ]
+
+
+def test_parse_lsof_fields_skips_addresses_without_a_port():
+    assert parse_lsof_fields("p1\ncfoo\nnlocalhost:*\n") == []
+
+
+def test_partial_result_falls_through_to_the_next_backend(monkeypatch):
+    partial = PartialListeners([port_scanner._listener(80, 1, "a", "TCP", "*", "")])
+    complete = [port_scanner._listener(80, 1, "a", "TCP", "*", ""), port_scanner._listener(22, 2, "b", "TCP", "*", "")]
+    monkeypatch.setattr(port_scanner, "BACKENDS", (("psutil", lambda: partial), ("lsof", lambda: complete)))
+    assert port_scanner.scan_listeners() == complete
+
+    monkeypatch.setattr(port_scanner, "BACKENDS", (("psutil", lambda: partial), ("lsof", lambda: None)))
+    assert port_scanner.scan_listeners() == list(partial)
@@ -0,0 +1,44 @@
+from search_index import SearchIndex
+
+
+class FakeCatalogue:
+    def __init__(self, *names):
+        self.names = list(names)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"formula": [{"name": name, "desc": ""} for name in self.names], "cask": []}
+
+
+def make_index(tmp_path, loader, ttl):
+    return SearchIndex(homebrew_cache=str(tmp_path / "brew"), cache_path=str(tmp_path / "index.json"),
+                       fallback_loader=loader, fallback_ttl=ttl)
+
+
+def test_fallback_catalogue_is_reused_within_ttl(tmp_path):
+    loader = FakeCatalogue("wget")
+    assert make_index(tmp_path, loader, ttl=3600).ensure_loaded()
+    index = make_index(tmp_path, loader, ttl=3600)
+    assert index.ensure_loaded()
+    assert index.ensure_loaded()
+    assert loader.calls == 1
+    assert len(index) == 1
+
+
+def test_fallback_catalogue_is_reloaded_after_ttl(tmp_path):
+    loader = FakeCatalogue("wget")
+    index = make_index(tmp_path, loader, ttl=0)
+    index.ensure_loaded()
+    loader.names.append("curl")
+    index.ensure_loaded()
+    assert loader.calls == 2
+    assert len(index) == 2
+
+
+def test_failed_reload_keeps_the_previous_catalogue(tmp_path):
+    loader = FakeCatalogue("wget")
+    make_index(tmp_path, loader, ttl=0).ensure_loaded()
+    index = make_index(tmp_path, lambda: {}, ttl=0)
+    assert index.ensure_loaded()
+    assert len(index) == 1
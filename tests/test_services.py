@@ -0,0 +1,55 @@
+import json
+
+from services import ServiceRecord, parse_services_json, parse_services_list
+
+
+def test_parse_services_json_reads_every_field():
+    output = json.dumps([
+        {"name": "redis", "status": "started", "user": "alice", "file": "/Users/alice/Library/homebrew.mxcl.redis.plist",
+         "pid": 123, "exit_code": None, "running": True, "loaded": True},
+        {"name": "mysql", "status": "error", "user": None, "file": None, "pid": None, "exit_code": 1,
+         "running": False, "loaded": True},
+        {"name": "nginx", "status": "none"},
+    ])
+    redis, mysql, nginx = parse_services_json(output)
+    assert redis == ServiceRecord("redis", "started", "alice", "/Users/alice/Library/homebrew.mxcl.redis.plist",
+                                  123, None, True, True)
+    assert mysql.display_status == "error"
+    assert mysql.exit_code == 1
+    assert mysql.user is None and mysql.file is None
+    assert nginx.display_status == "stopped"
+    assert not nginx.running
+
+
+def test_parse_services_json_accepts_a_single_object_and_skips_nameless_items():
+    assert [record.name for record in parse_services_json('{"name": "redis", "status": "started"}')] == ["redis"]
+    assert parse_services_json('[{"status": "started"}, 1]') == []
+
+
+def test_parse_services_json_handles_empty_and_invalid_output():
+    assert parse_services_json("[]") == []
+    assert parse_services_json("Error: unknown flag --json") is None
+    assert parse_services_json('"text"') is None
+
+
+def test_parse_services_list_reads_error_exit_codes_and_missing_columns():
+    output = "\n".join([
+        "Name    Status  User  File",
+        "redis   started alice /Users/alice/Library/LaunchAgents/homebrew.mxcl.redis.plist",
+        "mysql   error   256   root  /Library/LaunchDaemons/homebrew.mxcl.mysql.plist",
+        "nginx   none",
+        "unbound none    /Library/LaunchDaemons/homebrew.mxcl.unbound.plist",
+        "",
+    ])
+    redis, mysql, nginx, unbound = parse_services_list(output)
+    assert (redis.user, redis.running) == ("alice", True)
+    assert redis.file.endswith("homebrew.mxcl.redis.plist")
+    assert (mysql.status, mysql.exit_code, mysql.user) == ("error", 256, "root")
+    assert (nginx.user, nginx.file, nginx.display_status) == (None, None, "stopped")
+    assert unbound.user is None
+    assert unbound.file == "/Library/LaunchDaemons/homebrew.mxcl.unbound.plist"
+
+
+def test_parse_services_list_without_services():
+    assert parse_services_list("") == []
+    assert parse_services_list("Name Status User File\n") == []
@@ -0,0 +1,130 @@
+from typing import Any, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt
+
+from upgrades import STEP_STAGES, UpgradePlan, UpgradeStep
+
+# 升级计划表格的列：(字段, 标题, 对齐方式)
+UPGRADE_COLUMNS = [
+    ('name', '包名', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('kind', '类型', Qt.AlignmentFlag.AlignCenter),
+    ('versions', '版本', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter),
+    ('stage', '状态', Qt.AlignmentFlag.AlignCenter),
+    ('size', '大小', Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+    ('fetch', '下载耗时', Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+    ('install', '安装耗时', Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+]
+UPGRADE_COLUMN_INDEX = {key: i for i, (key, _, _) in enumerate(UPGRADE_COLUMNS)}
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    return "" if seconds is None else f"{seconds:.1f} 秒"
+
+
+class UpgradeTableModel(QAbstractTableModel):
+    """升级计划表格的数据模型
+
+    只显示 GUI 线程持有的计划。执行升级的后台线程修改自己的计划，
+    每次变化后把快照通过信号送回，由 apply_snapshot() 替换并通知视图重绘。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._plan = UpgradePlan()
+        self._placeholder: Optional[str] = None
+
+    @property
+    def plan(self) -> UpgradePlan:
+        return self._plan
+
+    def set_plan(self, plan: UpgradePlan):
+        self.beginResetModel()
+        self._plan = plan
+        self._placeholder = None if plan.steps else "所有包都已是最新版本"
+        self.endResetModel()
+
+    def set_placeholder(self, text: str):
+        """清空表格，只显示一行提示文字"""
+        self.beginResetModel()
+        self._plan = UpgradePlan()
+        self._placeholder = text
+        self.endResetModel()
+
+    def apply_snapshot(self, plan: UpgradePlan):
+        """用后台线程发出的快照替换当前计划；步骤相同，只通知视图重绘会变化的列"""
+        if [step.name for step in plan.steps] != [step.name for step in self._plan.steps]:
+            self.set_plan(plan)
+            return
+        self._plan = plan
+        if self._plan.steps:
+            self.dataChanged.emit(self.index(0, UPGRADE_COLUMN_INDEX['stage']),
+                                  self.index(len(self._plan.steps) - 1, len(UPGRADE_COLUMNS) - 1))
+
+    def step_at(self, row: int) -> Optional[UpgradeStep]:
+        if 0 <= row < len(self._plan.steps):
+            return self._plan.steps[row]
+        return None
+
+    def names_at(self, rows: List[int]) -> List[str]:
+        return [step.name for step in map(self.step_at, rows) if step is not None]
+
+    # ------------------------------------------------------------------
+    # Qt 模型接口
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._plan.steps) or (1 if self._placeholder else 0)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(UPGRADE_COLUMNS)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not self._plan.steps:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        key, _, alignment = UPGRADE_COLUMNS[index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return alignment
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        step = self.step_at(index.row())
+        if step is None:
+            return self._placeholder if key == 'name' else None
+        if key == 'name':
+            return step.name
+        if key == 'kind':
+            return step.package.kind
+        if key == 'versions':
+            return f"{', '.join(step.package.installed_versions)} → {step.package.current_version}"
+        if key == 'stage':
+            return STEP_STAGES.get(step.stage, step.stage)
+        if key == 'size':
+            if step.cached:
+                return "已缓存"
+            return format_bytes(step.download_bytes) if step.download_bytes else ""
+        if key == 'fetch':
+            return _format_seconds(step.fetch_seconds)
+        if key == 'install':
+            return _format_seconds(step.install_seconds)
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return UPGRADE_COLUMNS[section][1]
+        return None
@@ -0,0 +1,159 @@
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+# 升级计划中每个包所处的阶段
+STEP_STAGES = {
+    "pending": "等待",
+    "fetching": "下载中",
+    "fetched": "已下载",
+    "fetch_failed": "下载失败",
+    "installing": "安装中",
+    "done": "完成",
+    "failed": "失败",
+    "pinned": "已固定",
+}
+
+
+@dataclass
+class OutdatedPackage:
+    """一个有新版本的包（来自 brew outdated --json=v2）"""
+    name: str
+    # "formula" 或 "cask"
+    kind: str
+    installed_versions: List[str]
+    current_version: str
+    pinned: bool = False
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], kind: str) -> "OutdatedPackage":
+        installed = data.get("installed_versions") or []
+        if isinstance(installed, str):
+            # 旧版 brew 的 cask 条目是单个字符串
+            installed = [installed]
+        return cls(
+            name=data.get("name") or "",
+            kind=kind,
+            installed_versions=[str(version) for version in installed],
+            current_version=str(data.get("current_version") or ""),
+            pinned=bool(data.get("pinned")),
+        )
+
+
+def parse_outdated_json(output: str) -> Optional[List[OutdatedPackage]]:
+    """解析 brew outdated --json=v2 的输出，无法解析时返回 None"""
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    packages = []
+    for key, kind in (("formulae", "formula"), ("casks", "cask")):
+        for item in data.get(key) or []:
+            if isinstance(item, dict) and item.get("name"):
+                packages.append(OutdatedPackage.from_json(item, kind))
+    return packages
+
+
+def parse_fetch_output(output: str) -> Tuple[Optional[str], bool]:
+    """从 brew fetch 的输出中取出下载文件的路径，返回 (路径, 是否命中本地缓存)"""
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("Downloaded to:"):
+            return line[len("Downloaded to:"):].strip(), False
+        if line.startswith("Already downloaded:"):
+            return line[len("Already downloaded:"):].strip(), True
+    return None, False
+
+
+@dataclass
+class UpgradeStep:
+    """升级计划中的一个包及其两个阶段的结果
+
+    只由持有该计划的后台线程修改，界面显示的是 UpgradePlan.snapshot() 得到的副本。
+    """
+    package: OutdatedPackage
+    stage: str = "pending"
+    # 下载文件的大小（字节）；命中本地缓存时 cached 为 True，不计入下载速度
+    download_bytes: int = 0
+    cached: bool = False
+    fetch_seconds: Optional[float] = None
+    install_seconds: Optional[float] = None
+    message: str = ""
+
+    @property
+    def name(self) -> str:
+        return self.package.name
+
+
+@dataclass
+class UpgradePlan:
+    """一次升级：先并行下载所有包，再逐个安装"""
+    steps: List[UpgradeStep] = field(default_factory=list)
+    # 各阶段开始和结束的时间（time.perf_counter()），尚未开始时为 None
+    fetch_started: Optional[float] = None
+    fetch_finished: Optional[float] = None
+    install_started: Optional[float] = None
+    install_finished: Optional[float] = None
+
+    @classmethod
+    def from_outdated(cls, packages: List[OutdatedPackage]) -> "UpgradePlan":
+        return cls([UpgradeStep(package, stage="pinned" if package.pinned else "pending")
+                    for package in packages])
+
+    def subset(self, names: List[str]) -> "UpgradePlan":
+        """只包含指定包的新计划（保持原计划中的顺序）"""
+        wanted = set(names)
+        return UpgradePlan.from_outdated([step.package for step in self.steps if step.name in wanted])
+
+    def snapshot(self) -> "UpgradePlan":
+        """复制计划和每个步骤；执行升级的线程修改自己的计划，把副本交给界面或其他线程"""
+        return replace(self, steps=[replace(step) for step in self.steps])
+
+    def runnable_steps(self) -> List[UpgradeStep]:
+        return [step for step in self.steps if step.stage != "pinned"]
+
+    @staticmethod
+    def _elapsed(started: Optional[float], finished: Optional[float]) -> float:
+        if started is None:
+            return 0.0
+        return (finished if finished is not None else time.perf_counter()) - started
+
+    @property
+    def fetch_seconds(self) -> float:
+        return self._elapsed(self.fetch_started, self.fetch_finished)
+
+    @property
+    def install_seconds(self) -> float:
+        return self._elapsed(self.install_started, self.install_finished)
+
+    @property
+    def downloaded_bytes(self) -> int:
+        """实际下载的字节数（不含命中缓存的文件）"""
+        return sum(step.download_bytes for step in self.steps if not step.cached)
+
+    @property
+    def throughput(self) -> float:
+        """下载阶段的平均速度（字节/秒），下载进行中时为到目前为止的速度"""
+        seconds = self.fetch_seconds
+        return self.downloaded_bytes / seconds if seconds > 0 else 0.0
+
+    def summary(self) -> Tuple[bool, str]:
+        """汇总为一条 (success, message)"""
+        steps = self.runnable_steps()
+        if not steps:
+            return False, "没有可升级的包"
+        failed = [step for step in steps if step.stage != "done"]
+        done = [step.name for step in steps if step.stage == "done"]
+        timing = f"下载 {self.fetch_seconds:.1f} 秒，安装 {self.install_seconds:.1f} 秒"
+        if not failed:
+            return True, f"已升级 {len(done)} 个包（{timing}）：{', '.join(done)}"
+        lines = []
+        if done:
+            lines.append(f"已升级：{', '.join(done)}")
+        lines.append(f"{len(failed)}/{len(steps)} 个包升级失败：")
+        lines.extend(f"  {step.name}：{step.message}" for step in failed)
+        lines.append(timing)
+        return False, "\n".join(lines)